@@ -0,0 +1,59 @@
+# backend/api/admin.py
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from ..deps import require_admin
+from ..services.reference import reference
+from ..services.exports import iter_all_records, stream_csv
+from ..services.report_jobs import report_jobs
+from ..core.config import settings
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.post("/reference/invalidate")
+async def invalidate_reference(name: Optional[str] = None):
+    # drop one reference table (?name=courses) or all of them
+    if name and name not in reference.names:
+        raise HTTPException(status_code=404, detail=f"Unknown reference table: {name}")
+    return {"invalidated": reference.invalidate(name)}
+
+
+@router.get("/export/csv")
+async def export_org_csv(user_id: Optional[List[str]] = Query(None)):
+    # org-wide (or ?user_id=..&user_id=.. subset) export, streamed page by page
+    return StreamingResponse(
+        stream_csv(iter_all_records(settings.export_page_size, user_id), include_user=True),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=ce_records_all.csv"}
+    )
+
+
+class ReportJobIn(BaseModel):
+    user_ids: List[str] = Field(..., min_length=1, description="Users to include in the packet")
+
+
+@router.post("/report/jobs", status_code=202)
+async def submit_org_report_job(job: ReportJobIn, request: Request):
+    # one combined compliance packet for many users, rendered in the background
+    return await report_jobs.submit("admin", job.user_ids, str(request.base_url))
+
+
+@router.get("/report/jobs/{job_id}")
+async def org_report_job_status(job_id: str):
+    job = await report_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job
+
+
+@router.get("/report/jobs/{job_id}/download")
+async def org_report_job_download(job_id: str):
+    path = await report_jobs.artifact(job_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Report not ready")
+    return FileResponse(path, media_type="application/pdf", filename="ce_compliance_packet.pdf")
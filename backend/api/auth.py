@@ -4,7 +4,10 @@ import json
 from fastapi import APIRouter, Request, Form, HTTPException, status
 from fastapi.responses import RedirectResponse
 from gotrue.errors import AuthApiError
-from backend.services.supabase_client import supabase
+from backend.services.supabase_client import auth
+from backend.core.ratelimit import (
+    RateLimited, auth_calls, login_failure_limit, login_ip_limit, signup_email_limit, signup_ip_limit,
+)
 from backend.jinja_env import templates
 
 router = APIRouter()
@@ -25,6 +28,20 @@ def _set_token_cookie(resp: RedirectResponse, token_data: dict) -> None:
     )
 
 
+def _client_ip(request: Request) -> str:
+    # behind a proxy, run uvicorn with --proxy-headers so this is the real client
+    return request.client.host if request.client else "unknown"
+
+
+def _too_many(template: str, request: Request, e: RateLimited):
+    return templates.TemplateResponse(
+        template,
+        {"request": request, "error": f"Too many attempts. Please try again in {e.retry_after_header} seconds."},
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={"Retry-After": e.retry_after_header},
+    )
+
+
 # ─── SIGNUP ─────────────────────────────────────────────────────
 
 @router.get("/signup")
@@ -43,9 +60,14 @@ async def signup_post(
     password: str = Form(...)
 ):
     try:
-        supabase.auth.sign_up({"email": email, "password": password})
+        await signup_ip_limit.hit(_client_ip(request))
+        await signup_email_limit.hit(email.strip().lower())
+        async with auth_calls.slot():
+            await auth.sign_up({"email": email, "password": password})
         return RedirectResponse(url="/login", status_code=303)
 
+    except RateLimited as e:
+        return _too_many("signup.html", request, e)
     except AuthApiError as e:
         return templates.TemplateResponse(
             "signup.html",
@@ -76,14 +98,21 @@ async def login_post(
     email: str = Form(...),
     password: str = Form(...)
 ):
+    account = email.strip().lower()
     try:
-        res = supabase.auth.sign_in_with_password({
-            "email": email,
-            "password": password
-        })
+        # per IP against stuffing from one host; per email, only failed
+        # attempts count, against one account being guessed from many
+        await login_ip_limit.hit(_client_ip(request))
+        await login_failure_limit.check(account)
+        async with auth_calls.slot():
+            res = await auth.sign_in_with_password({
+                "email": email,
+                "password": password
+            })
         session = res.session
 
         if not session or not session.access_token or not session.refresh_token:
+            await login_failure_limit.spend(account)
             return templates.TemplateResponse(
                 "login.html",
                 {"request": request, "error": "Invalid credentials."},
@@ -98,7 +127,10 @@ async def login_post(
         _set_token_cookie(resp, token_payload)
         return resp
 
+    except RateLimited as e:
+        return _too_many("login.html", request, e)
     except AuthApiError as e:
+        await login_failure_limit.spend(account)
         return templates.TemplateResponse(
             "login.html",
             {"request": request, "error": str(e)},
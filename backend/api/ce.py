@@ -4,14 +4,24 @@
 
 from backend.deps import get_current_user, User
 import json
-from fastapi import APIRouter, Depends, HTTPException, Request, Form
-from fastapi.responses import RedirectResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, Form, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, RedirectResponse
 from pydantic import BaseModel, Field
 from datetime import date, datetime, timedelta
-from typing import List
+from typing import List, Optional
 from pathlib import Path
+from postgrest import APIError
 
 from backend.services.supabase_client import supabase
+from backend.services.compliance import compliance
+from backend.services.reference import reference
+from backend.services.records import fetch_page
+from backend.services.resilience import last_known_good
+from backend.services.versions import data_versions
+from backend.core.assets import assets
+from backend.core.config import settings
+from backend.core.etag import make_etag, not_modified, with_etag
 from backend.deps import get_current_user_id
 from backend.jinja_env import templates
 
@@ -23,7 +33,7 @@ class CERecordIn(BaseModel):
     course_id: str = Field(..., description="UUID of the course")
     date_completed: date = Field(..., description="Date when CE was completed")
     hours_earned: int = Field(..., gt=0, description="Number of hours earned")
-    notes: str = Field(None, description="Optional notes")
+    notes: Optional[str] = Field(None, description="Optional notes")
 
 
 class CERecordOut(CERecordIn):
@@ -31,101 +41,76 @@ class CERecordOut(CERecordIn):
     user_id: str
 
 
-# List user-specific CE records
-@router.get("/records", response_model=List[CERecordOut])
-async def list_records(user_id: str = Depends(get_current_user_id)):
-    res = (
-        supabase
-        .table("ce_records")
-        .select("*")
-        .eq("user_id", user_id)
-        # .order("date_completed", {"ascending": False})
-        .execute()
-    )
-    if hasattr(res, "error") and res.error:
-        raise HTTPException(status_code=500, detail=res.error.message)
-    return res.data
+class CERecordPage(BaseModel):
+    items: List[CERecordOut]
+    next_cursor: Optional[str] = Field(None, description="Pass as ?cursor= for the next page")
+
+
+# List user-specific CE records, newest first, one keyset page at a time
+@router.get("/records", response_model=CERecordPage)
+async def list_records(
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.records_page_size, ge=1, le=settings.records_max_page_size),
+    user_id: str = Depends(get_current_user_id),
+):
+    try:
+        items, next_cursor = await fetch_page(user_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
 
 
 # Create a new CE record
 @router.post("/records", response_model=CERecordOut)
 async def create_record(rec: CERecordIn, user_id: str = Depends(get_current_user_id)):
-    payload = rec.dict()
+    payload = rec.model_dump(mode="json")
     payload["user_id"] = user_id
-    res = (
-        supabase
-        .table("ce_records")
-        .insert(payload)
-        .single()
-        .execute()
-    )
-    if res.error:
-        raise HTTPException(status_code=500, detail=res.error.message)
-    return res.data
+    try:
+        res = await (
+            supabase
+            .table("ce_records")
+            .insert(payload)
+            .execute()
+        )
+    except APIError as e:
+        raise HTTPException(status_code=500, detail=e.message)
+    await compliance.record_added(user_id, res.data[0])
+    await data_versions.bump(user_id)
+    return res.data[0]
 
 
 # Compute CE status for the user
 @router.get("/status")
-async def ce_status(user_id: str = Depends(get_current_user_id)):
-    # Fetch global CE requirement (allowing zero rows)
-    req_resp = (
-        supabase
-        .table("ce_requirements")
-        .select("*")
-        .maybe_single()
-        .execute()
-    )
-    if req_resp is None:
-        raise HTTPException(status_code=500, detail="Invalid Supabase response")
-    if hasattr(req_resp, "error") and req_resp.error:
-        raise HTTPException(status_code=500, detail=req_resp.error.message)
-    if req_resp.data is None:
-        raise HTTPException(status_code=404, detail="No CE requirement configured")
-
-    req = req_resp.data
-    required_hours = req["required_hours"]
-    renewal_interval_days = req["renewal_interval_days"]
-
-    # Sum this user’s CE records
-    recs_resp = (
-        supabase
-        .table("ce_records")
-        .select("hours_earned,date_completed")
-        .eq("user_id", user_id)
-        .execute()
+async def ce_status(request: Request, current_user: User = Depends(get_current_user)):
+    etag = await data_versions.etag("status", current_user)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    # served from the user's running aggregate under their state's rule
+    status, stale = await last_known_good.load(
+        ("status", current_user.id),
+        lambda: compliance.status(current_user.id, current_user.state),
     )
-    if hasattr(recs_resp, "error") and recs_resp.error:
-        raise HTTPException(status_code=500, detail=recs_resp.error.message)
-
-    records = recs_resp.data or []
-    hours_completed = sum(r["hours_earned"] for r in records)
-
-    # Compute next renewal date
-    latest = max(
-        (datetime.fromisoformat(r["date_completed"]) for r in records),
-        default=datetime.utcnow()
-    )
-    next_renewal = (latest + timedelta(days=renewal_interval_days)).date()
-
-    return {
-        "required_hours": required_hours,
-        "hours_completed": hours_completed,
-        "hours_remaining": max(0, required_hours - hours_completed),
-        "next_renewal_date": str(next_renewal),
-    }
+    if stale:
+        # last known totals during an outage: flagged, never cached
+        return JSONResponse({**jsonable_encoder(status), "stale": True}, headers={"Cache-Control": "no-store"})
+    return with_etag(JSONResponse(jsonable_encoder(status)), etag)
 
 
 # Render upload form
 @router.get("/records/upload")
 async def upload_ce_form(request: Request, user_id: str = Depends(get_current_user_id)):
     # NOTE: changed 'name' → 'course_title'
-    courses_resp = supabase.table("courses").select("*").execute()
-    courses = courses_resp.data or []
-    return templates.TemplateResponse("upload.html", {
+    courses = await reference.get("courses")
+    etag = make_etag(courses.etag, assets.version)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    return with_etag(templates.TemplateResponse("upload.html", {
         "request": request,
-        "courses": courses,
+        "courses": courses.rows,
         "error": None
-    })
+    }), etag)
 
 
 # Process upload submission
@@ -140,21 +125,24 @@ async def upload_ce_submit(
 ):
     payload = {
         "course_id": course_id,
-        "date_completed": date_completed,
+        "date_completed": date_completed.isoformat(),
         "hours_earned": hours_earned,
         "notes": notes,
         "user_id": user_id
     }
-    res = supabase.table("ce_records").insert(payload).execute()
-    if res.error:
+    try:
+        await supabase.table("ce_records").insert(payload).execute()
+    except APIError as e:
         # NOTE: also updated here
-        courses = supabase.table("courses").select("id,course_title").execute().data or []
+        courses = await reference.rows("courses")
         return templates.TemplateResponse("upload.html", {
             "request": request,
             "courses": courses,
-            "error": res.error.message
+            "error": e.message
         }, status_code=400)
 
+    await compliance.record_added(user_id, payload)
+    await data_versions.bump(user_id)
     return RedirectResponse(url="/dashboard", status_code=303)
 
 
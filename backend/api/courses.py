@@ -1,7 +1,9 @@
 # backend/api/courses.py
 
 from fastapi import APIRouter, Depends, Request
-from ..services.supabase_client import supabase
+from ..services.reference import reference
+from ..core.assets import assets
+from ..core.etag import make_etag, not_modified, with_etag
 from ..deps import get_current_user, User
 from ..jinja_env import templates
 
@@ -12,11 +14,14 @@ async def list_courses(
     request: Request,
     current_user: User = Depends(get_current_user)
 ):
-    # fetch all courses (or filter by state, etc.)
-    resp = await supabase.from_("courses").select("*").execute()
-    courses = resp.data or []
+    # all courses, from the reference-data cache
+    courses = await reference.get("courses")
+    etag = make_etag(courses.etag, assets.version)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
 
-    return templates.TemplateResponse(
+    return with_etag(templates.TemplateResponse(
         "courses.html",
-        {"request": request, "courses": courses}
-    )
+        {"request": request, "courses": courses.rows}
+    ), etag)
@@ -1,17 +1,12 @@
 # backend/api/payments.py
 
-import os
-import json
 from fastapi import APIRouter, Request, HTTPException
-from stripe import Webhook, error
-import stripe
-from ..services.supabase_client import supabase
+
+from ..services.stripe_client import InvalidWebhook, verify_event
+from ..services.stripe_events import stripe_events
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
-# Initialize Stripe
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
-endpoint_secret = os.getenv("STRIPE_WEBHOOK_SECRET")
 
 @router.post("/webhook")
 async def stripe_webhook(request: Request):
@@ -19,24 +14,11 @@ async def stripe_webhook(request: Request):
     sig_header = request.headers.get("stripe-signature")
 
     try:
-        event = Webhook.construct_event(payload, sig_header, endpoint_secret)
-    except error.SignatureVerificationError:
-        raise HTTPException(400, "Invalid signature")
-    except Exception:
-        raise HTTPException(400, "Malformed webhook")
-
-    if event["type"] == "checkout.session.completed":
-        session = event["data"]["object"]
-        # Mark user as Pro by email
-        user_res = await supabase.from_("users") \
-            .select("id") \
-            .eq("email", session.get("customer_email")) \
-            .single() \
-            .execute()
-        if user_res.data:
-            await supabase.from_("users") \
-                .update({"is_pro": True}) \
-                .eq("id", user_res.data["id"]) \
-                .execute()
+        event = verify_event(payload, sig_header)
+    except InvalidWebhook as e:
+        raise HTTPException(400, str(e))
 
-    return {"status": "success"}
+    # acknowledge right away; the Supabase work happens in stripe_events'
+    # workers, and a redelivered event id is simply not queued again
+    queued = await stripe_events.enqueue(event)
+    return {"status": "success", "duplicate": not queued}
@@ -1,73 +1,62 @@
 # backend/api/report.py
 
 from fastapi import APIRouter, Depends, Request, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse
+import asyncio
 import io
-import csv
+import json
 import traceback
-from weasyprint import HTML
 
-from ..services.supabase_client import supabase
+from ..services.compliance import compliance
+from ..services.exports import iter_user_records, stream_csv
+from ..services.pdf import pdf_renderer, RendererBusy
+from ..services.records import fetch_all
+from ..services.report_jobs import report_jobs
+from ..services.resilience import UpstreamUnavailable
+from ..services.versions import data_versions
+from ..core.config import settings
+from ..core.page_cache import page_cache
 from ..deps import get_current_user, User
-from ..jinja_env import templates
+from ..jinja_env import stream_template, templates
 
 router = APIRouter(prefix="/report", tags=["report"])
 
+
 @router.get("")
 async def view_report(
     request: Request,
     current_user: User = Depends(get_current_user)
 ):
-    try:
-        status_resp = await supabase.rpc(
-            "compute_ce_status", {"user_id": current_user.id}
-        ).single().execute()
-        status = status_resp.data or {}
-
-        records_resp = await supabase.table("ce_records") \
-            .select("course_title,date_completed,hours,notes") \
-            .eq("user_id", current_user.id) \
-            .execute()
-        records = records_resp.data or []
-
-        return templates.TemplateResponse(
-            "report.html",
-            {"request": request, "records": records, "status": status}
-        )
-    except Exception:
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail="Failed to load report page")
+    async def render():
+        try:
+            records, status = await asyncio.gather(
+                fetch_all(current_user.id),
+                compliance.status(current_user.id, current_user.state),
+            )
+
+            # every record in one table: streamed, so rows arrive as they render
+            return stream_template(
+                "report.html",
+                {"request": request, "records": records, "status": status}
+            )
+        except UpstreamUnavailable:
+            raise
+        except Exception:
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail="Failed to load report page")
+
+    etag = await data_versions.etag("report", current_user)
+    return await page_cache.serve(request, etag, etag, render)
 
 
 @router.get("/download_csv")
 async def download_csv(current_user: User = Depends(get_current_user)):
-    try:
-        records_resp = await supabase.table("ce_records") \
-            .select("course_title,date_completed,hours,notes") \
-            .eq("user_id", current_user.id) \
-            .execute()
-        records = records_resp.data or []
-
-        buffer = io.StringIO()
-        writer = csv.writer(buffer)
-        writer.writerow(["Course", "Date Completed", "Hours", "Notes"])
-        for r in records:
-            writer.writerow([
-                r.get("course_title", ""),
-                r.get("date_completed", ""),
-                r.get("hours", ""),
-                r.get("notes", ""),
-            ])
-        buffer.seek(0)
-
-        return StreamingResponse(
-            buffer,
-            media_type="text/csv",
-            headers={"Content-Disposition": "attachment; filename=ce_records.csv"}
-        )
-    except Exception as e:
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"CSV export failed: {e}")
+    # paged straight from ce_records to the client; nothing is buffered
+    return StreamingResponse(
+        stream_csv(iter_user_records(current_user.id, settings.export_page_size)),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=ce_records.csv"}
+    )
 
 
 @router.get("/download_pdf")
@@ -79,27 +68,67 @@ async def download_pdf(
         raise HTTPException(status_code=403, detail="Upgrade to Pro to export PDF")
 
     try:
-        records_resp = await supabase.table("ce_records") \
-            .select("course_title,date_completed,hours,notes") \
-            .eq("user_id", current_user.id) \
-            .execute()
-        records = records_resp.data or []
-
-        status_resp = await supabase.rpc(
-            "compute_ce_status", {"user_id": current_user.id}
-        ).single().execute()
-        status = status_resp.data or {}
+        records, status = await asyncio.gather(
+            fetch_all(current_user.id),
+            compliance.status(current_user.id, current_user.state),
+        )
 
         html_content = templates.get_template("report.html").render(
             request=request, records=records, status=status
         )
-        pdf_bytes = HTML(string=html_content).write_pdf()
+        # rendered in the PDF process pool; unchanged reports come from its cache
+        pdf_bytes = await pdf_renderer.render(html_content)
 
         return StreamingResponse(
             io.BytesIO(pdf_bytes),
             media_type="application/pdf",
             headers={"Content-Disposition": "attachment; filename=ce_report.pdf"}
         )
+    except RendererBusy:
+        raise HTTPException(
+            status_code=429,
+            detail="PDF export is busy, please retry shortly",
+            headers={"Retry-After": str(settings.pdf_retry_after)},
+        )
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"PDF generation failed: {e}")
+
+
+# ─── BACKGROUND REPORT JOBS ─────────────────────────────────────
+
+@router.post("/jobs", status_code=202)
+async def submit_report_job(
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    if not current_user.is_pro:
+        raise HTTPException(status_code=403, detail="Upgrade to Pro to export PDF")
+    return await report_jobs.submit(current_user.id, [current_user.id], str(request.base_url))
+
+
+@router.get("/jobs/{job_id}")
+async def report_job_status(job_id: str, current_user: User = Depends(get_current_user)):
+    job = await report_jobs.get(job_id, owner_id=current_user.id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}/events")
+async def report_job_events(job_id: str, current_user: User = Depends(get_current_user)):
+    # server-sent events, one per status change, closed once the job finishes
+    async def events():
+        async for job in report_jobs.watch(job_id, owner_id=current_user.id):
+            yield f"data: {json.dumps(job)}\n\n"
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@router.get("/jobs/{job_id}/download")
+async def report_job_download(job_id: str, current_user: User = Depends(get_current_user)):
+    path = await report_jobs.artifact(job_id, owner_id=current_user.id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Report not ready")
+    return FileResponse(path, media_type="application/pdf", filename="ce_report.pdf")
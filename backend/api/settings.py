@@ -2,7 +2,12 @@
 
 from fastapi import APIRouter, Depends, Form, Request, HTTPException
 from fastapi.responses import RedirectResponse
-from ..services.supabase_client import supabase
+from ..services.supabase_client import supabase, user_auth_client
+from ..services.profiles import invalidate_profile
+from ..services.reference import reference
+from ..services.resilience import UpstreamUnavailable
+from ..core.assets import assets
+from ..core.etag import make_etag, not_modified, with_etag
 from ..deps import get_current_user, User
 from ..jinja_env import templates
 import json
@@ -14,13 +19,16 @@ async def view_settings(
     request: Request,
     current_user: User = Depends(get_current_user)
 ):
-    # Fetch list of US states for dropdown
-    states_res = await supabase.table("states").select("code,name").execute()
-    states = states_res.data or []
-    return templates.TemplateResponse(
+    # List of US states for dropdown, from the reference-data cache
+    states = await reference.get("states")
+    etag = make_etag(states.etag, current_user.email, current_user.state, assets.version)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    return with_etag(templates.TemplateResponse(
         "settings.html",
-        {"request": request, "user": current_user, "states": states}
-    )
+        {"request": request, "user": current_user, "states": states.rows}
+    ), etag)
 
 @router.post("")
 async def update_settings(
@@ -38,18 +46,20 @@ async def update_settings(
             if not session:
                 raise HTTPException(401, "Not authenticated")
             token_data = json.loads(session)
-            supabase.auth.set_session(
+            # per-request GoTrue client, so no other request sees this session
+            user_auth = user_auth_client()
+            await user_auth.set_session(
                 token_data["access_token"],
                 token_data["refresh_token"]
             )
-            await supabase.auth.api.update_user(
-                token_data["access_token"],
-                {"password": password}
-            )
+            await user_auth.update_user({"password": password})
 
         # Update user state flag
         await supabase.table("users").update(update_data).eq("id", current_user.id).execute()
+        await invalidate_profile(current_user.id)
 
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update settings: {e}")
 
@@ -0,0 +1,191 @@
+# backend/api/upload.py
+
+from typing import List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
+from postgrest import APIError
+
+from ..cert_parser import CertificateFields, cert_parser
+from ..core.config import settings
+from ..core.multipart import FileStream
+from ..deps import get_current_user_id
+from ..jinja_env import templates
+from ..services.compliance import compliance
+from ..services.importer import CourseIndex, detect_format, import_records, iter_chunks
+from ..services.reference import reference
+from ..services.storage import FileTooLarge, certificate_store
+from ..services.supabase_client import supabase
+from ..services.versions import data_versions
+from .ce import CERecordIn
+
+router = APIRouter(prefix="/ce", tags=["upload"])
+
+# room for the multipart boundaries and part headers around the file itself
+_MULTIPART_OVERHEAD = 16 * 1024
+
+
+# Bulk import of CE records from a CSV, JSON or NDJSON file
+@router.post("/records/import")
+async def import_ce_records(
+    file: UploadFile = File(...),
+    user_id: str = Depends(get_current_user_id)
+):
+    fmt = detect_format(file.filename, file.content_type)
+    try:
+        report = await import_records(
+            user_id,
+            iter_chunks(file.file, fmt, settings.import_batch_size),
+            CERecordIn,
+            max_rows=settings.import_max_rows,
+        )
+    finally:
+        await file.close()
+    if report["inserted"]:
+        # many rows at once: rebuild the aggregate rather than patch it row by row
+        await compliance.invalidate(user_id)
+        await data_versions.bump(user_id)
+    return report
+
+
+async def _read_certificates(files: List[UploadFile]) -> List[Tuple[Optional[str], bytes]]:
+    if len(files) > settings.cert_max_files:
+        raise HTTPException(status_code=400, detail=f"Upload at most {settings.cert_max_files} certificates at once")
+    contents = []
+    for file in files:
+        try:
+            data = await file.read(settings.cert_max_bytes + 1)
+        finally:
+            await file.close()
+        if len(data) > settings.cert_max_bytes:
+            raise HTTPException(status_code=413, detail=f"{file.filename} is too large")
+        contents.append((file.filename, data))
+    return contents
+
+
+async def _parse_certificates(files: List[UploadFile]) -> List[CertificateFields]:
+    # all files are parsed concurrently in the certificate pool
+    parsed = await cert_parser.parse_many(await _read_certificates(files))
+    courses = await CourseIndex.load()
+    for cert in parsed:
+        cert.course_id = courses.match(cert.course_title)
+    return parsed
+
+
+# Read course, provider, date and hours off certificates without saving anything
+@router.post("/certificates/parse", response_model=List[CertificateFields])
+async def parse_certificates(
+    files: List[UploadFile] = File(...),
+    user_id: str = Depends(get_current_user_id)
+):
+    return await _parse_certificates(files)
+
+
+# Create a CE record for every certificate that could be read completely
+@router.post("/certificates/import")
+async def import_certificates(
+    files: List[UploadFile] = File(...),
+    user_id: str = Depends(get_current_user_id)
+):
+    parsed = await _parse_certificates(files)
+    rows = [{**cert.record(), "user_id": user_id} for cert in parsed if cert.complete]
+    if rows:
+        try:
+            await supabase.table("ce_records").insert(rows).execute()
+        except APIError as e:
+            raise HTTPException(status_code=500, detail=e.message)
+        await compliance.invalidate(user_id)
+        await data_versions.bump(user_id)
+    return {
+        "inserted": len(rows),
+        # incomplete ones come back so the user can finish them by hand
+        "needs_review": [cert for cert in parsed if not cert.complete],
+    }
+
+
+# Pre-fill the upload form from one certificate
+@router.post("/records/upload/certificate")
+async def prefill_from_certificate(
+    request: Request,
+    file: UploadFile = File(...),
+    user_id: str = Depends(get_current_user_id)
+):
+    cert, = await _parse_certificates([file])
+    prefill = {
+        "course_id": cert.course_id,
+        "date_completed": cert.date_completed,
+        "hours_earned": cert.hours_earned,
+        "notes": cert.notes(),
+    }
+    error = cert.error
+    if not error and cert.contact_hours and cert.hours_earned is None:
+        error = f"The certificate shows {cert.contact_hours:g} contact hours; CE records take whole hours, so please enter them."
+    if not error and not cert.complete:
+        error = "Some details couldn't be read from the certificate; please check the form."
+    return templates.TemplateResponse("upload.html", {
+        "request": request,
+        "courses": await reference.rows("courses"),
+        "prefill": prefill,
+        "error": error,
+    })
+
+
+# Attach a certificate file to a CE record, streamed straight to storage
+@router.post("/records/{record_id}/certificate")
+async def upload_certificate(
+    record_id: str,
+    request: Request,
+    user_id: str = Depends(get_current_user_id)
+):
+    # refuse an oversized body before reading any of it
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > settings.cert_max_bytes + _MULTIPART_OVERHEAD:
+        raise HTTPException(status_code=413, detail="Certificate is too large")
+
+    record = await (
+        supabase
+        .table("ce_records")
+        .select("id")
+        .eq("id", record_id)
+        .eq("user_id", user_id)
+        .limit(1)
+        .execute()
+    )
+    if not record.data:
+        raise HTTPException(status_code=404, detail="CE record not found")
+
+    upload = FileStream(request)
+    try:
+        staged = await certificate_store.stage(upload.chunks())
+    except FileTooLarge:
+        raise HTTPException(status_code=413, detail="Certificate is too large")
+
+    try:
+        # the same file attached to the same record again is a no-op
+        existing = await (
+            supabase
+            .table("ce_certificates")
+            .select("*")
+            .eq("record_id", record_id)
+            .eq("sha256", staged.sha256)
+            .limit(1)
+            .execute()
+        )
+        if existing.data:
+            return existing.data[0]
+        key = await certificate_store.commit(staged, upload.content_type)
+    finally:
+        # commit() moved it already; on any other way out it's garbage
+        staged.path.unlink(missing_ok=True)
+    try:
+        res = await supabase.table("ce_certificates").insert({
+            "record_id": record_id,
+            "user_id": user_id,
+            "storage_key": key,
+            "sha256": staged.sha256,
+            "size_bytes": staged.size_bytes,
+            "content_type": upload.content_type,
+            "filename": upload.filename,
+        }).execute()
+    except APIError as e:
+        raise HTTPException(status_code=500, detail=e.message)
+    return res.data[0]
@@ -0,0 +1,186 @@
+# backend/cert_parser.py
+
+import asyncio
+import hashlib
+import io
+import re
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from backend.core.cache import TTLCache
+from backend.core.config import settings
+from backend.core.process_pool import ProcessPool
+
+
+class CertificateFields(BaseModel):
+    """What could be read off one uploaded certificate."""
+    filename: Optional[str] = None
+    sha256: str
+    course_title: Optional[str] = None
+    provider: Optional[str] = None
+    date_completed: Optional[date] = None
+    contact_hours: Optional[float] = None
+    course_id: Optional[str] = None  # filled in by matching course_title against courses
+    error: Optional[str] = None
+
+    @property
+    def complete(self) -> bool:
+        return bool(self.course_id and self.date_completed and self.hours_earned)
+
+    @property
+    def hours_earned(self) -> Optional[int]:
+        # ce_records keeps whole hours; fractional credit is never rounded,
+        # so such a certificate goes to review for the user to enter
+        if self.contact_hours and self.contact_hours.is_integer():
+            return int(self.contact_hours)
+        return None
+
+    def notes(self) -> Optional[str]:
+        notes = [f"Provider: {self.provider}"] if self.provider else []
+        if self.contact_hours and self.contact_hours != self.hours_earned:
+            notes.append(f"{self.contact_hours:g} contact hours")
+        if self.filename:
+            notes.append(f"Certificate: {self.filename}")
+        return "; ".join(notes) or None
+
+    def record(self) -> Dict[str, Any]:
+        """ce_records fields for a complete certificate."""
+        return {
+            "course_id": self.course_id,
+            "date_completed": self.date_completed.isoformat(),
+            "hours_earned": self.hours_earned,
+            "notes": self.notes(),
+        }
+
+
+# ─── text extraction (runs in worker processes) ─────────────────
+
+def _pdf_text(data: bytes) -> str:
+    from pypdf import PdfReader
+    reader = PdfReader(io.BytesIO(data))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def extract_text(data: bytes) -> str:
+    if data.startswith(b"%PDF"):
+        return _pdf_text(data)
+    for encoding in ("utf-8-sig", "utf-16"):
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    raise ValueError("Unsupported certificate format; upload a PDF or text file")
+
+
+# ─── field extraction ───────────────────────────────────────────
+
+def _labelled(label: str) -> "re.Pattern[str]":
+    return re.compile(rf"^\s*(?:{label})\s*(?::|-|–)\s*(.+?)\s*$", re.I | re.M)
+
+
+_TITLE = _labelled(r"course(?:\s+title)?|activity(?:\s+title)?|program(?:\s+title)?|title|topic")
+_PROVIDER = _labelled(
+    r"(?:accredited\s+)?provider(?:\s+name)?|presented\s+by|provided\s+by|sponsored\s+by|offered\s+by|organization"
+)
+_DATE = _labelled(r"date\s+(?:of\s+)?completion|completion\s+date|date\s+completed|completed\s+on|date")
+_HOURS = _labelled(
+    r"(?:total\s+)?(?:contact|ce|cne|credit|nursing(?:\s+contact)?)\s+hours(?:\s+awarded)?|hours(?:\s+(?:awarded|earned))?|ceus?|credits"
+)
+_COMPLETED = re.compile(
+    r"(?:has\s+(?:successfully\s+)?completed|for\s+(?:successfully\s+)?completing|completion\s+of)"
+    r"(?:\s+the\s+(?:course|activity|program))?\s*[:\-]?\s*[\"“]?([^\"”\n]*)",
+    re.I,
+)
+_HOURS_ANYWHERE = re.compile(r"(\d{1,3}(?:\.\d{1,2})?)\s*(?:total\s+)?(?:nursing\s+)?(?:contact|ce|cne|credit)?\s*hours?\b", re.I)
+_NUMBER = re.compile(r"\d{1,3}(?:\.\d{1,2})?")
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE_ANYWHERE = re.compile(
+    rf"\b(\d{{4}}-\d{{1,2}}-\d{{1,2}}|\d{{1,2}}/\d{{1,2}}/\d{{2,4}}"
+    rf"|{_MONTH}\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}}|\d{{1,2}}(?:st|nd|rd|th)?\s+{_MONTH},?\s+\d{{4}})\b",
+    re.I,
+)
+_DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y", "%B %d %Y", "%b %d %Y", "%d %B %Y", "%d %b %Y")
+
+
+def parse_date(value: str) -> Optional[date]:
+    for found in _DATE_ANYWHERE.findall(value):
+        cleaned = re.sub(r"(\d)(st|nd|rd|th)\b", r"\1", found.replace(",", " ").replace(".", " "), flags=re.I)
+        cleaned = " ".join(cleaned.split()).replace("Sept ", "Sep ").replace("sept ", "sep ")
+        for fmt in _DATE_FORMATS:
+            try:
+                return datetime.strptime(cleaned, fmt).date()
+            except ValueError:
+                continue
+    return None
+
+
+def _first(pattern: "re.Pattern[str]", text: str) -> Optional[str]:
+    m = pattern.search(text)
+    return m.group(1).strip() if m and m.group(1).strip() else None
+
+
+def parse_fields(text: str) -> Dict[str, Any]:
+    """Pull course title, provider, completion date and contact hours out of certificate text."""
+    text = "\n".join(" ".join(line.split()) for line in text.splitlines())
+
+    title = _first(_TITLE, text) or _first(_COMPLETED, text)
+
+    date_line = _first(_DATE, text)
+    completed = parse_date(date_line) if date_line else None
+    completed = completed or parse_date(text)
+
+    hours = None
+    hours_line = _first(_HOURS, text)
+    if hours_line and _NUMBER.search(hours_line):
+        hours = float(_NUMBER.search(hours_line).group())
+    elif _HOURS_ANYWHERE.search(text):
+        hours = float(_HOURS_ANYWHERE.search(text).group(1))
+
+    return {
+        "course_title": title,
+        "provider": _first(_PROVIDER, text),
+        "date_completed": completed,
+        "contact_hours": hours or None,
+    }
+
+
+def _parse(data: bytes) -> Dict[str, Any]:
+    # runs in a worker process; failures come back as data so they cache too
+    try:
+        return parse_fields(extract_text(data))
+    except Exception as e:
+        return {"error": str(e) or type(e).__name__}
+
+
+# ─── pool ───────────────────────────────────────────────────────
+
+class CertParser:
+    """
+    Parses certificates in a process pool, off the event loop. Results are
+    cached by a hash of the file content, so re-uploading the same
+    certificate is free, and identical parses already in flight are shared.
+    """
+
+    def __init__(self, workers: int, cache: TTLCache):
+        self._pool = ProcessPool(workers, cache)
+
+    async def parse(self, data: bytes, filename: Optional[str] = None, sha256: Optional[str] = None) -> CertificateFields:
+        """Pass `sha256` when the caller already hashed the content."""
+        key = sha256 or hashlib.sha256(data).hexdigest()
+        fields = await self._pool.run(key, _parse, data)
+        return CertificateFields(filename=filename, sha256=key, **fields)
+
+    async def parse_many(self, files: List[Tuple[Optional[str], bytes]]) -> List[CertificateFields]:
+        """Parse (filename, content) pairs concurrently across the pool."""
+        return list(await asyncio.gather(*(self.parse(data, name) for name, data in files)))
+
+    def shutdown(self) -> None:
+        self._pool.shutdown()
+
+
+cert_parser = CertParser(
+    workers=settings.cert_workers,
+    cache=TTLCache(maxsize=settings.cert_cache_size, ttl=settings.cert_cache_ttl),
+)
@@ -0,0 +1,121 @@
+# backend/core/assets.py
+
+import json
+import mimetypes
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import anyio.to_thread
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from backend.core.config import BASE_DIR
+
+# scripts/build_assets.py writes fingerprinted copies to static/<DIST>/
+DIST = "dist"
+MANIFEST = "manifest.json"
+COMPRESSIBLE = {".css", ".js", ".svg", ".json", ".map", ".txt", ".xml", ".html"}
+IMMUTABLE = "public, max-age=31536000, immutable"
+# preferred first
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+class AssetManifest:
+    """
+    Logical asset path -> fingerprinted URL, from the manifest written by
+    scripts/build_assets.py. Paths missing from the manifest (or no build
+    at all, e.g. in development) fall back to the plain /static URL.
+    """
+
+    def __init__(self, static_dir: Path, public_path: str = "/static"):
+        self._path = static_dir / DIST / MANIFEST
+        self._public = public_path.rstrip("/")
+        self._entries: Dict[str, str] = {}
+        self._mtime: Optional[float] = None
+
+    def _load(self) -> Dict[str, str]:
+        # re-read after a rebuild; one stat per lookup
+        try:
+            mtime = os.stat(self._path).st_mtime
+        except FileNotFoundError:
+            self._entries, self._mtime = {}, None
+            return self._entries
+        if mtime != self._mtime:
+            with open(self._path) as f:
+                self._entries = json.load(f)
+            self._mtime = mtime
+        return self._entries
+
+    @property
+    def version(self) -> str:
+        """Changes with every build; part of the ETag of pages that link assets."""
+        self._load()
+        return str(self._mtime or "")
+
+    def url(self, path: str) -> str:
+        path = path.lstrip("/")
+        hashed = self._load().get(path)
+        if hashed is None:
+            return f"{self._public}/{path}"
+        return f"{self._public}/{DIST}/{hashed}"
+
+
+def accepts_encoding(accept_encoding: str, encoding: str) -> bool:
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() not in (encoding, "*"):
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that, for fingerprinted files under dist/, serves the .br or
+    .gz variant the client accepts and marks the response immutable: the
+    URL changes whenever the content does. Other paths behave as before.
+    """
+
+    async def _variant(self, path: str, scope: Scope) -> Optional[Tuple[str, str, os.stat_result]]:
+        accept = Headers(scope=scope).get("accept-encoding", "")
+        for encoding, ext in _ENCODINGS:
+            if not accepts_encoding(accept, encoding):
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + ext)
+            if stat_result is not None:
+                return encoding, full_path, stat_result
+        return None
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if not path.startswith(DIST + os.sep) or path.endswith(MANIFEST):
+            return await super().get_response(path, scope)
+
+        variant = await self._variant(path, scope)
+        if variant is None:
+            response = await super().get_response(path, scope)
+        else:
+            encoding, full_path, stat_result = variant
+            response = self.file_response(full_path, stat_result, scope)
+            response.headers["content-encoding"] = encoding
+            media_type = mimetypes.guess_type(path)[0]
+            if media_type and response.status_code == 200:
+                response.headers["content-type"] = (
+                    f"{media_type}; charset=utf-8" if media_type.startswith("text/") else media_type
+                )
+        if response.status_code in (200, 304):
+            response.headers["cache-control"] = IMMUTABLE
+            if Path(path).suffix in COMPRESSIBLE:
+                response.headers["vary"] = "Accept-Encoding"
+        return response
+
+
+assets = AssetManifest(BASE_DIR / "static")
@@ -0,0 +1,182 @@
+# backend/core/config.py
+
+import os
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+from pydantic import BaseModel
+
+# Project-root .env holds the Supabase credentials
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+load_dotenv(BASE_DIR / ".env")
+
+
+class Settings(BaseModel):
+    # "supabase", or "fake" for the local SQLite stand-in
+    # (services/fake_supabase.py), seeded with synthetic data on startup
+    data_backend: str = os.getenv("DATA_BACKEND", "supabase")
+    fake_db: str = os.getenv("FAKE_DB", ":memory:")
+    fake_seed_users: int = int(os.getenv("FAKE_SEED_USERS", "50"))
+    fake_seed_courses: int = int(os.getenv("FAKE_SEED_COURSES", "200"))
+    fake_seed_records: int = int(os.getenv("FAKE_SEED_RECORDS", "200"))  # per user
+    fake_seed: int = int(os.getenv("FAKE_SEED", "0"))
+    # added to every fake query, to stand in for the network round trip
+    fake_latency_ms: float = float(os.getenv("FAKE_LATENCY_MS", "0"))
+    # rows per read, like PostgREST's max-rows (Supabase's default); 0 = no cap
+    fake_max_rows: int = int(os.getenv("FAKE_MAX_ROWS", "1000"))
+
+    # Supabase project
+    supabase_url: str = os.getenv("SUPABASE_URL", "")
+    supabase_key: str = os.getenv("SUPABASE_KEY", "")
+
+    # Shared async HTTP pool (services/supabase_client.py)
+    supabase_http2: bool = os.getenv("SUPABASE_HTTP2", "1") not in ("0", "false", "False")
+    supabase_max_connections: int = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "100"))
+    supabase_max_keepalive: int = int(os.getenv("SUPABASE_MAX_KEEPALIVE", "20"))
+    supabase_keepalive_expiry: float = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "30"))
+    supabase_timeout: float = float(os.getenv("SUPABASE_TIMEOUT", "10"))
+    supabase_connect_timeout: float = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "5"))
+
+    # Data-client resilience (services/resilience.py): a deadline per call,
+    # jittered retries for reads, and a circuit breaker over the upstream
+    supabase_call_timeout: float = float(os.getenv("SUPABASE_CALL_TIMEOUT", "5"))
+    supabase_read_retries: int = int(os.getenv("SUPABASE_READ_RETRIES", "2"))
+    supabase_retry_base: float = float(os.getenv("SUPABASE_RETRY_BASE", "0.1"))
+    breaker_threshold: int = int(os.getenv("BREAKER_THRESHOLD", "5"))
+    breaker_reset_timeout: float = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+    # last good dashboard/status data, served marked stale during an outage
+    stale_cache_size: int = int(os.getenv("STALE_CACHE_SIZE", "10000"))
+    stale_cache_ttl: int = int(os.getenv("STALE_CACHE_TTL", "86400"))
+
+    # Local JWT verification: HS256 projects use the JWT secret,
+    # asymmetric-key projects publish a JWKS endpoint instead.
+    supabase_jwt_secret: Optional[str] = os.getenv("SUPABASE_JWT_SECRET") or None
+    supabase_jwks_url: Optional[str] = os.getenv("SUPABASE_JWKS_URL") or None
+    jwt_audience: str = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+
+    # Verified-session cache
+    auth_cache_size: int = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+    auth_cache_ttl: int = int(os.getenv("AUTH_CACHE_TTL", "300"))
+
+    # Login/signup throttling (core/ratelimit.py): token buckets per client IP,
+    # per signup email and for failed logins per email, kept in process or,
+    # with RATELIMIT_BACKEND=sqlite, in a file every worker on the host shares
+    ratelimit_backend: str = os.getenv("RATELIMIT_BACKEND", "memory")
+    ratelimit_db: str = os.getenv("RATELIMIT_DB", str(BASE_DIR / "var" / "ratelimit.sqlite3"))
+    login_ip_per_minute: float = float(os.getenv("LOGIN_IP_PER_MINUTE", "20"))
+    login_ip_burst: int = int(os.getenv("LOGIN_IP_BURST", "30"))
+    signup_ip_per_minute: float = float(os.getenv("SIGNUP_IP_PER_MINUTE", "5"))
+    signup_ip_burst: int = int(os.getenv("SIGNUP_IP_BURST", "10"))
+    signup_email_per_minute: float = float(os.getenv("SIGNUP_EMAIL_PER_MINUTE", os.getenv("AUTH_EMAIL_PER_MINUTE", "5")))
+    signup_email_burst: int = int(os.getenv("SIGNUP_EMAIL_BURST", os.getenv("AUTH_EMAIL_BURST", "10")))
+    login_failures_per_minute: float = float(os.getenv("LOGIN_FAILURES_PER_MINUTE", "5"))
+    login_failures_burst: int = int(os.getenv("LOGIN_FAILURES_BURST", "10"))
+    # GoTrue calls in flight per worker, and how long a call may wait for a slot
+    auth_max_concurrency: int = int(os.getenv("AUTH_MAX_CONCURRENCY", "16"))
+    auth_max_wait: float = float(os.getenv("AUTH_MAX_WAIT", "1"))
+
+    # users-table profile cache (is_pro, state)
+    profile_cache_size: int = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+    profile_cache_ttl: int = int(os.getenv("PROFILE_CACHE_TTL", "60"))
+
+    # CE compliance aggregates (services/compliance.py)
+    compliance_cache_size: int = int(os.getenv("COMPLIANCE_CACHE_SIZE", "50000"))
+    compliance_cache_ttl: int = int(os.getenv("COMPLIANCE_CACHE_TTL", "300"))
+
+    # Per-user data versions behind the dashboard/report/status ETags, and the
+    # gzipped HTML kept per (user, version). Versions are kept in a file every
+    # worker shares (DATA_VERSION_BACKEND=memory for a single process); each
+    # worker rechecks its per-user caches against them at least this often
+    data_version_backend: str = os.getenv("DATA_VERSION_BACKEND", "sqlite")
+    data_version_db: str = os.getenv("DATA_VERSION_DB", str(BASE_DIR / "var" / "versions.sqlite3"))
+    data_version_ttl: int = int(os.getenv("DATA_VERSION_TTL", os.getenv("COMPLIANCE_CACHE_TTL", "300")))
+    page_cache_size: int = int(os.getenv("PAGE_CACHE_SIZE", "2000"))
+    page_cache_ttl: int = int(os.getenv("PAGE_CACHE_TTL", "300"))
+
+    # CE record listings (keyset pages)
+    records_page_size: int = int(os.getenv("RECORDS_PAGE_SIZE", "25"))
+    records_max_page_size: int = int(os.getenv("RECORDS_MAX_PAGE_SIZE", "200"))
+    # rows per upstream request when streaming CSV exports
+    export_page_size: int = int(os.getenv("EXPORT_PAGE_SIZE", "1000"))
+    # ids per `in.(...)` filter (sweeps, org exports); ids travel in the
+    # query string, and 100 uuids keep the URL well under proxy limits
+    ids_per_query: int = int(os.getenv("IDS_PER_QUERY", "100"))
+
+    # Bulk CE record import (api/upload.py)
+    import_batch_size: int = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+    import_max_rows: int = int(os.getenv("IMPORT_MAX_ROWS", "5000"))
+
+    # Certificate parsing pool (cert_parser.py)
+    cert_workers: int = int(os.getenv("CERT_WORKERS", "2"))
+    cert_cache_size: int = int(os.getenv("CERT_CACHE_SIZE", "1024"))
+    cert_cache_ttl: int = int(os.getenv("CERT_CACHE_TTL", "86400"))
+    cert_max_files: int = int(os.getenv("CERT_MAX_FILES", "10"))
+    cert_max_bytes: int = int(os.getenv("CERT_MAX_BYTES", str(10 * 1024 * 1024)))
+
+    # Stored certificate files (services/storage.py); set CERT_STORAGE_BUCKET
+    # to keep them in Supabase Storage instead of on local disk
+    cert_storage_dir: str = os.getenv("CERT_STORAGE_DIR", str(BASE_DIR / "var" / "certificates"))
+    cert_storage_bucket: Optional[str] = os.getenv("CERT_STORAGE_BUCKET") or None
+    upload_chunk_size: int = int(os.getenv("UPLOAD_CHUNK_SIZE", str(256 * 1024)))
+
+    # PDF rendering pool (services/pdf.py)
+    pdf_workers: int = int(os.getenv("PDF_WORKERS", "2"))
+    pdf_max_queue: int = int(os.getenv("PDF_MAX_QUEUE", "8"))
+    pdf_retry_after: int = int(os.getenv("PDF_RETRY_AFTER", "5"))
+    pdf_cache_size: int = int(os.getenv("PDF_CACHE_SIZE", "128"))
+    pdf_cache_ttl: int = int(os.getenv("PDF_CACHE_TTL", "3600"))
+
+    # Background report jobs (services/report_jobs.py)
+    report_jobs_db: str = os.getenv("REPORT_JOBS_DB", str(BASE_DIR / "var" / "report_jobs.sqlite3"))
+    report_artifacts_dir: str = os.getenv("REPORT_ARTIFACTS_DIR", str(BASE_DIR / "var" / "reports"))
+    report_job_workers: int = int(os.getenv("REPORT_JOB_WORKERS", "1"))
+    report_job_retention: int = int(os.getenv("REPORT_JOB_RETENTION", "86400"))
+    # a running job's lease; its worker renews it, and a job whose lease ran
+    # out (the process died) is queued again
+    report_job_lease: float = float(os.getenv("REPORT_JOB_LEASE", "120"))
+
+    # Stripe billing; webhook events are queued and processed in the
+    # background (services/stripe_events.py)
+    stripe_secret_key: Optional[str] = os.getenv("STRIPE_SECRET_KEY") or None
+    stripe_webhook_secret: Optional[str] = os.getenv("STRIPE_WEBHOOK_SECRET") or None
+    stripe_events_db: str = os.getenv("STRIPE_EVENTS_DB", str(BASE_DIR / "var" / "stripe_events.sqlite3"))
+    stripe_event_workers: int = int(os.getenv("STRIPE_EVENT_WORKERS", "2"))
+    stripe_event_max_attempts: int = int(os.getenv("STRIPE_EVENT_MAX_ATTEMPTS", "8"))
+    stripe_event_retry_base: float = float(os.getenv("STRIPE_EVENT_RETRY_BASE", "5"))
+    # event ids are kept this long to drop Stripe's redeliveries (it retries for 3 days)
+    stripe_event_retention: int = int(os.getenv("STRIPE_EVENT_RETENTION", str(7 * 86400)))
+    # a running event's lease, renewed by its worker; see report_job_lease
+    stripe_event_lease: float = float(os.getenv("STRIPE_EVENT_LEASE", "60"))
+
+    # Renewal reminders pushed through OneSignal (services/reminders.py)
+    onesignal_app_id: Optional[str] = os.getenv("ONESIGNAL_APP_ID") or None
+    onesignal_api_key: Optional[str] = os.getenv("ONESIGNAL_API_KEY") or None
+    onesignal_api_url: str = os.getenv("ONESIGNAL_API_URL", "https://api.onesignal.com")
+    onesignal_batch_size: int = int(os.getenv("ONESIGNAL_BATCH_SIZE", "2000"))
+    onesignal_rate_per_sec: float = float(os.getenv("ONESIGNAL_RATE_PER_SEC", "5"))
+    onesignal_max_attempts: int = int(os.getenv("ONESIGNAL_MAX_ATTEMPTS", "5"))
+    reminders_db: str = os.getenv("REMINDERS_DB", str(BASE_DIR / "var" / "reminders.sqlite3"))
+    # days before next_renewal_date at which a reminder goes out
+    reminder_windows: str = os.getenv("REMINDER_WINDOWS", "60,30,7")
+
+    # Jinja (jinja_env.py): compiled templates are kept on disk across
+    # restarts; turn auto-reload off in production to skip the mtime checks
+    template_cache_dir: str = os.getenv("TEMPLATE_CACHE_DIR", str(BASE_DIR / "var" / "jinja"))
+    template_auto_reload: bool = os.getenv("TEMPLATE_AUTO_RELOAD", "1") not in ("0", "false", "False")
+    # streamed pages are flushed in pieces of about this many bytes
+    template_stream_chunk: int = int(os.getenv("TEMPLATE_STREAM_CHUNK", str(16 * 1024)))
+
+    # Reference tables: courses, states, ce_requirements (services/reference.py)
+    reference_cache_ttl: int = int(os.getenv("REFERENCE_CACHE_TTL", "3600"))
+
+    # Requests slower than this are logged with a per-call breakdown (core/metrics.py)
+    slow_request_ms: float = float(os.getenv("SLOW_REQUEST_MS", "500"))
+    # Server-Timing goes to admin-token requests only; set for local profiling
+    server_timing_public: bool = os.getenv("SERVER_TIMING", "0") not in ("0", "false", "False")
+
+    # Shared secret for /admin routes; admin routes are off when unset
+    admin_token: Optional[str] = os.getenv("ADMIN_TOKEN") or None
+
+
+settings = Settings()
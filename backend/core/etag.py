@@ -0,0 +1,31 @@
+# backend/core/etag.py
+
+import hashlib
+import json
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over anything JSON-serialisable (dates etc. via str)."""
+    raw = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A 304 for the caller to return when the browser already has `etag`."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    candidates = {tag.strip() for tag in header.split(",")}
+    if "*" in candidates or etag in candidates or f"W/{etag}" in candidates:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+    return None
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    # private + no-cache: browsers keep the body but always revalidate
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,190 @@
+# backend/core/metrics.py
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import httpx
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# seconds; covers a cached page (~1ms) up to a slow PDF
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [*labels, extra] if extra else list(labels)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_fmt_labels(labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is one bisect and a few additions."""
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self._buckets = tuple(buckets)
+        # per label set: [count per bucket..., +Inf count], sum
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        i = bisect_left(self._buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self._buckets) + 1), [0.0])
+            entry[0][i] += 1
+            entry[1][0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total) in sorted(self._values.items()):
+                running = 0
+                for bound, count in zip(self._buckets, counts):
+                    running += count
+                    lines.append(f"{self.name}_bucket{_fmt_labels(labels, ('le', f'{bound:g}'))} {running}")
+                running += counts[-1]
+                lines.append(f"{self.name}_bucket{_fmt_labels(labels, ('le', '+Inf'))} {running}")
+                lines.append(f"{self.name}_sum{_fmt_labels(labels)} {total[0]:.6f}")
+                lines.append(f"{self.name}_count{_fmt_labels(labels)} {running}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List = []
+
+    def counter(self, name: str, help: str) -> Counter:
+        metric = Counter(name, help)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+
+registry = Registry()
+request_duration = registry.histogram(
+    "credenticare_request_duration_seconds", "Time to response headers, per route."
+)
+requests_total = registry.counter(
+    "credenticare_requests_total", "Requests served, per route and status."
+)
+upstream_duration = registry.histogram(
+    "credenticare_upstream_duration_seconds",
+    "Time spent in Supabase/auth calls, template renders and PDF renders.",
+)
+upstream_failures = registry.counter(
+    "credenticare_upstream_failures_total",
+    "Supabase calls that timed out, failed in transport or got a server error (services/resilience.py).",
+)
+
+
+# ─── per-request tracing ────────────────────────────────────────
+
+class Trace:
+    """Count and total seconds of each kind of work done for one request."""
+
+    __slots__ = ("spans",)
+
+    def __init__(self):
+        self.spans: Dict[str, List[float]] = {}
+
+    def add(self, kind: str, seconds: float) -> None:
+        span = self.spans.get(kind)
+        if span is None:
+            self.spans[kind] = [1, seconds]
+        else:
+            span[0] += 1
+            span[1] += seconds
+
+    def breakdown(self) -> str:
+        return ", ".join(f"{kind}={n:.0f}x/{secs * 1000:.1f}ms" for kind, (n, secs) in self.spans.items())
+
+    def server_timing(self) -> str:
+        return ", ".join(
+            f'{kind};dur={secs * 1000:.1f};desc="{n:.0f} calls"' for kind, (n, secs) in self.spans.items()
+        )
+
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+
+def record(kind: str, seconds: float) -> None:
+    upstream_duration.observe(seconds, kind=kind)
+    trace = current_trace.get()
+    if trace is not None:
+        trace.add(kind, seconds)
+
+
+@contextmanager
+def span(kind: str) -> Iterator[None]:
+    """Time a block as `kind`, e.g. `with span("pdf"): ...` (works around awaits too)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(kind, time.perf_counter() - start)
+
+
+# ─── httpx hooks for the shared Supabase pool ───────────────────
+
+def _kind(url: httpx.URL) -> str:
+    path = url.path
+    if path.startswith("/auth/"):
+        return "auth"
+    if path.startswith("/storage/"):
+        return "storage"
+    return "supabase"
+
+
+async def _on_request(request: httpx.Request) -> None:
+    request.extensions["metrics_start"] = time.perf_counter()
+
+
+async def _on_response(response: httpx.Response) -> None:
+    start = response.request.extensions.get("metrics_start")
+    if start is not None:
+        # runs once headers are in, which is where the waiting is
+        record(_kind(response.request.url), time.perf_counter() - start)
+
+
+HTTPX_HOOKS = {"request": [_on_request], "response": [_on_response]}
@@ -0,0 +1,86 @@
+# backend/core/multipart.py
+
+from typing import AsyncIterator, List, Optional
+
+from fastapi import HTTPException, Request
+from python_multipart.multipart import MultipartParseError, MultipartParser, parse_options_header
+
+
+class FileStream:
+    """
+    Reads one file field of a multipart/form-data request straight off the
+    wire. Unlike request.form(), nothing is spooled: each network chunk is
+    parsed and its file bytes handed on before the next chunk is read.
+    Other fields are ignored. `filename` and `content_type` are set once the
+    part's headers have been seen.
+    """
+
+    def __init__(self, request: Request, field: str = "file"):
+        self._request = request
+        self._field = field.encode()
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self._capturing = False
+        self._pending: List[bytes] = []
+        self._headers: List[tuple] = []
+        self._header_name = b""
+        self._header_value = b""
+
+    # ─── parser callbacks ───────────────────────────────────────
+
+    def _on_part_begin(self) -> None:
+        self._headers = []
+        self._capturing = False
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers.append((self._header_name.lower(), self._header_value))
+        self._header_name = self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        headers = dict(self._headers)
+        _, options = parse_options_header(headers.get(b"content-disposition"))
+        if options.get(b"name") == self._field and b"filename" in options and self.filename is None:
+            self._capturing = True
+            self.filename = options[b"filename"].decode("utf-8", "replace")
+            content_type = headers.get(b"content-type")
+            self.content_type = content_type.decode("latin-1") if content_type else None
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._capturing:
+            self._pending.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        self._capturing = False
+
+    # ─── stream ─────────────────────────────────────────────────
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        content_type, params = parse_options_header(self._request.headers.get("content-type"))
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+        parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+        async for chunk in self._request.stream():
+            try:
+                parser.write(chunk)
+            except MultipartParseError as e:
+                raise HTTPException(status_code=400, detail=f"Malformed upload: {e}")
+            for piece in self._pending:
+                yield piece
+            self._pending.clear()
+        parser.finalize()
+        if self.filename is None:
+            raise HTTPException(status_code=400, detail=f"Missing file field '{self._field.decode()}'")
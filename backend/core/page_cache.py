@@ -0,0 +1,77 @@
+# backend/core/page_cache.py
+
+import gzip
+from typing import AsyncIterator, Awaitable, Callable, Hashable, List, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+from backend.core.assets import accepts_encoding
+from backend.core.cache import TTLCache
+from backend.core.config import settings
+from backend.core.etag import not_modified, with_etag
+
+
+class PageCache:
+    """
+    Rendered pages, gzipped, keyed by something that changes whenever the
+    page would (see services/versions.py). Clients that accept gzip get the
+    stored bytes as they are; the rest get them inflated. Streamed renders
+    (jinja_env.stream_template) are passed through and stored once complete.
+    """
+
+    def __init__(self, cache: TTLCache):
+        self._pages = cache
+
+    def _store(self, key: Hashable, body: bytes, media_type: str) -> Tuple[bytes, str]:
+        entry = (gzip.compress(body, compresslevel=6), media_type)
+        self._pages.set(key, entry)
+        return entry
+
+    def _tee(self, key: Hashable, response: StreamingResponse) -> StreamingResponse:
+        source = response.body_iterator
+        media_type = response.media_type or "text/html"
+
+        async def body() -> AsyncIterator[bytes]:
+            parts: List[bytes] = []
+            async for chunk in source:
+                parts.append(chunk if isinstance(chunk, bytes) else chunk.encode())
+                yield chunk
+            # only reached when the whole page was rendered and sent
+            self._store(key, b"".join(parts), media_type)
+
+        response.body_iterator = body()
+        return response
+
+    def _respond(self, request: Request, body: bytes, media_type: str) -> Response:
+        if accepts_encoding(request.headers.get("accept-encoding", ""), "gzip"):
+            headers = {"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+            return Response(body, media_type=media_type, headers=headers)
+        return Response(gzip.decompress(body), media_type=media_type, headers={"Vary": "Accept-Encoding"})
+
+    async def serve(
+        self,
+        request: Request,
+        key: Hashable,
+        etag: str,
+        render: Callable[[], Awaitable[Response]],
+    ) -> Response:
+        """
+        304 if the browser has `etag`, else the cached page for `key`, else
+        render() it (only 200s are kept, and nothing marked no-store).
+        """
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+        entry: Optional[Tuple[bytes, str]] = self._pages.get(key)
+        if entry is None:
+            response = await render()
+            if response.status_code != 200 or "no-store" in response.headers.get("cache-control", ""):
+                return response
+            if isinstance(response, StreamingResponse):
+                return with_etag(self._tee(key, response), etag)
+            entry = self._store(key, response.body, response.media_type or "text/html")
+        return with_etag(self._respond(request, *entry), etag)
+
+
+page_cache = PageCache(cache=TTLCache(maxsize=settings.page_cache_size, ttl=settings.page_cache_ttl))
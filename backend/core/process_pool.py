@@ -0,0 +1,68 @@
+# backend/core/process_pool.py
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from backend.core.cache import TTLCache
+
+
+class PoolBusy(Exception):
+    """More distinct calls are in flight than the pool admits."""
+
+
+class ProcessPool:
+    """
+    Runs CPU-bound functions in a process pool, off the event loop.
+    run() caches results by a caller-chosen key and shares identical calls
+    already in flight; with `limit`, calls beyond that many in flight raise
+    PoolBusy instead of queueing without limit. The pool starts on first use.
+    """
+
+    def __init__(self, workers: int, cache: TTLCache, limit: Optional[int] = None):
+        self._workers = workers
+        self._cache = cache
+        self._limit = limit
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._inflight: Dict[str, "asyncio.Future[Any]"] = {}
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, not fork: never fork a process with a running event loop
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def run(self, key: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """`fn` must be a module-level function; only successful results are cached."""
+        result = self._cache.get(key)
+        if result is not None:
+            return result
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            if self._limit is not None and len(self._inflight) >= self._limit:
+                raise PoolBusy()
+            loop = asyncio.get_running_loop()
+            inflight = asyncio.ensure_future(loop.run_in_executor(self._pool(), fn, *args))
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda f: self._done(key, f))
+        # one caller giving up must not cancel the call for the others
+        return await asyncio.shield(inflight)
+
+    async def call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Uncached and unlimited: waits for a free worker."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool(), fn, *args)
+
+    def _done(self, key: str, future: "asyncio.Future[Any]") -> None:
+        self._inflight.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self._cache.set(key, future.result())
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,182 @@
+# backend/core/ratelimit.py
+
+import asyncio
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Optional, Tuple
+
+from backend.core.config import settings
+
+
+class RateLimited(Exception):
+    """Over a limit; the client should come back after `retry_after` seconds."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited, retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+def _refill(
+    tokens: float, updated: float, now: float, rate: float, burst: float, spend: bool = True,
+) -> Tuple[float, float]:
+    """
+    Take one token (or, with spend=False, only look for one); returns
+    (tokens left, seconds to wait or 0 if allowed).
+    """
+    tokens = min(burst, tokens + (now - updated) * rate)
+    if tokens >= 1:
+        return (tokens - 1 if spend else tokens), 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class MemoryBuckets:
+    """Per-process bucket state, LRU-bounded; an evicted key starts full again."""
+
+    def __init__(self, maxsize: int = 100_000):
+        self._maxsize = maxsize
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, rate: float, burst: float, spend: bool = True) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens, wait = _refill(tokens, updated, now, rate, burst, spend)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self._maxsize:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class SQLiteBuckets:
+    """
+    Bucket state in an SQLite file, so every worker on the host shares the
+    same limits. Each take() is one short write transaction.
+    """
+
+    _PURGE_EVERY = 1000
+
+    def __init__(self, db_path: str):
+        self._db_path = db_path
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._takes = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self._db_path, check_same_thread=False, isolation_level=None, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS rate_buckets "
+                "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+        return self._db
+
+    def _take(self, key: str, rate: float, burst: float, spend: bool) -> float:
+        now = time.time()
+        with self._lock:
+            db = self._conn()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute("SELECT tokens, updated FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+                tokens, wait = _refill(*(row or (burst, now)), now, rate, burst, spend)
+                db.execute(
+                    "INSERT INTO rate_buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                    (key, tokens, now),
+                )
+                self._takes += 1
+                if self._takes % self._PURGE_EVERY == 0:
+                    # idle long enough to be full again: same as having no row
+                    db.execute("DELETE FROM rate_buckets WHERE updated < ?", (now - 86400,))
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return wait
+
+    async def take(self, key: str, rate: float, burst: float, spend: bool = True) -> float:
+        return await asyncio.to_thread(self._take, key, rate, burst, spend)
+
+
+class TokenBucket:
+    """
+    `per_minute` requests per key on average, with bursts of up to `burst`.
+    Buckets live in `buckets` (MemoryBuckets or SQLiteBuckets).
+    """
+
+    def __init__(self, name: str, per_minute: float, burst: int, buckets):
+        self._name = name
+        self._rate = per_minute / 60
+        self._burst = float(burst)
+        self._buckets = buckets
+
+    async def hit(self, key: str) -> None:
+        """Spend a token for `key`, or raise RateLimited."""
+        wait = await self._buckets.take(f"{self._name}:{key}", self._rate, self._burst)
+        if wait:
+            raise RateLimited(wait)
+
+    async def check(self, key: str) -> None:
+        """Raise RateLimited if `key` is out of tokens, without spending one."""
+        wait = await self._buckets.take(f"{self._name}:{key}", self._rate, self._burst, spend=False)
+        if wait:
+            raise RateLimited(wait)
+
+    async def spend(self, key: str) -> None:
+        """Spend a token for `key` if one is left; never raises."""
+        await self._buckets.take(f"{self._name}:{key}", self._rate, self._burst)
+
+
+class ConcurrencyLimiter:
+    """
+    At most `limit` calls in flight. Callers wait up to `max_wait` seconds
+    for a slot, then get RateLimited instead of queueing behind a slow
+    upstream.
+    """
+
+    def __init__(self, limit: int, max_wait: float):
+        self._slots = asyncio.Semaphore(limit)
+        self._max_wait = max_wait
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self._max_wait)
+        except asyncio.TimeoutError:
+            raise RateLimited(max(1.0, self._max_wait))
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+
+def _buckets():
+    if settings.ratelimit_backend == "sqlite":
+        return SQLiteBuckets(settings.ratelimit_db)
+    return MemoryBuckets()
+
+
+_shared = _buckets()
+login_ip_limit = TokenBucket("login-ip", settings.login_ip_per_minute, settings.login_ip_burst, _shared)
+signup_ip_limit = TokenBucket("signup-ip", settings.signup_ip_per_minute, settings.signup_ip_burst, _shared)
+signup_email_limit = TokenBucket(
+    "signup-email", settings.signup_email_per_minute, settings.signup_email_burst, _shared,
+)
+# failed sign-ins per account: a correct password never uses this up
+login_failure_limit = TokenBucket(
+    "login-failures", settings.login_failures_per_minute, settings.login_failures_burst, _shared,
+)
+# outbound GoTrue calls from this process (sign-in, sign-up, token checks)
+auth_calls = ConcurrencyLimiter(settings.auth_max_concurrency, settings.auth_max_wait)
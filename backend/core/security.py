@@ -0,0 +1,162 @@
+# backend/core/security.py
+
+import hashlib
+import time
+from typing import Any, Dict, Optional
+
+import jwt
+from fastapi.concurrency import run_in_threadpool
+from gotrue.errors import AuthError
+from pydantic import BaseModel
+
+from backend.core.cache import TTLCache
+from backend.core.config import settings
+from backend.core.ratelimit import auth_calls
+from backend.services.supabase_client import auth, user_auth_client
+
+
+class AuthUser(BaseModel):
+    id: str
+    email: str = ""
+    user_metadata: Dict[str, Any] = {}
+    expires_at: int = 0
+    # Set when an expired access token had to be refreshed through GoTrue,
+    # so the caller can hand the new tokens back to the browser.
+    session: Optional[Dict[str, str]] = None
+
+
+def _token_key(access_token: str) -> str:
+    # never keep raw bearer tokens around as cache keys
+    return hashlib.sha256(access_token.encode()).hexdigest()
+
+
+class TokenVerifier:
+    """
+    Verifies Supabase access tokens locally (JWT secret or JWKS) and keeps
+    the verified users in a bounded LRU/TTL cache keyed by token hash.
+    GoTrue is only consulted for tokens we can't check locally or that
+    have expired and need a refresh.
+    """
+
+    def __init__(
+        self,
+        jwt_secret: Optional[str],
+        jwks_url: Optional[str],
+        audience: str,
+        cache: TTLCache,
+    ):
+        self._secret = jwt_secret
+        self._jwks = jwt.PyJWKClient(jwks_url, cache_keys=True) if jwks_url else None
+        self._audience = audience
+        self._cache = cache
+
+    def _decode_locally(self, access_token: str) -> Optional[dict]:
+        """
+        Return the verified claims, or None when no local key can check
+        this token. Raises jwt.ExpiredSignatureError / jwt.InvalidTokenError.
+        """
+        header = jwt.get_unverified_header(access_token)
+        alg = header.get("alg")
+        if alg == "HS256" and self._secret:
+            key = self._secret
+        elif self._jwks is not None and alg in ("RS256", "ES256"):
+            try:
+                key = self._jwks.get_signing_key(header.get("kid")).key
+            except jwt.PyJWKClientError:
+                return None
+        else:
+            return None
+        return jwt.decode(
+            access_token,
+            key,
+            algorithms=[alg],
+            audience=self._audience,
+            options={"require": ["exp", "sub"]},
+        )
+
+    def _remember(self, key: str, user: AuthUser) -> None:
+        self._cache.set(key, user, ttl=user.expires_at - time.time())
+
+    async def _fetch_user(self, access_token: str, expires_at: int) -> Optional[AuthUser]:
+        # get_user(jwt) is stateless: it does not touch the shared client's session
+        try:
+            async with auth_calls.slot():
+                resp = await auth.get_user(access_token)
+        except AuthError:
+            return None
+        auth_user = getattr(resp, "user", None)
+        if not auth_user:
+            return None
+        return AuthUser(
+            id=auth_user.id,
+            email=auth_user.email or "",
+            user_metadata=auth_user.user_metadata or {},
+            expires_at=expires_at,
+        )
+
+    async def _refresh(self, refresh_token: str) -> Optional[AuthUser]:
+        # on a throwaway client: refresh_session() keeps the new session on
+        # the client it ran on, and the shared one must stay session-less
+        try:
+            async with auth_calls.slot():
+                resp = await user_auth_client().refresh_session(refresh_token)
+        except AuthError:
+            return None
+        session = getattr(resp, "session", None)
+        if not session or not session.user:
+            return None
+        return AuthUser(
+            id=session.user.id,
+            email=session.user.email or "",
+            user_metadata=session.user.user_metadata or {},
+            expires_at=session.expires_at or 0,
+            session={
+                "access_token": session.access_token,
+                "refresh_token": session.refresh_token,
+            },
+        )
+
+    async def verify(self, access_token: str, refresh_token: str) -> Optional[AuthUser]:
+        key = _token_key(access_token)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            claims = await run_in_threadpool(self._decode_locally, access_token)
+            if claims is None:
+                # No local key for this token: let GoTrue vouch for it,
+                # unless it has visibly expired already.
+                unverified = jwt.decode(access_token, options={"verify_signature": False})
+                if unverified.get("exp", 0) <= time.time():
+                    raise jwt.ExpiredSignatureError()
+        except jwt.ExpiredSignatureError:
+            # Refresh tokens are single-use, so the refreshed user stays cached
+            # under the stale token until the browser picks up the new cookie.
+            user = await self._refresh(refresh_token)
+            if user:
+                self._remember(key, user)
+            return user
+        except jwt.InvalidTokenError:
+            return None
+
+        if claims is None:
+            user = await self._fetch_user(access_token, unverified["exp"])
+        else:
+            user = AuthUser(
+                id=claims["sub"],
+                email=claims.get("email") or "",
+                user_metadata=claims.get("user_metadata") or {},
+                expires_at=claims["exp"],
+            )
+        if user:
+            self._remember(key, user)
+        return user
+
+
+token_verifier = TokenVerifier(
+    jwt_secret=settings.supabase_jwt_secret,
+    jwks_url=settings.supabase_jwks_url,
+    audience=settings.jwt_audience,
+    cache=TTLCache(maxsize=settings.auth_cache_size, ttl=settings.auth_cache_ttl),
+)
@@ -1,9 +1,12 @@
 # backend/deps.py
 
+import hmac
 import json
 from fastapi import HTTPException, Request, Depends, status
 from pydantic import BaseModel
-from backend.services.supabase_client import supabase
+from backend.services.profiles import get_profile
+from backend.core.security import AuthUser, token_verifier
+from backend.core.config import settings
 
 class User(BaseModel):
     id: str
@@ -11,7 +14,7 @@ class User(BaseModel):
     state: str
     is_pro: bool = False
 
-async def get_current_user_id(request: Request) -> User:
+async def get_auth_user(request: Request) -> AuthUser:
     sb_token = request.cookies.get("sb_token")
     if not sb_token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
@@ -23,26 +26,47 @@ async def get_current_user_id(request: Request) -> User:
         refresh_token = session["refresh_token"]
     except (ValueError, KeyError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid auth cookie")
-    supabase.auth.set_session(access_token, refresh_token)
-    user_resp = supabase.auth.get_user()
-    auth_user = getattr(user_resp, "user", None)
+    # verified locally against the JWT secret/JWKS; GoTrue only on cache misses it can't check
+    auth_user = await token_verifier.verify(access_token, refresh_token)
     if not auth_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired session")
+    if auth_user.session:
+        # expired token was refreshed; main.py re-issues the cookie
+        request.state.refreshed_session = auth_user.session
     return auth_user
 
-async def get_current_user(auth_user=Depends(get_current_user_id)) -> User:
-    # extract fields from GoTrue user
-    user_id = auth_user.id
-    email = auth_user.email
-    state = auth_user.user_metadata.get("state", "") if hasattr(auth_user, 'user_metadata') else ""
-    # Fetch pro flag from Postgres
-    res = await supabase.table("users") \
-        .select("is_pro") \
-        .eq("id", user_id) \
-        .single() \
-        .execute()
-    is_pro = res.data.get("is_pro", False) if res.data else False
-    return User(id=user_id, email=email, state=state, is_pro=is_pro)
+async def get_current_user_id(auth_user: AuthUser = Depends(get_auth_user)) -> str:
+    return auth_user.id
+
+async def get_current_user(request: Request, auth_user: AuthUser = Depends(get_auth_user)) -> User:
+    # resolved once per request, however many dependencies ask for it
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
+    # is_pro/state from the TTL-cached users row
+    profile = await get_profile(auth_user.id)
+    user = User(
+        id=auth_user.id,
+        email=auth_user.email,
+        state=profile.get("state") or auth_user.user_metadata.get("state", ""),
+        is_pro=bool(profile.get("is_pro", False)),
+    )
+    request.state.user = user
+    return user
+
+def is_admin(request: Request) -> bool:
+    if not settings.admin_token:
+        return False
+    token = request.headers.get("x-admin-token", "")
+    # bytes: compare_digest() raises TypeError on non-ASCII str
+    return hmac.compare_digest(token.encode(), settings.admin_token.encode())
+
+async def require_admin(request: Request) -> None:
+    # shared-secret guard for /admin routes; they don't exist without ADMIN_TOKEN
+    if not settings.admin_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not is_admin(request):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin token required")
 
 
 
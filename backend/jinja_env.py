@@ -1,10 +1,97 @@
+import asyncio
+import time
 from pathlib import Path
 from fastapi.templating import Jinja2Templates
+from fastapi.responses import StreamingResponse
 from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+
+from backend.core.assets import assets
+from backend.core.config import settings
+from backend.core.metrics import record, span
+
+
+class _TracedTemplate(Template):
+    # every render shows up as "template" in /metrics and the request trace
+    def render(self, *args, **kwargs):
+        with span("template"):
+            return super().render(*args, **kwargs)
 
 # point at project root’s templates folder
 BASE_DIR = Path(__file__).resolve().parent.parent
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+TEMPLATES_DIR = BASE_DIR / "templates"
+
+
+def _bytecode_cache() -> FileSystemBytecodeCache:
+    cache_dir = Path(settings.template_cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return FileSystemBytecodeCache(str(cache_dir))
+
+
+templates = Jinja2Templates(env=Environment(
+    loader=FileSystemLoader(str(TEMPLATES_DIR)),
+    autoescape=True,
+    # compiled templates survive restarts, so new workers skip the compiler
+    bytecode_cache=_bytecode_cache(),
+    auto_reload=settings.template_auto_reload,
+))
+templates.env.template_class = _TracedTemplate
 
 # make now() available in all templates
 templates.env.globals["now"] = datetime.utcnow
+
+# fingerprinted static URLs: {{ asset_url('css/tailwind.min.css') }}
+templates.env.globals["asset_url"] = assets.url
+
+
+def precompile() -> int:
+    """
+    Compile every template now (from the bytecode cache when it's warm),
+    so no request pays for it. Run at startup.
+    """
+    names = templates.env.list_templates(extensions=["html"])
+    for name in names:
+        templates.env.get_template(name)
+    return len(names)
+
+
+async def _chunks(template: Template, context: Dict[str, Any]) -> AsyncIterator[bytes]:
+    # generate() yields every text node separately; send ~chunk-sized pieces
+    # and let other requests run in between, timing only the rendering
+    buffer, size, rendering = [], 0, 0.0
+    start = time.perf_counter()
+    try:
+        for piece in template.generate(context):
+            buffer.append(piece)
+            size += len(piece)
+            if size >= settings.template_stream_chunk:
+                rendering += time.perf_counter() - start
+                yield "".join(buffer).encode()
+                buffer, size = [], 0
+                await asyncio.sleep(0)
+                start = time.perf_counter()
+        rendering += time.perf_counter() - start
+        if buffer:
+            yield "".join(buffer).encode()
+    finally:
+        record("template", rendering)
+
+
+def stream_template(
+    name: str,
+    context: Dict[str, Any],
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> StreamingResponse:
+    """
+    Like templates.TemplateResponse, but rendered as it is sent: the top of
+    the page (and the first rows of a long table) goes out before the rest
+    has been built.
+    """
+    return StreamingResponse(
+        _chunks(templates.get_template(name), context),
+        status_code=status_code,
+        media_type="text/html",
+        headers=headers,
+    )
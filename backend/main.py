@@ -2,34 +2,130 @@
 
 
 from pathlib import Path
-from datetime import datetime
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+import math
+import time
 
-from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 
-from .jinja_env       import templates
+from .jinja_env       import templates, precompile as precompile_templates
+from .core.config     import settings
+from .core.assets     import PrecompressedStaticFiles
+from .core.ratelimit  import RateLimited
+from .core.metrics    import Trace, current_trace, registry, request_duration, requests_total
 from .api.auth        import router as auth_router
 from .api.dashboard   import router as dashboard_router
 from .api.ce          import router as ce_router
 from .api.settings    import router as settings_router
 from .api.report      import router as report_router
 from .api.courses     import router as courses_router
+from .api.admin       import router as admin_router
+from .api.upload      import router as upload_router
+from .api.payments    import router as payments_router
+from .api.auth        import _set_token_cookie
+from .deps            import is_admin, require_admin
+from .services.supabase_client import init_supabase, close_supabase
+from .services.resilience import UpstreamUnavailable
+from .services.pdf import pdf_renderer
+from .cert_parser import cert_parser
+from .services.report_jobs import report_jobs
+from .services.stripe_events import stripe_events
 
 # Determine project base directory
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-# 1) Instantiate the FastAPI app
-app = FastAPI(redirect_slashes=False)
+# 1) Instantiate the FastAPI app; the Supabase connection pool lives
+#    for exactly as long as the app does
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # compile (or load from the bytecode cache) every template up front
+    await asyncio.to_thread(precompile_templates)
+    await init_supabase()
+    await report_jobs.start(app)
+    await stripe_events.start()
+    try:
+        yield
+    finally:
+        await stripe_events.stop()
+        await report_jobs.stop()
+        pdf_renderer.shutdown()
+        cert_parser.shutdown()
+        await close_supabase()
 
-# 2) Mount static assets
+app = FastAPI(redirect_slashes=False, lifespan=lifespan)
+
+# 2) Mount static assets; fingerprinted builds under /static/dist are
+#    served precompressed and cached for good (scripts/build_assets.py)
 app.mount(
     "/static",
-    StaticFiles(directory=str(BASE_DIR / "static")),
+    PrecompressedStaticFiles(directory=str(BASE_DIR / "static")),
     name="static",
 )
 
-# 3) Make `now()` available in all Jinja templates
-templates.env.globals["now"] = datetime.utcnow
+# 3) Hand refreshed Supabase tokens back to the browser (see deps.get_auth_user)
+@app.middleware("http")
+async def reissue_refreshed_session(request: Request, call_next):
+    response = await call_next(request)
+    refreshed = getattr(request.state, "refreshed_session", None)
+    if refreshed:
+        _set_token_cookie(response, refreshed)
+    return response
+
+# 3b) Per-route latency, per-request upstream breakdown (core/metrics.py);
+#     added last so it wraps everything else
+slow_log = logging.getLogger("credenticare.slow")
+
+@app.middleware("http")
+async def record_metrics(request: Request, call_next):
+    trace = Trace()
+    token = current_trace.set(trace)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        current_trace.reset(token)
+    elapsed = time.perf_counter() - start
+
+    route = request.scope.get("route")
+    if route is not None:
+        label = route.path
+    elif request.url.path.startswith("/static/"):
+        label = "/static"
+    else:
+        label = "unmatched"  # keeps 404 scans from blowing up label cardinality
+    request_duration.observe(elapsed, route=label)
+    requests_total.inc(route=label, method=request.method, status=str(response.status_code))
+
+    # upstream timings are for operators, not every visitor
+    if trace.spans and (settings.server_timing_public or is_admin(request)):
+        response.headers["Server-Timing"] = trace.server_timing()
+    if elapsed * 1000 >= settings.slow_request_ms:
+        slow_log.warning(
+            "slow request %s %s %d in %.0fms: %s",
+            request.method, label, response.status_code, elapsed * 1000, trace.breakdown() or "no upstream calls",
+        )
+    return response
+
+# 3c) Over a rate or concurrency limit anywhere (core/ratelimit.py): a fast 429
+@app.exception_handler(RateLimited)
+async def rate_limited(request: Request, exc: RateLimited):
+    return JSONResponse(
+        {"detail": "Too many requests"},
+        status_code=429,
+        headers={"Retry-After": exc.retry_after_header},
+    )
+
+# 3d) Supabase down, too slow, or the circuit is open (services/resilience.py)
+@app.exception_handler(UpstreamUnavailable)
+async def upstream_unavailable(request: Request, exc: UpstreamUnavailable):
+    return JSONResponse(
+        {"detail": "Service temporarily unavailable"},
+        status_code=503,
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
 
 # 4) Wire up routers
 app.include_router(auth_router)        # /signup, /login, /logout
@@ -38,6 +134,9 @@ app.include_router(ce_router)          # /ce/...
 app.include_router(settings_router)    # /settings
 app.include_router(report_router)      # /report...
 app.include_router(courses_router)     # /courses
+app.include_router(upload_router)      # /ce/records/import, /ce/certificates/...
+app.include_router(payments_router)    # /payments/webhook
+app.include_router(admin_router)       # /admin/...
 
 # 5) Root endpoint
 @app.get("/")
@@ -49,5 +148,10 @@ async def read_root(request: Request):
 async def alive():
     return {"status": "👍 alive!"}
 
+# 7) Prometheus scrape endpoint; scrape with the x-admin-token header
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_admin)])
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 
 #   python -m uvicorn backend.main:app --reload
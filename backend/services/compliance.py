@@ -0,0 +1,221 @@
+# backend/services/compliance.py
+
+import asyncio
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from backend.core.cache import TTLCache
+from backend.core.config import settings
+from backend.services.reference import reference
+from backend.services.renewal_index import renewal_index
+from backend.services.rules import RuleBook, as_date, build_status, cycle_window, evaluate_batch
+from backend.services.supabase_client import supabase
+from backend.services.versions import data_versions
+
+
+class CEAggregate(BaseModel):
+    """Running totals for one user's CE records."""
+    renewal_interval_days: int
+    cycle_start: date
+    cycle_end: date
+    total_hours: int = 0
+    record_count: int = 0
+    latest_completed: Optional[date] = None
+    cycle_hours: int = 0
+    cycle_category_hours: Dict[str, int] = {}
+
+    def add(self, date_completed: Any, hours_earned: int, category: Optional[str] = None) -> None:
+        completed = as_date(date_completed)
+        self.total_hours += hours_earned
+        self.record_count += 1
+        if self.latest_completed is None or completed > self.latest_completed:
+            self.latest_completed = completed
+        # the same window rules.evaluate_batch() counts
+        if self.cycle_start <= completed <= self.cycle_end:
+            self.cycle_hours += hours_earned
+            if category:
+                self.cycle_category_hours[category] = self.cycle_category_hours.get(category, 0) + hours_earned
+
+
+# PostgREST's default max-rows: a longer page would come back cut short
+_PAGE_SIZE = 1000
+
+
+async def _fetch_all(query: Callable[[], Any], page_size: int) -> List[Dict[str, Any]]:
+    # `query` builds a fresh, stably ordered request for each page
+    rows: List[Dict[str, Any]] = []
+    start = 0
+    while True:
+        resp = await query().range(start, start + page_size - 1).execute()
+        page = resp.data or []
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        start += page_size
+
+
+class ComplianceEngine:
+    """
+    One place for hours-completed / hours-remaining / next-renewal.
+    Per-user aggregates are built once from the records and then updated
+    in place as records are inserted, so status reads don't rescan.
+    Rules are per state (services/rules.py) and count only the hours inside
+    the user's current renewal window.
+    """
+
+    def __init__(self, cache: TTLCache):
+        self._aggregates = cache
+        self._rulebook: Optional[RuleBook] = None
+        self._rulebook_key: Optional[tuple] = None
+        # bumped on every write, so a build that raced one isn't cached
+        self._generation: Dict[str, int] = {}
+
+    async def rulebook(self) -> RuleBook:
+        # requirements and courses come from the reference-data cache;
+        # the RuleBook index is rebuilt only when either table changed
+        requirements, courses = await asyncio.gather(
+            reference.get("ce_requirements"),
+            reference.get("courses"),
+        )
+        key = (requirements.etag, courses.etag)
+        if self._rulebook is None or self._rulebook_key != key:
+            if not requirements.rows:
+                raise HTTPException(status_code=404, detail="No CE requirement configured")
+            self._rulebook = RuleBook.from_rows(requirements.rows, courses.rows)
+            self._rulebook_key = key
+        return self._rulebook
+
+    async def _build(
+        self,
+        user_id: str,
+        interval: int,
+        rulebook: RuleBook,
+        records: Optional[List[Dict[str, Any]]] = None,
+    ) -> CEAggregate:
+        generation = self._generation.get(user_id, 0)
+        if records is None:
+            records = await _fetch_all(
+                lambda: supabase.table("ce_records")
+                .select("course_id,hours_earned,date_completed")
+                .eq("user_id", user_id)
+                .order("id"),
+                _PAGE_SIZE,
+            )
+        cycle_start, cycle_end = cycle_window(interval, date.today())
+        agg = CEAggregate(renewal_interval_days=interval, cycle_start=cycle_start, cycle_end=cycle_end)
+        for r in records:
+            agg.add(r["date_completed"], r["hours_earned"], rulebook.category_of(r.get("course_id")))
+        # a record added while we were reading may be missing: use this once, rebuild next time
+        if self._generation.get(user_id, 0) == generation:
+            self._aggregates.set(user_id, agg)
+        return agg
+
+    async def aggregate(
+        self,
+        user_id: str,
+        interval: int,
+        rulebook: RuleBook,
+        records: Optional[List[Dict[str, Any]]] = None,
+    ) -> CEAggregate:
+        agg = self._aggregates.get(user_id)
+        # rebuild when the user's cycle length changed or the window moved on a day
+        if (
+            agg is None
+            or agg.renewal_interval_days != interval
+            or (agg.cycle_start, agg.cycle_end) != cycle_window(interval, date.today())
+        ):
+            agg = await self._build(user_id, interval, rulebook, records)
+        return agg
+
+    async def status(
+        self,
+        user_id: str,
+        state: Optional[str],
+        records: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        CE status for one user under their state's rule. Pass `records` when
+        the caller already fetched them, so a cold aggregate is built
+        without another query.
+        """
+        rulebook = await self.rulebook()
+        rule = rulebook.for_state(state)
+        agg = await self.aggregate(user_id, rule.renewal_interval_days, rulebook, records)
+        return build_status(
+            rule, agg.cycle_hours, agg.cycle_category_hours, agg.latest_completed, date.today()
+        )
+
+    async def sweep(
+        self,
+        as_of: Optional[date] = None,
+        page_size: int = _PAGE_SIZE,
+        user_ids: Optional[List[str]] = None,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Status for every user in one pass: users and records are read in
+        pages and evaluated together by rules.evaluate_batch(). Pass
+        `user_ids` to sweep just those users.
+        """
+        rulebook = await self.rulebook()
+        if user_ids is None:
+            users = await _fetch_all(
+                lambda: supabase.table("users").select("id,state").order("id"),
+                page_size,
+            )
+            records = await _fetch_all(
+                lambda: supabase.table("ce_records")
+                .select("user_id,course_id,hours_earned,date_completed")
+                .order("id"),
+                page_size,
+            )
+        else:
+            users, records = [], []
+            # ids travel in the query string, so filter a slice at a time
+            step = settings.ids_per_query
+            for start in range(0, len(user_ids), step):
+                ids = user_ids[start:start + step]
+                users += await _fetch_all(
+                    lambda: supabase.table("users").select("id,state").in_("id", ids).order("id"),
+                    page_size,
+                )
+                records += await _fetch_all(
+                    lambda: supabase.table("ce_records")
+                    .select("user_id,course_id,hours_earned,date_completed")
+                    .in_("user_id", ids)
+                    .order("id"),
+                    page_size,
+                )
+        return evaluate_batch(rulebook, ((u["id"], u.get("state")) for u in users), records, as_of)
+
+    async def record_added(self, user_id: str, record: Dict[str, Any]) -> None:
+        # Only warm aggregates are updated; a cold one is built on next read.
+        self._bump(user_id)
+        agg = self._aggregates.get(user_id)
+        if agg is not None and self._rulebook is None:
+            self._drop(user_id)
+        elif agg is not None:
+            agg.add(record["date_completed"], record["hours_earned"], self._rulebook.category_of(record.get("course_id")))
+        # the renewal date may have moved: re-index before the next reminders
+        await renewal_index.touch(user_id)
+
+    async def invalidate(self, user_id: str) -> None:
+        self._drop(user_id)
+        await renewal_index.touch(user_id)
+
+    def _drop(self, user_id: str) -> None:
+        self._bump(user_id)
+        self._aggregates.pop(user_id)
+
+    def _bump(self, user_id: str) -> None:
+        self._generation[user_id] = self._generation.get(user_id, 0) + 1
+
+
+compliance = ComplianceEngine(
+    cache=TTLCache(maxsize=settings.compliance_cache_size, ttl=settings.compliance_cache_ttl),
+)
+
+# another worker wrote this user's records (and flagged them for reminders)
+data_versions.on_change(compliance._drop)
@@ -0,0 +1,96 @@
+# backend/services/exports.py
+
+import csv
+import io
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from backend.core.config import settings
+from backend.services.records import MAX_ROWS, RECORD_COLUMNS, fetch_page
+from backend.services.reference import reference
+from backend.services.supabase_client import supabase
+
+CSV_HEADER = ["Course", "Date Completed", "Hours", "Notes"]
+ORG_CSV_HEADER = ["User ID", *CSV_HEADER]
+
+
+async def iter_user_records(user_id: str, page_size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    """One user's records, newest first, a keyset page at a time."""
+    cursor = None
+    while True:
+        rows, cursor = await fetch_page(user_id, page_size, cursor)
+        if rows:
+            yield rows
+        if cursor is None:
+            return
+
+
+async def iter_all_records(
+    page_size: int,
+    user_ids: Optional[Sequence[str]] = None,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Every user's records (or just `user_ids`', a slice of ids at a time),
+    keyset-paginated on id.
+    """
+    # a short page means the end, so a page may not exceed PostgREST's cap
+    page_size = min(page_size, MAX_ROWS)
+    if not user_ids:
+        async for rows in _iter_records(page_size, None):
+            yield rows
+        return
+    user_ids = list(user_ids)
+    step = settings.ids_per_query
+    for start in range(0, len(user_ids), step):
+        async for rows in _iter_records(page_size, user_ids[start:start + step]):
+            yield rows
+
+
+async def _iter_records(page_size: int, user_ids: Optional[List[str]]) -> AsyncIterator[List[Dict[str, Any]]]:
+    last_id = None
+    while True:
+        query = supabase.table("ce_records").select(RECORD_COLUMNS)
+        if user_ids is not None:
+            query = query.in_("user_id", user_ids)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        resp = await query.order("id").limit(page_size).execute()
+        rows = resp.data or []
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1]["id"]
+
+
+async def stream_csv(
+    pages: AsyncIterator[List[Dict[str, Any]]],
+    include_user: bool = False,
+) -> AsyncIterator[bytes]:
+    """
+    Encode pages of records as CSV as they arrive. Only the current page
+    is ever held in memory, whatever the size of the export.
+    """
+    courses = await reference.rows("courses")
+    titles = {str(c["id"]): c.get("course_title") or c.get("name") or "" for c in courses}
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> bytes:
+        chunk = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    writer.writerow(ORG_CSV_HEADER if include_user else CSV_HEADER)
+    yield flush()
+    async for rows in pages:
+        for r in rows:
+            row = [
+                titles.get(str(r.get("course_id")), r.get("course_id") or ""),
+                r.get("date_completed", ""),
+                r.get("hours_earned", ""),
+                r.get("notes") or "",
+            ]
+            writer.writerow([r.get("user_id", ""), *row] if include_user else row)
+        yield flush()
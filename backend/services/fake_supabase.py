@@ -0,0 +1,558 @@
+# backend/services/fake_supabase.py
+#
+# Local stand-in for Supabase (PostgREST + GoTrue) backed by SQLite, so the
+# app runs and can be benchmarked without a project. Selected with
+# DATA_BACKEND=fake; init_supabase() points the shared clients at it.
+#
+# Only the parts of the query builder this app uses are implemented. Column
+# names are checked against the schema, so a query that would fail against
+# PostgREST fails here too.
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+import secrets
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import jwt
+from gotrue.errors import AuthApiError
+from postgrest import APIError
+
+from backend.core.metrics import record
+
+# column -> type; "json" and "bool" values are converted on the way in and out
+SCHEMA: Dict[str, Dict[str, str]] = {
+    "users": {"id": "text", "email": "text", "state": "text", "is_pro": "bool"},
+    "states": {"code": "text", "name": "text"},
+    "courses": {"id": "text", "name": "text", "category": "text", "provider": "text"},
+    "ce_requirements": {
+        "state": "text", "required_hours": "int", "renewal_interval_days": "int", "category_minimums": "json",
+    },
+    "ce_records": {
+        "id": "text", "user_id": "text", "course_id": "text", "date_completed": "text",
+        "hours_earned": "int", "notes": "text",
+    },
+    "ce_certificates": {
+        "id": "text", "record_id": "text", "user_id": "text", "storage_key": "text", "sha256": "text",
+        "size_bytes": "int", "content_type": "text", "filename": "text",
+    },
+}
+_SQL_TYPES = {"text": "TEXT", "int": "INTEGER", "bool": "INTEGER", "json": "TEXT"}
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS ce_records_user ON ce_records (user_id, date_completed, id);
+CREATE INDEX IF NOT EXISTS ce_certificates_record ON ce_certificates (record_id, sha256);
+CREATE UNIQUE INDEX IF NOT EXISTS users_email ON users (email);
+CREATE TABLE IF NOT EXISTS auth_users (
+    id            TEXT PRIMARY KEY,
+    email         TEXT NOT NULL UNIQUE,
+    password_hash TEXT NOT NULL,
+    user_metadata TEXT NOT NULL DEFAULT '{}'
+);
+"""
+_OPS = {"eq": "=", "neq": "!=", "lt": "<", "lte": "<=", "gt": ">", "gte": ">="}
+_IDENT = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+def _error(message: str, code: str = "PGRST000") -> APIError:
+    return APIError({"message": message, "code": code, "hint": None, "details": None})
+
+
+def _split_top(expr: str) -> List[str]:
+    # "a.eq.1,and(b.eq.2,c.lt.3)" -> ["a.eq.1", "and(b.eq.2,c.lt.3)"]
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(expr):
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append(expr[start:i])
+            start = i + 1
+    parts.append(expr[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+class _Query:
+    """The subset of postgrest's request builder used by the app."""
+
+    def __init__(self, db: "FakeSupabase", table: str):
+        if table not in SCHEMA:
+            raise _error(f'relation "public.{table}" does not exist', "42P01")
+        self._db = db
+        self._table = table
+        self._columns = SCHEMA[table]
+        self._action = "select"
+        self._select = list(self._columns)
+        self._payload: Any = None
+        self._where: List[Tuple[str, List[Any]]] = []
+        self._order: List[str] = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+        self._single: Optional[str] = None
+
+    def _col(self, name: str) -> str:
+        if not _IDENT.match(name) or name not in self._columns:
+            raise _error(f"column {self._table}.{name} does not exist", "42703")
+        return name
+
+    def _to_db(self, column: str, value: Any) -> Any:
+        kind = self._columns[column]
+        if value is None:
+            return None
+        if kind == "json":
+            return json.dumps(value)
+        if kind == "bool":
+            return int(value if isinstance(value, bool) else str(value).lower() in ("true", "t", "1"))
+        return value
+
+    def _from_db(self, row: sqlite3.Row) -> Dict[str, Any]:
+        out = {}
+        for column in row.keys():
+            value, kind = row[column], self._columns[column]
+            if value is not None and kind == "json":
+                value = json.loads(value)
+            elif value is not None and kind == "bool":
+                value = bool(value)
+            out[column] = value
+        return out
+
+    # ─── actions ───────────────────────────────────────────────
+
+    def select(self, columns: str = "*", **_: Any) -> "_Query":
+        self._select = list(self._columns) if columns.strip() == "*" else [
+            self._col(c.strip()) for c in columns.split(",") if c.strip()
+        ]
+        return self
+
+    def insert(self, rows: Any, **_: Any) -> "_Query":
+        self._action = "insert"
+        self._payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def update(self, values: Dict[str, Any], **_: Any) -> "_Query":
+        self._action = "update"
+        self._payload = values
+        return self
+
+    def delete(self, **_: Any) -> "_Query":
+        self._action = "delete"
+        return self
+
+    @property
+    def http_method(self) -> str:
+        return {"select": "GET", "insert": "POST", "update": "PATCH", "delete": "DELETE"}[self._action]
+
+    # ─── filters ───────────────────────────────────────────────
+
+    def _filter(self, column: str, op: str, value: Any) -> Tuple[str, List[Any]]:
+        column = self._col(column)
+        if op == "in":
+            values = value if isinstance(value, (list, tuple)) else value.strip("()").split(",")
+            if not values:
+                return "0", []
+            return f"{column} IN ({','.join('?' * len(values))})", [self._to_db(column, v) for v in values]
+        if op == "is":
+            return f"{column} IS NULL" if str(value).lower() == "null" else f"{column} IS NOT NULL", []
+        if op not in _OPS:
+            raise _error(f'"{op}" is not a supported operator', "PGRST100")
+        return f"{column} {_OPS[op]} ?", [self._to_db(column, value)]
+
+    def _parse_logic(self, expr: str, joiner: str) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        for part in _split_top(expr):
+            if part.startswith(("and(", "or(")) and part.endswith(")"):
+                name, inner = part.split("(", 1)
+                sql, args = self._parse_logic(inner[:-1], " AND " if name == "and" else " OR ")
+            else:
+                column, op, value = part.split(".", 2)
+                sql, args = self._filter(column, op, value)
+            clauses.append(f"({sql})")
+            params += args
+        return joiner.join(clauses), params
+
+    def eq(self, column: str, value: Any) -> "_Query":
+        self._where.append(self._filter(column, "eq", value))
+        return self
+
+    def neq(self, column: str, value: Any) -> "_Query":
+        self._where.append(self._filter(column, "neq", value))
+        return self
+
+    def lt(self, column: str, value: Any) -> "_Query":
+        self._where.append(self._filter(column, "lt", value))
+        return self
+
+    def lte(self, column: str, value: Any) -> "_Query":
+        self._where.append(self._filter(column, "lte", value))
+        return self
+
+    def gt(self, column: str, value: Any) -> "_Query":
+        self._where.append(self._filter(column, "gt", value))
+        return self
+
+    def gte(self, column: str, value: Any) -> "_Query":
+        self._where.append(self._filter(column, "gte", value))
+        return self
+
+    def in_(self, column: str, values: Sequence[Any]) -> "_Query":
+        self._where.append(self._filter(column, "in", list(values)))
+        return self
+
+    def or_(self, filters: str, **_: Any) -> "_Query":
+        try:
+            self._where.append(self._parse_logic(filters, " OR "))
+        except ValueError as e:
+            raise _error(f'failed to parse logic tree ("{filters}")', "PGRST100") from e
+        return self
+
+    # ─── modifiers ─────────────────────────────────────────────
+
+    def order(self, column: str, desc: bool = False, **_: Any) -> "_Query":
+        self._order.append(f"{self._col(column)} {'DESC' if desc else 'ASC'}")
+        return self
+
+    def limit(self, size: int, **_: Any) -> "_Query":
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int, **_: Any) -> "_Query":
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def single(self) -> "_Query":
+        self._single = "single"
+        return self
+
+    def maybe_single(self) -> "_Query":
+        self._single = "maybe"
+        return self
+
+    # ─── execution ─────────────────────────────────────────────
+
+    def _where_sql(self) -> Tuple[str, List[Any]]:
+        if not self._where:
+            return "", []
+        return " WHERE " + " AND ".join(f"({sql})" for sql, _ in self._where), [
+            p for _, params in self._where for p in params
+        ]
+
+    def _run(self, conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+        where, params = self._where_sql()
+        table = self._table
+        if self._action == "insert":
+            rowids = []
+            for row in self._payload:
+                row = dict(row)
+                if "id" in self._columns and not row.get("id"):
+                    row["id"] = str(uuid.uuid4())
+                columns = [self._col(c) for c in row]
+                try:
+                    cur = conn.execute(
+                        f"INSERT INTO {table} ({','.join(columns)}) VALUES ({','.join('?' * len(columns))})",
+                        [self._to_db(c, row[c]) for c in columns],
+                    )
+                except sqlite3.IntegrityError as e:
+                    raise _error(str(e), "23505") from e
+                rowids.append(cur.lastrowid)
+            return self._fetch_rowids(conn, rowids)
+        if self._action == "update":
+            rowids = [r[0] for r in conn.execute(f"SELECT rowid FROM {table}{where}", params)]
+            columns = [self._col(c) for c in self._payload]
+            conn.executemany(
+                f"UPDATE {table} SET {','.join(f'{c} = ?' for c in columns)} WHERE rowid = ?",
+                [[*(self._to_db(c, self._payload[c]) for c in columns), rowid] for rowid in rowids],
+            )
+            return self._fetch_rowids(conn, rowids)
+        if self._action == "delete":
+            rows = self._select_rows(conn, where, params)
+            conn.execute(f"DELETE FROM {table}{where}", params)
+            return rows
+        return self._select_rows(conn, where, params)
+
+    def _select_rows(self, conn: sqlite3.Connection, where: str, params: List[Any]) -> List[Dict[str, Any]]:
+        sql = f"SELECT {','.join(self._select)} FROM {self._table}{where}"
+        if self._order:
+            sql += " ORDER BY " + ", ".join(self._order)
+        limit = self._limit
+        if self._action == "select" and self._db.max_rows:
+            # like PostgREST's max-rows: longer reads come back silently cut short
+            limit = self._db.max_rows if limit is None else min(limit, self._db.max_rows)
+        if limit is not None or self._offset:
+            sql += " LIMIT ? OFFSET ?"
+            params = [*params, -1 if limit is None else limit, self._offset]
+        return [self._from_db(r) for r in conn.execute(sql, params)]
+
+    def _fetch_rowids(self, conn: sqlite3.Connection, rowids: List[int]) -> List[Dict[str, Any]]:
+        if not rowids:
+            return []
+        rows = conn.execute(
+            f"SELECT {','.join(self._select)} FROM {self._table} "
+            f"WHERE rowid IN ({','.join('?' * len(rowids))}) ORDER BY rowid",
+            rowids,
+        )
+        return [self._from_db(r) for r in rows]
+
+    async def execute(self) -> Any:
+        start = time.perf_counter()
+        if self._db.latency:
+            await asyncio.sleep(self._db.latency)
+        with self._db.lock:
+            try:
+                rows = self._run(self._db.conn)
+                self._db.conn.commit()
+            except BaseException:
+                self._db.conn.rollback()
+                raise
+        record("supabase", time.perf_counter() - start)
+
+        if self._single is None:
+            return SimpleNamespace(data=rows, count=None)
+        if not rows and self._single == "maybe":
+            # postgrest-py's maybe_single() returns None for no rows
+            return None
+        if len(rows) != 1:
+            raise _error("JSON object requested, multiple (or no) rows returned", "PGRST116")
+        return SimpleNamespace(data=rows[0], count=None)
+
+
+class FakeAuth:
+    """
+    GoTrue calls the app makes, against the auth_users table. Tokens are
+    real HS256 JWTs, so TokenVerifier can check them locally when
+    SUPABASE_JWT_SECRET matches `jwt_secret`.
+    """
+
+    def __init__(self, db: "FakeSupabase"):
+        self._db = db
+        self._session: Optional[SimpleNamespace] = None
+
+    @staticmethod
+    def _hash(password: str) -> str:
+        return hashlib.sha256(password.encode()).hexdigest()
+
+    def _user(self, row: sqlite3.Row) -> SimpleNamespace:
+        return SimpleNamespace(
+            id=row["id"], email=row["email"], user_metadata=json.loads(row["user_metadata"]),
+        )
+
+    def _issue(self, user: SimpleNamespace) -> SimpleNamespace:
+        expires_at = int(time.time()) + self._db.token_ttl
+        access_token = jwt.encode(
+            {
+                "sub": user.id, "email": user.email, "user_metadata": user.user_metadata,
+                "aud": "authenticated", "role": "authenticated", "exp": expires_at,
+            },
+            self._db.jwt_secret,
+            algorithm="HS256",
+        )
+        refresh_token = secrets.token_urlsafe(24)
+        self._db.refresh_tokens[refresh_token] = user.id
+        return SimpleNamespace(
+            access_token=access_token, refresh_token=refresh_token,
+            expires_at=expires_at, expires_in=self._db.token_ttl, token_type="bearer", user=user,
+        )
+
+    def _by(self, column: str, value: str) -> Optional[sqlite3.Row]:
+        with self._db.lock:
+            return self._db.conn.execute(f"SELECT * FROM auth_users WHERE {column} = ?", (value,)).fetchone()
+
+    async def sign_up(self, credentials: Dict[str, Any]) -> SimpleNamespace:
+        email, password = credentials.get("email", "").strip().lower(), credentials.get("password", "")
+        if len(password) < 6:
+            raise AuthApiError("Password should be at least 6 characters.", 422, "weak_password")
+        user_id = self._db.create_user(email, password)
+        if user_id is None:
+            raise AuthApiError("User already registered", 422, "user_already_exists")
+        user = self._user(self._by("id", user_id))
+        return SimpleNamespace(user=user, session=None)
+
+    async def sign_in_with_password(self, credentials: Dict[str, Any]) -> SimpleNamespace:
+        row = self._by("email", credentials.get("email", "").strip().lower())
+        if row is None or row["password_hash"] != self._hash(credentials.get("password", "")):
+            raise AuthApiError("Invalid login credentials", 400, "invalid_credentials")
+        session = self._issue(self._user(row))
+        return SimpleNamespace(user=session.user, session=session)
+
+    def _claims(self, access_token: str) -> Dict[str, Any]:
+        try:
+            return jwt.decode(access_token, self._db.jwt_secret, algorithms=["HS256"], audience="authenticated")
+        except jwt.InvalidTokenError as e:
+            raise AuthApiError("invalid JWT", 401, "bad_jwt") from e
+
+    async def get_user(self, jwt: Optional[str] = None) -> SimpleNamespace:
+        if jwt is None and self._session is not None:
+            jwt = self._session.access_token
+        row = self._by("id", self._claims(jwt or "")["sub"])
+        if row is None:
+            raise AuthApiError("User not found", 404, "user_not_found")
+        return SimpleNamespace(user=self._user(row))
+
+    async def refresh_session(self, refresh_token: str) -> SimpleNamespace:
+        # single-use, like GoTrue's; the new session becomes this client's
+        user_id = self._db.refresh_tokens.pop(refresh_token, None)
+        row = self._by("id", user_id) if user_id else None
+        if row is None:
+            raise AuthApiError("Invalid Refresh Token", 400, "refresh_token_not_found")
+        self._session = self._issue(self._user(row))
+        return SimpleNamespace(user=self._session.user, session=self._session)
+
+    async def set_session(self, access_token: str, refresh_token: str) -> SimpleNamespace:
+        user = (await self.get_user(access_token)).user
+        self._session = SimpleNamespace(access_token=access_token, refresh_token=refresh_token, user=user)
+        return SimpleNamespace(user=user, session=self._session)
+
+    async def update_user(self, attributes: Dict[str, Any]) -> SimpleNamespace:
+        if self._session is None:
+            raise AuthApiError("Auth session missing!", 400, "session_not_found")
+        with self._db.lock:
+            if attributes.get("password"):
+                self._db.conn.execute(
+                    "UPDATE auth_users SET password_hash = ? WHERE id = ?",
+                    (self._hash(attributes["password"]), self._session.user.id),
+                )
+            if attributes.get("data"):
+                self._db.conn.execute(
+                    "UPDATE auth_users SET user_metadata = ? WHERE id = ?",
+                    (json.dumps(attributes["data"]), self._session.user.id),
+                )
+            self._db.conn.commit()
+        return await self.get_user(self._session.access_token)
+
+
+class FakeSupabase:
+    """`supabase.table(...)` / `supabase.auth` over one SQLite connection."""
+
+    def __init__(
+        self, db_path: str, jwt_secret: str, latency_ms: float = 0.0, token_ttl: int = 3600, max_rows: int = 1000,
+    ):
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        self.jwt_secret = jwt_secret
+        self.latency = latency_ms / 1000
+        self.token_ttl = token_ttl
+        self.max_rows = max_rows
+        self.refresh_tokens: Dict[str, str] = {}
+        for table, columns in SCHEMA.items():
+            cols = ", ".join(f"{name} {_SQL_TYPES[kind]}" for name, kind in columns.items())
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({cols})")
+        self.conn.executescript(_INDEXES)
+        self.auth = FakeAuth(self)
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+    from_ = table
+
+    def auth_client(self) -> FakeAuth:
+        """A GoTrue client with its own session (see user_auth_client())."""
+        return FakeAuth(self)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def create_user(self, email: str, password: str, state: str = "", is_pro: bool = False) -> Optional[str]:
+        """Auth user plus its public.users row (Supabase does this with a trigger)."""
+        user_id = str(uuid.uuid4())
+        with self.lock:
+            try:
+                self.conn.execute(
+                    "INSERT INTO auth_users (id, email, password_hash) VALUES (?, ?, ?)",
+                    (user_id, email, FakeAuth._hash(password)),
+                )
+            except sqlite3.IntegrityError:
+                return None
+            self.conn.execute(
+                "INSERT INTO users (id, email, state, is_pro) VALUES (?, ?, ?, ?)",
+                (user_id, email, state, int(is_pro)),
+            )
+            self.conn.commit()
+        return user_id
+
+    def is_empty(self) -> bool:
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM users LIMIT 1").fetchone() is None
+
+
+# ─── synthetic data ────────────────────────────────────────────
+
+SEED_PASSWORD = "password123"
+_STATES = [
+    ("CA", "California"), ("FL", "Florida"), ("IL", "Illinois"), ("NY", "New York"),
+    ("OH", "Ohio"), ("PA", "Pennsylvania"), ("TX", "Texas"), ("WA", "Washington"),
+]
+_CATEGORIES = ["ethics", "pharmacology", "patient safety", "infection control", "general"]
+
+
+def seed_email(i: int) -> str:
+    return f"user{i}@example.test"
+
+
+def seed(db: FakeSupabase, users: int, courses: int, records_per_user: int, rng_seed: int = 0) -> Dict[str, int]:
+    """
+    Reference tables, `users` accounts (seed_email(i) / SEED_PASSWORD, every
+    other one Pro) and `records_per_user` CE records each, spread over the
+    last three years. Deterministic for a given `rng_seed`.
+    """
+    rng = random.Random(rng_seed)
+    today = date.today()
+    course_ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(courses)]
+
+    with db.lock:
+        db.conn.executemany("INSERT INTO states (code, name) VALUES (?, ?)", _STATES)
+        db.conn.executemany(
+            "INSERT INTO ce_requirements (state, required_hours, renewal_interval_days, category_minimums) "
+            "VALUES (?, ?, ?, ?)",
+            [("", 30, 730, "{}")] + [
+                (code, rng.choice([20, 24, 30, 40]), rng.choice([365, 730, 1095]),
+                 json.dumps({rng.choice(_CATEGORIES[:4]): rng.choice([2, 3, 5])}))
+                for code, _ in _STATES
+            ],
+        )
+        db.conn.executemany(
+            "INSERT INTO courses (id, name, category, provider) VALUES (?, ?, ?, ?)",
+            [
+                (course_id, f"Course {i + 1}: {rng.choice(_CATEGORIES).title()}",
+                 rng.choice(_CATEGORIES), f"Provider {i % 10 + 1}")
+                for i, course_id in enumerate(course_ids)
+            ],
+        )
+        db.conn.commit()
+
+    password_hash = FakeAuth._hash(SEED_PASSWORD)
+    for i in range(users):
+        user_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        email = seed_email(i)
+        with db.lock:
+            db.conn.execute(
+                "INSERT INTO auth_users (id, email, password_hash) VALUES (?, ?, ?)",
+                (user_id, email, password_hash),
+            )
+            db.conn.execute(
+                "INSERT INTO users (id, email, state, is_pro) VALUES (?, ?, ?, ?)",
+                (user_id, email, rng.choice(_STATES)[0], int(i % 2 == 0)),
+            )
+            db.conn.executemany(
+                "INSERT INTO ce_records (id, user_id, course_id, date_completed, hours_earned, notes) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (str(uuid.UUID(int=rng.getrandbits(128))), user_id,
+                     rng.choice(course_ids) if course_ids else None,
+                     (today - timedelta(days=rng.randrange(3 * 365))).isoformat(),
+                     rng.randint(1, 8), "")
+                    for _ in range(records_per_user)
+                ],
+            )
+            db.conn.commit()
+    return {"users": users, "courses": courses, "records": users * records_per_user}
@@ -0,0 +1,153 @@
+# backend/services/importer.py
+
+import asyncio
+import csv
+import difflib
+import io
+import json
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple, Type
+
+from postgrest import APIError
+from pydantic import BaseModel, ValidationError
+
+from backend.services.reference import reference
+from backend.services.supabase_client import supabase
+
+Row = Tuple[int, Dict[str, Any]]  # (1-based row number, raw fields)
+
+
+def _rows(fileobj: Any, fmt: str) -> Iterator[Dict[str, Any]]:
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        yield from csv.DictReader(text)
+    elif fmt == "ndjson":
+        for line in text:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    # a bad line is that row's error, not the whole file's
+                    yield e
+    else:
+        # a plain JSON array has to be parsed in one go
+        data = json.load(text)
+        if not isinstance(data, list):
+            raise ValueError("JSON import must be an array of records")
+        yield from data
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or content_type in ("application/x-ndjson", "application/jsonl"):
+        return "ndjson"
+    if name.endswith(".json") or content_type == "application/json":
+        return "json"
+    return "csv"
+
+
+async def iter_chunks(fileobj: Any, fmt: str, chunk_size: int) -> AsyncIterator[List[Row]]:
+    """
+    Parse the file `chunk_size` rows at a time on a worker thread, so only
+    one chunk is ever in memory and the event loop never blocks on I/O.
+    """
+    rows = enumerate(_rows(fileobj, fmt), start=1)
+    while True:
+        chunk = await asyncio.to_thread(lambda: list(islice(rows, chunk_size)))
+        if not chunk:
+            return
+        yield chunk
+
+
+class CourseIndex:
+    """Resolves a course by id or by (case-insensitive) title."""
+
+    def __init__(self, courses: List[Dict[str, Any]]):
+        self._ids = {str(c["id"]) for c in courses}
+        self._titles = {}
+        for c in courses:
+            title = c.get("course_title") or c.get("name")
+            if title:
+                self._titles[title.strip().lower()] = str(c["id"])
+
+    def resolve(self, value: Any) -> Optional[str]:
+        value = str(value or "").strip()
+        if value in self._ids:
+            return value
+        return self._titles.get(value.lower())
+
+    def match(self, title: Optional[str], cutoff: float = 0.8) -> Optional[str]:
+        """Best-effort lookup for free text, e.g. a title read off a certificate."""
+        exact = self.resolve(title)
+        if exact or not title:
+            return exact
+        close = difflib.get_close_matches(" ".join(title.lower().split()), list(self._titles), n=1, cutoff=cutoff)
+        return self._titles[close[0]] if close else None
+
+    @classmethod
+    async def load(cls) -> "CourseIndex":
+        return cls(await reference.rows("courses"))
+
+
+def _error(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors())
+
+
+async def import_records(
+    user_id: str,
+    chunks: AsyncIterator[List[Row]],
+    model: Type[BaseModel],
+    max_rows: int,
+) -> Dict[str, Any]:
+    """
+    Validate each chunk against `model`, resolve courses against the cached
+    course index and insert the valid rows with one multi-row request per
+    chunk. Returns a per-row error report.
+    """
+    courses = await CourseIndex.load()
+    inserted = 0
+    errors: List[Dict[str, Any]] = []
+    seen = 0
+
+    try:
+        async for chunk in chunks:
+            batch: List[Tuple[int, Dict[str, Any]]] = []
+            for row_no, raw in chunk:
+                seen += 1
+                if seen > max_rows:
+                    errors.append({"row": row_no, "error": f"Import is limited to {max_rows} rows"})
+                    break
+                if isinstance(raw, ValueError):
+                    errors.append({"row": row_no, "error": f"Invalid JSON: {raw}"})
+                    continue
+                if not isinstance(raw, dict):
+                    errors.append({"row": row_no, "error": "Expected an object"})
+                    continue
+                course_id = courses.resolve(raw.get("course_id") or raw.get("course") or raw.get("course_title"))
+                if not course_id:
+                    errors.append({"row": row_no, "error": "Unknown course"})
+                    continue
+                fields = {**raw, "course_id": course_id}
+                if not fields.get("notes"):
+                    fields.pop("notes", None)  # CSV gives "" for an empty cell
+                try:
+                    rec = model.model_validate(fields)
+                except ValidationError as e:
+                    errors.append({"row": row_no, "error": _error(e)})
+                    continue
+                batch.append((row_no, {**rec.model_dump(mode="json"), "user_id": user_id}))
+
+            if batch:
+                try:
+                    await supabase.table("ce_records").insert([p for _, p in batch]).execute()
+                except APIError as e:
+                    errors.extend({"row": row_no, "error": e.message} for row_no, _ in batch)
+                else:
+                    inserted += len(batch)
+            if seen > max_rows:
+                break
+    except (ValueError, UnicodeDecodeError) as e:
+        # the file stopped parsing part way; keep the report for what came before
+        errors.append({"row": None, "error": f"Could not parse file: {e}"})
+
+    return {"inserted": inserted, "failed": len(errors), "errors": errors}
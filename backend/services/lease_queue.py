@@ -0,0 +1,159 @@
+# backend/services/lease_queue.py
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+
+class LeaseQueue:
+    """
+    SQLite-backed work queue that every process on the host may share.
+    Rows go 'queued' -> 'running' -> whatever the subclass settles them as.
+    A claim is one conditional UPDATE, so each row is taken by exactly one
+    worker, and a running row holds a lease its worker keeps renewing.
+    Only rows whose lease ran out (their process died) are queued again.
+    Use ":memory:" as the database for a purely in-process queue.
+
+    Subclasses set `table` and `schema` (which must have id, status, owner
+    and lease_until columns), say which queued rows are ready and in what
+    order, and implement _run() and _purge().
+    """
+
+    table: str
+    schema: str
+    # SQL over the table's columns; `:now` is the current time
+    ready = "status = 'queued'"
+    order = "created_at"
+    # extra assignments when a row is claimed
+    on_claim = ""
+
+    def __init__(self, db_path: str, workers: int, lease: float):
+        self._db_path = db_path
+        self._workers = workers
+        self._lease = lease
+        self._owner = ""
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._wakeup = asyncio.Event()
+        self._tasks: List["asyncio.Task[None]"] = []
+
+    # ─── storage ────────────────────────────────────────────────
+
+    def _execute(self, sql: str, params: Any = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            cur = self._db.execute(sql, params)
+            rows = cur.fetchall()
+            self._db.commit()
+            return rows
+
+    def _update(self, sql: str, params: Any = ()) -> int:
+        with self._lock:
+            cur = self._db.execute(sql, params)
+            self._db.commit()
+            return cur.rowcount
+
+    def _open(self) -> None:
+        if self._db_path != ":memory:":
+            Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self._db_path, check_same_thread=False, timeout=5)
+        self._db.row_factory = sqlite3.Row
+        self._execute("PRAGMA journal_mode=WAL")
+        self._execute(self.schema)
+        self._recover()
+
+    def _recover(self) -> int:
+        # rows whose worker stopped renewing the lease (its process died) go back in the queue
+        return self._update(
+            f"UPDATE {self.table} SET status = 'queued', owner = NULL, lease_until = NULL "
+            "WHERE status = 'running' AND (lease_until IS NULL OR lease_until < ?)",
+            (time.time(),),
+        )
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        candidates = self._execute(
+            f"SELECT * FROM {self.table} WHERE {self.ready} ORDER BY {self.order} LIMIT 8",
+            {"now": time.time()},
+        )
+        on_claim = f", {self.on_claim}" if self.on_claim else ""
+        for row in candidates:
+            now = time.time()
+            # only one process's UPDATE can still see the row queued
+            claimed = self._update(
+                f"UPDATE {self.table} SET status = 'running', owner = :owner, lease_until = :until{on_claim} "
+                "WHERE id = :id AND status = 'queued'",
+                {"owner": self._owner, "until": now + self._lease, "now": now, "id": row["id"]},
+            )
+            if claimed:
+                return row
+        return None
+
+    def _renew(self, row_id: str) -> int:
+        return self._update(
+            f"UPDATE {self.table} SET lease_until = ? WHERE id = ? AND owner = ? AND status = 'running'",
+            (time.time() + self._lease, row_id, self._owner),
+        )
+
+    async def _keep_lease(self, row_id: str) -> None:
+        while True:
+            await asyncio.sleep(self._lease / 3)
+            await asyncio.to_thread(self._renew, row_id)
+
+    async def _settle(self, row_id: str, assignments: str, params: Tuple[Any, ...] = ()) -> int:
+        """Update a row this worker holds; a no-op if it lost the lease meanwhile."""
+        return await asyncio.to_thread(
+            self._update,
+            f"UPDATE {self.table} SET {assignments}, lease_until = NULL WHERE id = ? AND owner = ?",
+            (*params, row_id, self._owner),
+        )
+
+    def _purge(self) -> None:
+        raise NotImplementedError
+
+    # ─── workers ────────────────────────────────────────────────
+
+    async def _run(self, row: sqlite3.Row) -> None:
+        raise NotImplementedError
+
+    def _idle_timeout(self) -> float:
+        """Seconds to sleep when nothing is ready (a submit wakes workers early)."""
+        return 5.0
+
+    async def _worker(self) -> None:
+        while True:
+            row = await asyncio.to_thread(self._claim)
+            if row is not None:
+                lease = asyncio.create_task(self._keep_lease(row["id"]))
+                try:
+                    await self._run(row)
+                finally:
+                    lease.cancel()
+                continue
+            await asyncio.to_thread(self._recover)
+            await asyncio.to_thread(self._purge)
+            timeout = await asyncio.to_thread(self._idle_timeout)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self) -> None:
+        # per process, so workers forked from one parent still tell their rows apart
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._wakeup = asyncio.Event()
+        await asyncio.to_thread(self._open)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self._workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._db is not None:
+            self._db.close()
+            self._db = None
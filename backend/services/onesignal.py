@@ -0,0 +1,137 @@
+# backend/services/onesignal.py
+
+import asyncio
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from backend.core.config import settings
+
+
+class OneSignalError(Exception):
+    """OneSignal rejected a request, or kept failing after every retry."""
+
+
+class _RateLimiter:
+    """Spaces requests at least 1/rate seconds apart across all callers."""
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+            self._next = max(now, self._next) + self._interval
+
+
+class OneSignalClient:
+    """
+    Push notifications through OneSignal's REST API, addressed by external
+    id (our user id). Recipients are sent in batches of `batch_size` per
+    request, requests are rate limited, and 429s / 5xx / network errors are
+    retried with backoff (honouring Retry-After). Point `base_url` at
+    scripts/fake_onesignal.py to exercise it locally, or pass its app as
+    `transport` (httpx.ASGITransport) to run it in-process.
+    """
+
+    def __init__(
+        self,
+        app_id: Optional[str],
+        api_key: Optional[str],
+        base_url: str,
+        batch_size: int,
+        rate_per_sec: float,
+        max_attempts: int,
+        timeout: float = 10.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self._app_id = app_id
+        self._api_key = api_key
+        self._base_url = base_url.rstrip("/")
+        self._batch_size = batch_size
+        self._max_attempts = max_attempts
+        self._timeout = timeout
+        self._transport = transport
+        self._limiter = _RateLimiter(rate_per_sec)
+        self._http: Optional[httpx.AsyncClient] = None
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+
+    @property
+    def configured(self) -> bool:
+        return bool(self._app_id and self._api_key)
+
+    async def __aenter__(self) -> "OneSignalClient":
+        self._http = httpx.AsyncClient(base_url=self._base_url, timeout=self._timeout, transport=self._transport)
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self._http.aclose()
+        self._http = None
+
+    async def _post(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        last_error = "no attempt made"
+        for attempt in range(1, self._max_attempts + 1):
+            await self._limiter.wait()
+            retry_after: Optional[float] = None
+            try:
+                resp = await self._http.post(
+                    "/notifications",
+                    json=body,
+                    headers={"Authorization": f"Key {self._api_key}"},
+                )
+            except httpx.TransportError as e:
+                last_error = f"{type(e).__name__}: {e}"
+            else:
+                if resp.status_code < 300:
+                    return resp.json()
+                if resp.status_code != 429 and resp.status_code < 500:
+                    raise OneSignalError(f"OneSignal {resp.status_code}: {resp.text}")
+                last_error = f"OneSignal {resp.status_code}"
+                header = resp.headers.get("retry-after", "")
+                retry_after = float(header) if header.replace(".", "", 1).isdigit() else None
+            if attempt < self._max_attempts:
+                delay = retry_after if retry_after is not None else min(30.0, 0.5 * 2 ** (attempt - 1))
+                await asyncio.sleep(delay * random.uniform(1.0, 1.5))
+        raise OneSignalError(f"Giving up after {self._max_attempts} attempts: {last_error}")
+
+    async def send(
+        self,
+        external_ids: List[str],
+        heading: str,
+        message: str,
+        data: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Send one notification to many users; returns OneSignal's reply for each batch."""
+        replies = []
+        for start in range(0, len(external_ids), self._batch_size):
+            body = {
+                "app_id": self._app_id,
+                "target_channel": "push",
+                "include_aliases": {"external_id": external_ids[start:start + self._batch_size]},
+                "headings": {"en": heading},
+                "contents": {"en": message},
+            }
+            if data:
+                body["data"] = data
+            replies.append(await self._post(body))
+        return replies
+
+
+def onesignal_client() -> OneSignalClient:
+    return OneSignalClient(
+        app_id=settings.onesignal_app_id,
+        api_key=settings.onesignal_api_key,
+        base_url=settings.onesignal_api_url,
+        batch_size=settings.onesignal_batch_size,
+        rate_per_sec=settings.onesignal_rate_per_sec,
+        max_attempts=settings.onesignal_max_attempts,
+    )
@@ -0,0 +1,67 @@
+# backend/services/pdf.py
+
+import hashlib
+from typing import List
+
+from backend.core.cache import TTLCache
+from backend.core.config import settings
+from backend.core.metrics import span
+from backend.core.process_pool import PoolBusy, ProcessPool
+
+
+class RendererBusy(Exception):
+    """Every render slot is taken; the caller should retry later."""
+
+
+def _render(html: str) -> bytes:
+    # runs in a worker process; WeasyPrint is only ever imported there
+    from weasyprint import HTML
+    return HTML(string=html).write_pdf()
+
+
+def _render_many(htmls: List[str]) -> bytes:
+    # several reports in one worker round-trip, concatenated into one PDF
+    from weasyprint import HTML
+    documents = [HTML(string=html).render() for html in htmls]
+    pages = [page for document in documents for page in document.pages]
+    return documents[0].copy(pages).write_pdf()
+
+
+class PDFRenderer:
+    """
+    Renders HTML to PDF in a bounded process pool, off the event loop.
+    At most `workers + max_queue` renders are admitted at once; beyond that
+    render() raises RendererBusy instead of queueing without limit.
+    Results are cached by a hash of the HTML, and identical renders already
+    in flight are shared.
+    """
+
+    def __init__(self, workers: int, max_queue: int, cache: TTLCache):
+        self._pool = ProcessPool(workers, cache, limit=workers + max_queue)
+
+    async def render(self, html: str) -> bytes:
+        key = hashlib.sha256(html.encode()).hexdigest()
+        with span("pdf"):
+            try:
+                return await self._pool.run(key, _render, html)
+            except PoolBusy:
+                raise RendererBusy() from None
+
+    async def render_batch(self, htmls: List[str]) -> bytes:
+        """
+        Render many reports into one PDF. Used by background report jobs, which
+        are already bounded by their own worker count, so this waits for a
+        pool slot instead of raising RendererBusy.
+        """
+        with span("pdf"):
+            return await self._pool.call(_render_many, htmls)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown()
+
+
+pdf_renderer = PDFRenderer(
+    workers=settings.pdf_workers,
+    max_queue=settings.pdf_max_queue,
+    cache=TTLCache(maxsize=settings.pdf_cache_size, ttl=settings.pdf_cache_ttl),
+)
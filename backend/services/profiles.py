@@ -0,0 +1,51 @@
+# backend/services/profiles.py
+
+from typing import Any, Dict
+
+from backend.core.cache import TTLCache
+from backend.core.config import settings
+from backend.services.renewal_index import renewal_index
+from backend.services.resilience import last_known_good
+from backend.services.supabase_client import supabase
+from backend.services.versions import data_versions
+
+# Process-wide cache of users-table profiles, keyed by user id.
+# Writers (payments webhook, settings form) must await invalidate_profile().
+profile_cache = TTLCache(maxsize=settings.profile_cache_size, ttl=settings.profile_cache_ttl)
+
+
+async def _load_profile(user_id: str) -> Dict[str, Any]:
+    res = await (
+        supabase.table("users")
+        .select("is_pro,state")
+        .eq("id", user_id)
+        .limit(1)
+        .execute()
+    )
+    return res.data[0] if res.data else {}
+
+
+async def get_profile(user_id: str) -> Dict[str, Any]:
+    # drops our cached copy if another worker changed the user since
+    await data_versions.get(user_id)
+    profile = profile_cache.get(user_id)
+    if profile is not None:
+        return profile
+
+    # every authenticated page needs this: during a Supabase outage use the
+    # last profile read, uncached, so the next request tries again
+    profile, stale = await last_known_good.load(("profile", user_id), lambda: _load_profile(user_id))
+    if not stale:
+        profile_cache.set(user_id, profile)
+    return profile
+
+
+data_versions.on_change(profile_cache.pop)
+
+
+async def invalidate_profile(user_id: str) -> None:
+    profile_cache.pop(user_id)
+    # pages showing the profile are stale too
+    await data_versions.bump(user_id)
+    # a new state means a new renewal rule and date
+    await renewal_index.touch(user_id)
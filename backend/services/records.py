@@ -0,0 +1,91 @@
+# backend/services/records.py
+
+import base64
+import json
+import uuid
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.core.config import settings
+from backend.services.supabase_client import supabase
+
+# projected columns for record listings (no select("*"))
+RECORD_COLUMNS = "id,user_id,course_id,date_completed,hours_earned,notes"
+
+# PostgREST's default max-rows; a page plus its look-ahead row must fit
+MAX_ROWS = 1000
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Opaque keyset cursor pointing just past `row`."""
+    raw = json.dumps([str(row["date_completed"]), str(row["id"])], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[str, str]:
+    """Raises ValueError on anything that isn't one of our cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        date_completed, record_id = json.loads(raw)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(date_completed, str) or not isinstance(record_id, str):
+        raise ValueError("Invalid cursor")
+    # both go into a PostgREST filter: only a real date and uuid may get there
+    try:
+        return date.fromisoformat(date_completed).isoformat(), str(uuid.UUID(record_id))
+    except ValueError as e:
+        raise ValueError("Invalid cursor") from e
+
+
+async def fetch_page(
+    user_id: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    columns: str = RECORD_COLUMNS,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of a user's records, newest first, keyset-paginated on
+    (date_completed, id). Returns the rows and the cursor for the next page
+    (None on the last page).
+    """
+    limit = min(limit, MAX_ROWS - 1)
+    query = (
+        supabase
+        .table("ce_records")
+        .select(columns)
+        .eq("user_id", user_id)
+    )
+    if cursor:
+        date_completed, record_id = decode_cursor(cursor)
+        query = query.or_(
+            f"date_completed.lt.{date_completed},"
+            f"and(date_completed.eq.{date_completed},id.lt.{record_id})"
+        )
+    # one extra row tells us whether there is a next page
+    resp = await (
+        query
+        .order("date_completed", desc=True)
+        .order("id", desc=True)
+        .limit(limit + 1)
+        .execute()
+    )
+    rows = resp.data or []
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+
+async def fetch_all(user_id: str, columns: str = RECORD_COLUMNS) -> List[Dict[str, Any]]:
+    """
+    All of a user's records, newest first (reports need the full list),
+    read in keyset pages so PostgREST's max-rows cap can't cut it short.
+    """
+    rows: List[Dict[str, Any]] = []
+    cursor = None
+    while True:
+        page, cursor = await fetch_page(user_id, settings.export_page_size, cursor, columns)
+        rows.extend(page)
+        if cursor is None:
+            return rows
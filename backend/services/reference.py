@@ -0,0 +1,120 @@
+# backend/services/reference.py
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from backend.core.cache import TTLCache
+from backend.core.config import settings
+from backend.core.etag import make_etag
+from backend.services.resilience import UpstreamUnavailable
+from backend.services.supabase_client import supabase
+
+
+class ReferenceData(BaseModel):
+    rows: List[Dict[str, Any]]
+    etag: str
+
+
+Loader = Callable[[], Awaitable[List[Dict[str, Any]]]]
+
+
+class ReferenceCache:
+    """
+    TTL cache for slow-changing tables (courses, states, requirements).
+    Loads are single-flight: a cold cache under a burst of requests runs
+    one query per table and everybody else awaits its result. While
+    Supabase is unavailable, the last rows loaded are served instead.
+    """
+
+    def __init__(self, ttl: float):
+        self._cache = TTLCache(maxsize=64, ttl=ttl)
+        self._loaders: Dict[str, Loader] = {}
+        self._inflight: Dict[str, "asyncio.Future[ReferenceData]"] = {}
+        self._generation: Dict[str, int] = {}
+        self._last: Dict[str, ReferenceData] = {}
+
+    def register(self, name: str, loader: Loader) -> None:
+        self._loaders[name] = loader
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._loaders)
+
+    async def _load(self, name: str) -> ReferenceData:
+        generation = self._generation.get(name, 0)
+        try:
+            rows = await self._loaders[name]()
+        except UpstreamUnavailable:
+            # not cached: the next request tries the upstream again
+            if name not in self._last:
+                raise
+            return self._last[name]
+        data = ReferenceData(rows=rows, etag=make_etag(name, rows))
+        # don't resurrect data that was invalidated while we were loading
+        if self._generation.get(name, 0) == generation:
+            self._last[name] = data
+            self._cache.set(name, data)
+        return data
+
+    async def get(self, name: str) -> ReferenceData:
+        data = self._cache.get(name)
+        if data is not None:
+            return data
+        inflight = self._inflight.get(name)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._load(name))
+            self._inflight[name] = inflight
+            inflight.add_done_callback(lambda done: self._forget(name, done))
+        # shield: one caller going away must not cancel everybody's load
+        return await asyncio.shield(inflight)
+
+    def _forget(self, name: str, done: "asyncio.Future[ReferenceData]") -> None:
+        # a load invalidate() already replaced must not unregister its successor
+        if self._inflight.get(name) is done:
+            del self._inflight[name]
+
+    async def rows(self, name: str) -> List[Dict[str, Any]]:
+        return (await self.get(name)).rows
+
+    async def versions(self) -> List[str]:
+        """
+        ETags of every table's current rows, for pages derived from them. A
+        table past its TTL or invalidated is reloaded first, so a 304 never
+        vouches for rows that have since changed.
+        """
+        return await asyncio.gather(*(self._version(n) for n in self._loaders))
+
+    async def _version(self, name: str) -> str:
+        try:
+            return (await self.get(name)).etag
+        except UpstreamUnavailable:
+            # never loaded and Supabase is down: nothing to match against
+            return ""
+
+    def invalidate(self, name: Optional[str] = None) -> List[str]:
+        names = [name] if name else list(self._loaders)
+        for n in names:
+            self._generation[n] = self._generation.get(n, 0) + 1
+            self._cache.pop(n)
+            self._inflight.pop(n, None)
+        return names
+
+
+async def _load_courses() -> List[Dict[str, Any]]:
+    return (await supabase.table("courses").select("*").execute()).data or []
+
+
+async def _load_states() -> List[Dict[str, Any]]:
+    return (await supabase.table("states").select("code,name").order("name").execute()).data or []
+
+
+async def _load_requirements() -> List[Dict[str, Any]]:
+    return (await supabase.table("ce_requirements").select("*").execute()).data or []
+
+
+reference = ReferenceCache(ttl=settings.reference_cache_ttl)
+reference.register("courses", _load_courses)
+reference.register("states", _load_states)
+reference.register("ce_requirements", _load_requirements)
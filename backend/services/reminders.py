@@ -0,0 +1,91 @@
+# backend/services/reminders.py
+
+import asyncio
+from collections import defaultdict
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+from backend.core.config import settings
+from backend.services.compliance import compliance
+from backend.services.onesignal import OneSignalClient, OneSignalError
+from backend.services.renewal_index import RenewalIndex
+
+
+def _window(days_left: int, windows: Sequence[int]) -> Optional[int]:
+    # the narrowest window the renewal has entered, e.g. 7 of (60, 30, 7) at 5 days
+    entered = [w for w in windows if days_left <= w]
+    return min(entered) if entered else None
+
+
+class RenewalReminders:
+    """
+    Pushes "your renewal is coming up" notifications. Each run:
+      1. re-indexes the users the app touched since the last run (new
+         records, a changed state or plan), or with `refresh` every user
+         from a full compliance sweep (nightly is plenty),
+      2. takes the users whose reminder window has opened from the index,
+      3. re-checks just those users, so anyone who logged hours since the
+         last refresh isn't nagged,
+      4. sends one batched notification per window and records it, so each
+         window is sent once per renewal date.
+    """
+
+    def __init__(self, index: RenewalIndex, client: OneSignalClient, windows: Sequence[int]):
+        self._index = index
+        self._client = client
+        self._windows = sorted(windows, reverse=True)
+
+    async def run(self, as_of: Optional[date] = None, refresh: bool = False, dry_run: bool = False) -> Dict[str, Any]:
+        as_of = as_of or date.today()
+        # read before sweeping: a write landing mid-sweep stays flagged for next time
+        stale = await asyncio.to_thread(self._index.stale)
+        if refresh:
+            await asyncio.to_thread(self._index.update, await compliance.sweep(as_of=as_of))
+        elif stale:
+            touched = await compliance.sweep(as_of=as_of, user_ids=[r["user_id"] for r in stale])
+            await asyncio.to_thread(self._index.update, touched)
+        await asyncio.to_thread(self._index.settle, stale)
+
+        candidates = await asyncio.to_thread(self._index.due, as_of, self._windows[0])
+        if candidates:
+            fresh = await compliance.sweep(as_of=as_of, user_ids=[r["user_id"] for r in candidates])
+            await asyncio.to_thread(self._index.update, fresh)
+            candidates = await asyncio.to_thread(self._index.due, as_of, self._windows[0])
+
+        by_window: Dict[int, List[str]] = defaultdict(list)
+        for row in candidates:
+            days_left = (date.fromisoformat(row["next_renewal_date"]) - as_of).days
+            window = _window(days_left, self._windows)
+            if window is None:
+                continue
+            # already told about this window (or a narrower one)
+            if row["reminded_window"] is not None and row["reminded_window"] <= window:
+                continue
+            by_window[window].append(row["user_id"])
+
+        summary: Dict[str, Any] = {"checked": len(candidates), "sent": 0, "failed": 0, "windows": {}}
+        for window, user_ids in sorted(by_window.items()):
+            summary["windows"][window] = len(user_ids)
+            if dry_run:
+                continue
+            for start in range(0, len(user_ids), self._client.batch_size):
+                batch = user_ids[start:start + self._client.batch_size]
+                try:
+                    await self._client.send(
+                        batch,
+                        heading="CE renewal coming up",
+                        message=f"Your license renewal is due within {window} days. "
+                                "Log your remaining CE hours in CredentiCare.",
+                        data={"type": "renewal_reminder", "window_days": window},
+                    )
+                except OneSignalError:
+                    # not marked, so the next run tries these users again
+                    summary["failed"] += len(batch)
+                    continue
+                await asyncio.to_thread(self._index.mark, batch, window)
+                summary["sent"] += len(batch)
+        return summary
+
+
+def reminder_windows() -> List[int]:
+    return [int(w) for w in settings.reminder_windows.split(",") if w.strip()]
@@ -0,0 +1,145 @@
+# backend/services/renewal_index.py
+
+import asyncio
+import logging
+import sqlite3
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from backend.core.config import settings
+
+log = logging.getLogger("credenticare.reminders")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS renewal_index (
+    user_id           TEXT PRIMARY KEY,
+    next_renewal_date TEXT NOT NULL,
+    compliant         INTEGER NOT NULL,
+    hours_remaining   INTEGER NOT NULL,
+    reminded_window   INTEGER
+);
+CREATE INDEX IF NOT EXISTS renewal_index_due ON renewal_index (next_renewal_date);
+CREATE TABLE IF NOT EXISTS renewal_stale (
+    user_id TEXT PRIMARY KEY,
+    touches INTEGER NOT NULL
+);
+"""
+
+# a renewal date that moved resets the reminders already sent for it
+_UPSERT = """
+INSERT INTO renewal_index (user_id, next_renewal_date, compliant, hours_remaining)
+VALUES (?, ?, ?, ?)
+ON CONFLICT (user_id) DO UPDATE SET
+    compliant = excluded.compliant,
+    hours_remaining = excluded.hours_remaining,
+    reminded_window = CASE
+        WHEN renewal_index.next_renewal_date = excluded.next_renewal_date THEN renewal_index.reminded_window
+    END,
+    next_renewal_date = excluded.next_renewal_date
+"""
+
+
+class RenewalIndex:
+    """
+    Users ordered by next_renewal_date (SQLite, indexed on the date), with
+    the smallest reminder window already sent for that date. Finding who is
+    due is a range scan over the index rather than a pass over every user.
+
+    The web workers and the reminder job share the file: writers call
+    touch() for a user whose records, state or plan changed, and the next
+    reminder run re-indexes just those users before picking who is due.
+    """
+
+    def __init__(self, db_path: str):
+        self._db_path = db_path
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self._db_path != ":memory:":
+                Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self._db_path, check_same_thread=False, timeout=5)
+            self._db.row_factory = sqlite3.Row
+            if self._db_path != ":memory:":
+                self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(_SCHEMA)
+        return self._db
+
+    def open(self) -> None:
+        with self._lock:
+            self._conn()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def update(self, statuses: Dict[str, Dict[str, Any]]) -> None:
+        """Upsert compliance statuses as returned by compliance.sweep()."""
+        with self._lock:
+            db = self._conn()
+            db.executemany(_UPSERT, (
+                (user_id, s["next_renewal_date"], int(s["compliant"]), s["hours_remaining"])
+                for user_id, s in statuses.items()
+            ))
+            db.commit()
+
+    def due(self, as_of: date, horizon: int) -> List[sqlite3.Row]:
+        """Non-compliant users whose renewal falls within `horizon` days of `as_of`."""
+        with self._lock:
+            return self._conn().execute(
+                "SELECT * FROM renewal_index "
+                "WHERE next_renewal_date BETWEEN ? AND ? AND compliant = 0",
+                (as_of.isoformat(), (as_of + timedelta(days=horizon)).isoformat()),
+            ).fetchall()
+
+    def mark(self, user_ids: Iterable[str], window: int) -> None:
+        with self._lock:
+            db = self._conn()
+            db.executemany(
+                "UPDATE renewal_index SET reminded_window = ? WHERE user_id = ?",
+                ((window, user_id) for user_id in user_ids),
+            )
+            db.commit()
+
+    async def touch(self, user_id: str) -> None:
+        """
+        Flag `user_id`'s entry as out of date, off the event loop. Never
+        raises: the caller's write already succeeded, and the nightly
+        refresh repairs an entry whose flag was lost.
+        """
+        try:
+            await asyncio.to_thread(self._touch, user_id)
+        except sqlite3.Error:
+            log.warning("could not flag %s for the renewal index", user_id, exc_info=True)
+
+    def _touch(self, user_id: str) -> None:
+        with self._lock:
+            db = self._conn()
+            db.execute(
+                "INSERT INTO renewal_stale (user_id, touches) VALUES (?, 1) "
+                "ON CONFLICT (user_id) DO UPDATE SET touches = renewal_stale.touches + 1",
+                (user_id,),
+            )
+            db.commit()
+
+    def stale(self) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn().execute("SELECT user_id, touches FROM renewal_stale").fetchall()
+
+    def settle(self, rows: Iterable[sqlite3.Row]) -> None:
+        """Clear flags returned by stale(); a user touched again since keeps theirs."""
+        with self._lock:
+            db = self._conn()
+            db.executemany(
+                "DELETE FROM renewal_stale WHERE user_id = ? AND touches = ?",
+                ((r["user_id"], r["touches"]) for r in rows),
+            )
+            db.commit()
+
+
+renewal_index = RenewalIndex(settings.reminders_db)
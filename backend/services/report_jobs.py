@@ -0,0 +1,180 @@
+# backend/services/report_jobs.py
+
+import asyncio
+import json
+import sqlite3
+import time
+import traceback
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from starlette.requests import Request
+
+from backend.core.config import settings
+from backend.jinja_env import templates
+from backend.services.compliance import compliance
+from backend.services.lease_queue import LeaseQueue
+from backend.services.pdf import pdf_renderer
+from backend.services.profiles import get_profile
+from backend.services.records import fetch_all
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS report_jobs (
+    id          TEXT PRIMARY KEY,
+    owner_id    TEXT NOT NULL,
+    user_ids    TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    error       TEXT,
+    artifact    TEXT,
+    base_url    TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    started_at  REAL,
+    finished_at REAL,
+    owner       TEXT,
+    lease_until REAL
+)
+"""
+
+
+class ReportJobQueue(LeaseQueue):
+    """
+    Queue of PDF report jobs (see LeaseQueue for claims and leases). A few
+    in-process workers render every requested user's report.html in one
+    batch through the PDF process pool, and store the PDF on disk for
+    download.
+    """
+
+    table = "report_jobs"
+    schema = _SCHEMA
+    on_claim = "started_at = :now"
+
+    def __init__(self, db_path: str, artifacts_dir: str, workers: int, retention: float, lease: float):
+        super().__init__(db_path, workers, lease)
+        self._artifacts = Path(artifacts_dir)
+        self._retention = retention
+        self._app: Any = None
+
+    # ─── storage ────────────────────────────────────────────────
+
+    def _open(self) -> None:
+        self._artifacts.mkdir(parents=True, exist_ok=True)
+        super()._open()
+
+    def _purge(self) -> None:
+        cutoff = time.time() - self._retention
+        for row in self._execute(
+            "SELECT id, artifact FROM report_jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+            (cutoff,),
+        ):
+            if row["artifact"]:
+                Path(row["artifact"]).unlink(missing_ok=True)
+            self._execute("DELETE FROM report_jobs WHERE id = ?", (row["id"],))
+
+    @staticmethod
+    def _as_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "id": row["id"],
+            "status": row["status"],
+            "user_count": len(json.loads(row["user_ids"])),
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "finished_at": row["finished_at"],
+        }
+
+    # ─── public API ─────────────────────────────────────────────
+
+    async def submit(self, owner_id: str, user_ids: List[str], base_url: str) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO report_jobs (id, owner_id, user_ids, status, base_url, created_at) "
+            "VALUES (?, ?, ?, 'queued', ?, ?)",
+            (job_id, owner_id, json.dumps(user_ids), base_url, time.time()),
+        )
+        self._wakeup.set()
+        return await self.get(job_id)
+
+    async def _row(self, job_id: str, owner_id: Optional[str] = None) -> Optional[sqlite3.Row]:
+        rows = await asyncio.to_thread(self._execute, "SELECT * FROM report_jobs WHERE id = ?", (job_id,))
+        if not rows or (owner_id is not None and rows[0]["owner_id"] != owner_id):
+            return None
+        return rows[0]
+
+    async def get(self, job_id: str, owner_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Job status; pass `owner_id` to hide other people's jobs."""
+        row = await self._row(job_id, owner_id)
+        return self._as_dict(row) if row else None
+
+    async def artifact(self, job_id: str, owner_id: Optional[str] = None) -> Optional[Path]:
+        row = await self._row(job_id, owner_id)
+        if not row or row["status"] != "done" or not row["artifact"]:
+            return None
+        return Path(row["artifact"])
+
+    async def watch(self, job_id: str, owner_id: Optional[str] = None, interval: float = 1.0):
+        """Yield the job's status each time it changes, until it finishes."""
+        last = None
+        while True:
+            job = await self.get(job_id, owner_id)
+            if job is None:
+                return
+            if job != last:
+                yield job
+                last = job
+            if job["status"] in ("done", "failed"):
+                return
+            await asyncio.sleep(interval)
+
+    # ─── workers ────────────────────────────────────────────────
+
+    def _render_html(self, base_url: str, records: List[Dict[str, Any]], status: Dict[str, Any]) -> str:
+        # report.html needs a request for url_for(); fake one rooted at the submitter's base URL
+        scheme, _, host = base_url.rstrip("/").partition("://")
+        request = Request({
+            "type": "http",
+            "app": self._app,
+            "router": self._app.router,
+            "scheme": scheme,
+            "server": None,
+            "root_path": "",
+            "path": "/",
+            "query_string": b"",
+            "headers": [(b"host", host.encode())],
+        })
+        return templates.get_template("report.html").render(
+            request=request, records=records, status=status
+        )
+
+    async def _run(self, row: sqlite3.Row) -> None:
+        job_id = row["id"]
+        try:
+            htmls = []
+            for user_id in json.loads(row["user_ids"]):
+                profile = await get_profile(user_id)
+                records, status = await asyncio.gather(
+                    fetch_all(user_id),
+                    compliance.status(user_id, profile.get("state")),
+                )
+                # a big report takes a while to render; keep the loop serving requests
+                htmls.append(await asyncio.to_thread(self._render_html, row["base_url"], records, status))
+            pdf_bytes = await pdf_renderer.render_batch(htmls)
+            path = self._artifacts / f"{job_id}.pdf"
+            await asyncio.to_thread(path.write_bytes, pdf_bytes)
+            await self._settle(job_id, "status = 'done', artifact = ?, finished_at = ?", (str(path), time.time()))
+        except Exception as e:
+            traceback.print_exc()
+            await self._settle(job_id, "status = 'failed', error = ?, finished_at = ?", (str(e), time.time()))
+
+    async def start(self, app: Any) -> None:
+        self._app = app
+        await super().start()
+
+
+report_jobs = ReportJobQueue(
+    db_path=settings.report_jobs_db,
+    artifacts_dir=settings.report_artifacts_dir,
+    workers=settings.report_job_workers,
+    retention=settings.report_job_retention,
+    lease=settings.report_job_lease,
+)
@@ -0,0 +1,196 @@
+# backend/services/resilience.py
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Hashable, Optional, Tuple
+
+import httpx
+from postgrest import APIError
+
+from backend.core.cache import TTLCache
+from backend.core.config import settings
+from backend.core.metrics import upstream_failures
+
+# PostgREST can't reach Postgres / schema cache not ready; Postgres statement
+# timeout, serialization failure, deadlock: worth another try for a read
+_TRANSIENT_CODES = {"PGRST000", "PGRST001", "PGRST002", "PGRST003", "57014", "40001", "40P01"}
+
+
+class UpstreamUnavailable(Exception):
+    """Supabase is down, too slow, or the circuit is open; try again later."""
+
+    def __init__(self, reason: str, retry_after: float = 5.0):
+        super().__init__(reason)
+        self.retry_after = retry_after
+
+
+def _failure_kind(exc: BaseException) -> Optional[str]:
+    """How `exc` counts against the upstream, or None when it's the caller's fault."""
+    if isinstance(exc, asyncio.TimeoutError):
+        return "timeout"
+    if isinstance(exc, httpx.TransportError):
+        return "transport"
+    if isinstance(exc, APIError):
+        code = exc.code
+        if (isinstance(code, int) and code >= 500) or str(code) in _TRANSIENT_CODES:
+            return "server"
+        if str(code) == "204" and exc.message == "Missing response":
+            # maybe_single() swaps whatever went wrong upstream for this one;
+            # reads through here use limit(1) so the real error comes through
+            return "server"
+    return None
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failed calls; while open, calls
+    fail at once. After `reset_timeout` one trial call is let through: its
+    success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self._threshold = threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        return "half-open" if self._probing else "open"
+
+    def before_call(self) -> None:
+        if self._opened_at is None:
+            return
+        waited = time.monotonic() - self._opened_at
+        if waited < self._reset_timeout or self._probing:
+            raise UpstreamUnavailable("circuit open", retry_after=max(1.0, self._reset_timeout - waited))
+        self._probing = True
+
+    def success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def cancelled(self) -> None:
+        # a trial call that never finished proves nothing; let another one try
+        self._probing = False
+
+    def failure(self) -> None:
+        self._failures += 1
+        if self._probing or self._failures >= self._threshold:
+            self._opened_at = time.monotonic()
+        self._probing = False
+
+
+class Resilience:
+    """
+    Runs PostgREST requests with a per-call timeout, retries reads (GET/HEAD)
+    with full-jitter backoff, and keeps a circuit breaker over the upstream.
+    Upstream failures surface as UpstreamUnavailable; anything else (bad
+    filters, constraint violations) is re-raised untouched.
+    """
+
+    def __init__(self, timeout: float, retries: int, retry_base: float, breaker: CircuitBreaker):
+        self._timeout = timeout
+        self._retries = retries
+        self._retry_base = retry_base
+        self.breaker = breaker
+
+    async def execute(self, builder: Any) -> Any:
+        attempts = 1 + (self._retries if getattr(builder, "http_method", None) in ("GET", "HEAD") else 0)
+        self.breaker.before_call()
+        try:
+            for attempt in range(attempts):
+                try:
+                    result = await asyncio.wait_for(builder.execute(), self._timeout)
+                except Exception as e:
+                    kind = _failure_kind(e)
+                    if kind is None:
+                        self.breaker.success()  # it answered
+                        raise
+                    upstream_failures.inc(kind=kind)
+                    if attempt + 1 == attempts:
+                        # one strike per call, however many attempts it took
+                        self.breaker.failure()
+                        raise UpstreamUnavailable(f"Supabase {kind} error") from e
+                    await asyncio.sleep(random.uniform(0, self._retry_base * 2 ** attempt))
+                else:
+                    self.breaker.success()
+                    return result
+        except asyncio.CancelledError:
+            self.breaker.cancelled()
+            raise
+
+
+class _Request:
+    """Forwards a PostgREST request builder, routing execute() through Resilience."""
+
+    __slots__ = ("_builder", "_resilience")
+
+    def __init__(self, builder: Any, resilience: Resilience):
+        self._builder = builder
+        self._resilience = resilience
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            result = attr(*args, **kwargs)
+            return _Request(result, self._resilience) if hasattr(result, "execute") else result
+
+        return call
+
+    async def execute(self) -> Any:
+        return await self._resilience.execute(self._builder)
+
+
+class ResilientClient:
+    """The Supabase client, with table()/from_() requests run through Resilience."""
+
+    def __init__(self, client: Any, resilience: Resilience):
+        self._client = client
+        self._resilience = resilience
+
+    def table(self, name: str) -> Any:
+        return _Request(self._client.table(name), self._resilience)
+
+    from_ = table
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._client, attr)
+
+
+class LastKnownGood:
+    """
+    The last successful result per key. While Supabase is unavailable,
+    load() hands that back flagged as stale instead of failing the page.
+    """
+
+    def __init__(self, cache: TTLCache):
+        self._values = cache
+
+    async def load(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        try:
+            value = await fetch()
+        except UpstreamUnavailable:
+            value = self._values.get(key)
+            if value is None:
+                raise
+            return value, True
+        self._values.set(key, value)
+        return value, False
+
+
+resilience = Resilience(
+    timeout=settings.supabase_call_timeout,
+    retries=settings.supabase_read_retries,
+    retry_base=settings.supabase_retry_base,
+    breaker=CircuitBreaker(settings.breaker_threshold, settings.breaker_reset_timeout),
+)
+last_known_good = LastKnownGood(TTLCache(maxsize=settings.stale_cache_size, ttl=settings.stale_cache_ttl))
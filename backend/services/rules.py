@@ -0,0 +1,153 @@
+# backend/services/rules.py
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import date, timedelta
+from itertools import accumulate
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+
+def as_date(value: Any) -> date:
+    # PostgREST hands dates back as ISO strings
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+class StateRule(BaseModel):
+    """One row of ce_requirements: what a state asks for per renewal cycle."""
+    state: str = ""  # "" is the fallback rule for states without their own row
+    required_hours: int
+    renewal_interval_days: int
+    category_minimums: Dict[str, int] = {}
+
+
+class RuleBook:
+    """
+    All requirement rules indexed by state code, plus the course -> category
+    index needed for category minimums. Built once and shared read-only.
+    """
+
+    def __init__(self, rules: Iterable[StateRule], course_categories: Dict[str, str]):
+        self._by_state: Dict[str, StateRule] = {r.state.upper(): r for r in rules}
+        if not self._by_state:
+            raise ValueError("No CE requirement configured")
+        # states without a row fall back to the global row (or the first one)
+        self._default = self._by_state.get("") or next(iter(self._by_state.values()))
+        self._course_categories = course_categories
+
+    @classmethod
+    def from_rows(
+        cls,
+        requirement_rows: Iterable[Dict[str, Any]],
+        course_rows: Iterable[Dict[str, Any]] = (),
+    ) -> "RuleBook":
+        rules = [
+            StateRule(
+                state=row.get("state") or "",
+                required_hours=row["required_hours"],
+                renewal_interval_days=row["renewal_interval_days"],
+                category_minimums=row.get("category_minimums") or {},
+            )
+            for row in requirement_rows
+        ]
+        categories = {
+            str(c["id"]): c["category"] for c in course_rows if c.get("category")
+        }
+        return cls(rules, categories)
+
+    def for_state(self, state: Optional[str]) -> StateRule:
+        return self._by_state.get((state or "").upper(), self._default)
+
+    def category_of(self, course_id: Any) -> Optional[str]:
+        return self._course_categories.get(str(course_id))
+
+
+def cycle_window(renewal_interval_days: int, as_of: date) -> Tuple[date, date]:
+    """The renewal cycle ending `as_of`, inclusive at both ends."""
+    return as_of - timedelta(days=renewal_interval_days), as_of
+
+
+def build_status(
+    rule: StateRule,
+    hours_completed: int,
+    category_hours: Dict[str, int],
+    latest: Optional[date],
+    as_of: date,
+) -> Dict[str, Any]:
+    category_remaining = {
+        cat: max(0, minimum - category_hours.get(cat, 0))
+        for cat, minimum in rule.category_minimums.items()
+    }
+    hours_remaining = max(0, rule.required_hours - hours_completed)
+    return {
+        "state": rule.state,
+        "required_hours": rule.required_hours,
+        "hours_completed": hours_completed,
+        "hours_remaining": hours_remaining,
+        "category_remaining": category_remaining,
+        "compliant": hours_remaining == 0 and not any(category_remaining.values()),
+        "next_renewal_date": str((latest or as_of) + timedelta(days=rule.renewal_interval_days)),
+    }
+
+
+class _Column:
+    """Completion dates (as ordinals) sorted ascending, with running hour totals."""
+
+    def __init__(self, rows: List[Tuple[int, int]]):
+        rows.sort()
+        self.ordinals = [o for o, _ in rows]
+        self.prefix = [0, *accumulate(h for _, h in rows)]
+
+    def hours_between(self, start: int, end: int) -> int:
+        # inclusive [start, end] via two binary searches
+        return self.prefix[bisect_right(self.ordinals, end)] - self.prefix[bisect_left(self.ordinals, start)]
+
+
+def evaluate_batch(
+    rulebook: RuleBook,
+    users: Iterable[Tuple[str, Optional[str]]],
+    records: Iterable[Dict[str, Any]],
+    as_of: Optional[date] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Compliance for many users at once. `users` yields (user_id, state);
+    `records` are ce_records rows for any of them, in any order. Records are
+    grouped per user into sorted date columns, so each cycle window is two
+    binary searches instead of a scan.
+    """
+    as_of = as_of or date.today()
+
+    totals: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+    by_category: Dict[str, Dict[str, List[Tuple[int, int]]]] = defaultdict(lambda: defaultdict(list))
+    for r in records:
+        row = (as_date(r["date_completed"]).toordinal(), r["hours_earned"])
+        totals[r["user_id"]].append(row)
+        category = rulebook.category_of(r.get("course_id"))
+        if category:
+            by_category[r["user_id"]][category].append(row)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for user_id, state in users:
+        rule = rulebook.for_state(state)
+        start, end = (d.toordinal() for d in cycle_window(rule.renewal_interval_days, as_of))
+        column = _Column(totals.get(user_id, []))
+        category_hours = {
+            cat: _Column(rows).hours_between(start, end)
+            for cat, rows in by_category.get(user_id, {}).items()
+            if cat in rule.category_minimums
+        }
+        latest = date.fromordinal(column.ordinals[-1]) if column.ordinals else None
+        results[user_id] = build_status(rule, column.hours_between(start, end), category_hours, latest, as_of)
+    return results
+
+
+def evaluate(
+    rulebook: RuleBook,
+    state: Optional[str],
+    records: Iterable[Dict[str, Any]],
+    as_of: Optional[date] = None,
+) -> Dict[str, Any]:
+    """Single-user convenience wrapper around evaluate_batch()."""
+    rows = [dict(r, user_id="") for r in records]
+    return evaluate_batch(rulebook, [("", state)], rows, as_of)[""]
@@ -0,0 +1,160 @@
+# backend/services/storage.py
+
+import asyncio
+import hashlib
+import os
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Optional, Tuple
+
+import httpx
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from backend.core.config import settings
+from backend.core.metrics import upstream_failures
+from backend.services import supabase_client
+from backend.services.resilience import UpstreamUnavailable
+
+
+class FileTooLarge(Exception):
+    """The upload went past the store's size limit."""
+
+
+class StagedFile(BaseModel):
+    path: Path
+    sha256: str
+    size_bytes: int
+
+
+def _already_exists(resp: httpx.Response) -> bool:
+    # Storage answers 409, or (older versions) 400 with {"statusCode": "409", "error": "Duplicate"}
+    if resp.status_code == 409:
+        return True
+    try:
+        body = resp.json()
+    except ValueError:
+        return False
+    return isinstance(body, dict) and (body.get("error") == "Duplicate" or str(body.get("statusCode")) == "409")
+
+
+class CertificateStore:
+    """
+    Streams uploads to storage in fixed-size chunks, hashing as it goes, so
+    memory per upload stays at one chunk whatever the file size. Files are
+    content-addressed by SHA-256: a certificate uploaded twice is stored once.
+    Files land on local disk; with a bucket configured they are then streamed
+    on to Supabase Storage and the local copy is dropped. The fake data
+    backend has no Storage, so there files always stay on disk.
+    """
+
+    def __init__(self, root: str, chunk_size: int, max_bytes: int, bucket: Optional[str] = None):
+        self._root = Path(root)
+        self._chunk_size = chunk_size
+        self._max_bytes = max_bytes
+        self._bucket = bucket
+
+    @staticmethod
+    def key_for(sha256: str) -> str:
+        return f"{sha256[:2]}/{sha256}"
+
+    def path(self, key: str) -> Path:
+        return self._root / key
+
+    async def stage(self, chunks: AsyncIterator[bytes]) -> StagedFile:
+        """
+        Write the stream to a local staging file. Raises FileTooLarge as soon
+        as the stream passes the limit; nothing is left behind on error.
+        """
+        staging = self._root / "tmp" / uuid.uuid4().hex
+        await asyncio.to_thread(staging.parent.mkdir, parents=True, exist_ok=True)
+        out: BinaryIO = await asyncio.to_thread(open, staging, "wb")
+        digest = hashlib.sha256()
+        size = 0
+        buffer = bytearray()
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > self._max_bytes:
+                    raise FileTooLarge()
+                digest.update(chunk)
+                buffer += chunk
+                while len(buffer) >= self._chunk_size:
+                    await asyncio.to_thread(out.write, buffer[:self._chunk_size])
+                    del buffer[:self._chunk_size]
+            if buffer:
+                await asyncio.to_thread(out.write, buffer)
+        except BaseException:
+            out.close()
+            staging.unlink(missing_ok=True)
+            raise
+        await asyncio.to_thread(out.close)
+        return StagedFile(path=staging, sha256=digest.hexdigest(), size_bytes=size)
+
+    async def commit(self, staged: StagedFile, content_type: Optional[str] = None) -> str:
+        """Move a staged file to its content address and return its key."""
+        key = self.key_for(staged.sha256)
+        storage = supabase_client.storage_http() if self._bucket else None
+        try:
+            if storage is not None:
+                await self._upload(storage, staged.path, key, content_type)
+            else:
+                await asyncio.to_thread(self._keep, staged.path, self.path(key))
+        finally:
+            staged.path.unlink(missing_ok=True)
+        return key
+
+    @staticmethod
+    def _keep(staging: Path, final: Path) -> None:
+        if final.exists():
+            return  # same content already stored
+        final.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(staging, final)
+
+    async def _read(self, path: Path) -> AsyncIterator[bytes]:
+        with open(path, "rb") as f:
+            while True:
+                chunk = await asyncio.to_thread(f.read, self._chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    async def _upload(
+        self, storage: Tuple[httpx.AsyncClient, str, dict], staging: Path, key: str, content_type: Optional[str],
+    ) -> None:
+        # streamed from disk on the shared pool; storage3's upload() would
+        # read the whole file into memory first
+        http, base_url, headers = storage
+        try:
+            resp = await http.post(
+                f"{base_url}/object/{self._bucket}/{key}",
+                content=self._read(staging),
+                headers={
+                    **headers,
+                    "Content-Type": content_type or "application/octet-stream",
+                    "x-upsert": "false",
+                },
+            )
+        except httpx.TransportError as e:
+            upstream_failures.inc(kind="transport")
+            raise UpstreamUnavailable("Storage transport error") from e
+        # an existing object under a content address already has these bytes
+        if resp.status_code < 400 or _already_exists(resp):
+            return
+        if resp.status_code >= 500 or resp.status_code == 429:
+            upstream_failures.inc(kind="server")
+            raise UpstreamUnavailable(f"Storage error {resp.status_code}")
+        if resp.status_code == 413:
+            raise HTTPException(status_code=413, detail="Certificate is too large")
+        if resp.status_code == 415:
+            raise HTTPException(status_code=415, detail="Unsupported certificate file type")
+        # anything else is Storage refusing our own request (bucket, key, policy)
+        raise HTTPException(status_code=502, detail="Certificate storage rejected the upload; please try again later")
+
+
+certificate_store = CertificateStore(
+    root=settings.cert_storage_dir,
+    chunk_size=settings.upload_chunk_size,
+    max_bytes=settings.cert_max_bytes,
+    bucket=settings.cert_storage_bucket,
+)
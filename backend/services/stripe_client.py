@@ -0,0 +1,36 @@
+# backend/services/stripe_client.py
+
+from typing import Any, Dict, Optional
+
+from backend.core.config import settings
+
+_stripe = None
+
+
+def stripe_sdk():
+    # imported on first webhook rather than at app import: it's slow to load
+    global _stripe
+    if _stripe is None:
+        import stripe
+
+        stripe.api_key = settings.stripe_secret_key
+        _stripe = stripe
+    return _stripe
+
+
+class InvalidWebhook(Exception):
+    """The payload is malformed or its signature doesn't check out."""
+
+
+def verify_event(payload: bytes, signature: Optional[str]) -> Dict[str, Any]:
+    """Check a webhook's Stripe-Signature header and return the event as a plain dict."""
+    if not settings.stripe_webhook_secret:
+        raise InvalidWebhook("Stripe webhook secret is not configured")
+    stripe = stripe_sdk()
+    try:
+        event = stripe.Webhook.construct_event(payload, signature, settings.stripe_webhook_secret)
+    except stripe.SignatureVerificationError:
+        raise InvalidWebhook("Invalid signature")
+    except Exception:
+        raise InvalidWebhook("Malformed webhook")
+    return event.to_dict()
@@ -0,0 +1,159 @@
+# backend/services/stripe_events.py
+
+import asyncio
+import json
+import random
+import sqlite3
+import time
+import traceback
+from typing import Any, Awaitable, Callable, Dict
+
+from backend.core.config import settings
+from backend.services.lease_queue import LeaseQueue
+from backend.services.profiles import invalidate_profile
+from backend.services.supabase_client import supabase
+
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stripe_events (
+    id            TEXT PRIMARY KEY,
+    type          TEXT NOT NULL,
+    payload       TEXT NOT NULL,
+    status        TEXT NOT NULL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    next_attempt  REAL NOT NULL,
+    error         TEXT,
+    received_at   REAL NOT NULL,
+    finished_at   REAL,
+    owner         TEXT,
+    lease_until   REAL
+)
+"""
+
+_MAX_BACKOFF = 3600
+
+
+class StripeEventQueue(LeaseQueue):
+    """
+    Durable, deduplicated queue of verified Stripe webhook events (see
+    LeaseQueue for claims and leases). The webhook only records the event
+    (its id is the primary key, so Stripe's redeliveries are dropped) and
+    returns; workers run the handler for the event type later, retrying
+    failures with jittered exponential backoff.
+    """
+
+    table = "stripe_events"
+    schema = _SCHEMA
+    ready = "status = 'queued' AND next_attempt <= :now"
+    order = "next_attempt"
+    on_claim = "attempts = attempts + 1"
+
+    def __init__(
+        self, db_path: str, workers: int, max_attempts: int, retry_base: float, retention: float, lease: float,
+    ):
+        super().__init__(db_path, workers, lease)
+        self._max_attempts = max_attempts
+        self._retry_base = retry_base
+        self._retention = retention
+        self._handlers: Dict[str, Handler] = {}
+
+    def handler(self, event_type: str) -> Callable[[Handler], Handler]:
+        """Register `fn(event_object)` for one event type."""
+        def register(fn: Handler) -> Handler:
+            self._handlers[event_type] = fn
+            return fn
+        return register
+
+    # ─── storage ────────────────────────────────────────────────
+
+    def _insert(self, event: Dict[str, Any]) -> bool:
+        now = time.time()
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT OR IGNORE INTO stripe_events (id, type, payload, status, next_attempt, received_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?)",
+                (event["id"], event["type"], json.dumps(event), now, now),
+            )
+            self._db.commit()
+            return cur.rowcount == 1
+
+    def _purge(self) -> None:
+        # only finished events go; their ids are what dedupes redeliveries
+        self._execute(
+            "DELETE FROM stripe_events WHERE finished_at IS NOT NULL AND finished_at < ?",
+            (time.time() - self._retention,),
+        )
+
+    # ─── public API ─────────────────────────────────────────────
+
+    async def enqueue(self, event: Dict[str, Any]) -> bool:
+        """Record a verified event. Returns False if it was already seen."""
+        added = await asyncio.to_thread(self._insert, event)
+        if added:
+            self._wakeup.set()
+        return added
+
+    # ─── workers ────────────────────────────────────────────────
+
+    async def _run(self, row: sqlite3.Row) -> None:
+        handler = self._handlers.get(row["type"])
+        try:
+            if handler is not None:
+                event = json.loads(row["payload"])
+                await handler(event["data"]["object"])
+        except Exception as e:
+            traceback.print_exc()
+            attempts = row["attempts"] + 1
+            if attempts >= self._max_attempts:
+                await self._settle(row["id"], "status = 'failed', error = ?, finished_at = ?", (str(e), time.time()))
+                return
+            delay = min(_MAX_BACKOFF, self._retry_base * 2 ** (attempts - 1))
+            await self._settle(
+                row["id"],
+                "status = 'queued', error = ?, next_attempt = ?, owner = NULL",
+                (str(e), time.time() + delay * random.uniform(0.5, 1.0)),
+            )
+            return
+        await self._settle(row["id"], "status = 'done', error = NULL, finished_at = ?", (time.time(),))
+
+    def _idle_timeout(self) -> float:
+        # wake for the next retry that falls due
+        due = self._execute("SELECT MIN(next_attempt) FROM stripe_events WHERE status = 'queued'")[0][0]
+        return 5.0 if due is None else min(5.0, max(0.0, due - time.time()))
+
+
+stripe_events = StripeEventQueue(
+    db_path=settings.stripe_events_db,
+    workers=settings.stripe_event_workers,
+    max_attempts=settings.stripe_event_max_attempts,
+    retry_base=settings.stripe_event_retry_base,
+    retention=settings.stripe_event_retention,
+    lease=settings.stripe_event_lease,
+)
+
+
+@stripe_events.handler("checkout.session.completed")
+async def mark_pro(session: Dict[str, Any]) -> None:
+    email = session.get("customer_email") or (session.get("customer_details") or {}).get("email")
+    if not email:
+        return
+    user_res = await (
+        supabase.table("users")
+        .select("id")
+        .eq("email", email)
+        .limit(1)
+        .execute()
+    )
+    if not user_res.data:
+        # the users row may not exist yet; let the retry pick it up
+        raise LookupError(f"No user with email {email}")
+    user_id = user_res.data[0]["id"]
+    await (
+        supabase.table("users")
+        .update({"is_pro": True})
+        .eq("id", user_id)
+        .execute()
+    )
+    # don't keep serving the cached free-tier profile
+    await invalidate_profile(user_id)
@@ -1,21 +1,146 @@
 # backend/services/supabase_client.py
 
-import os
-from pathlib import Path
-from dotenv import load_dotenv
-from supabase import create_client, Client
+from typing import TYPE_CHECKING, Any, Optional, Tuple
 
-# 1️⃣ Load your project-root .env
-BASE_DIR = Path(__file__).resolve().parent.parent
-load_dotenv(BASE_DIR / ".env")
+import httpx
+from backend.core.config import settings
+from backend.core.metrics import HTTPX_HOOKS
 
-# 2️⃣ Read the credentials
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+if TYPE_CHECKING:
+    # the SDKs themselves are imported in init_supabase(), not at app import
+    from gotrue import AsyncGoTrueClient
+    from supabase import AsyncClient
 
-# 3️⃣ Debug print to verify loading
-print("🔐 Supabase URL:", SUPABASE_URL)
-print("🔐 Supabase Key starts with:", SUPABASE_KEY[:8], "...")
+# 1️⃣ + 2️⃣ Credentials come from the project-root .env (see core/config.py)
+SUPABASE_URL = settings.supabase_url
+SUPABASE_KEY = settings.supabase_key
 
-# 4️⃣ Initialize the Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+class _ClientProxy:
+    """
+    Module-level stand-in for a client that only exists between app startup
+    and shutdown, so routers can keep importing `supabase` at import time.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._target: Any = None
+
+    def __getattr__(self, attr: str) -> Any:
+        if self._target is None:
+            raise RuntimeError(f"{self._name} client used before init_supabase() ran")
+        return getattr(self._target, attr)
+
+
+# 3️⃣ Shared async clients, created in init_supabase() (see main.py lifespan)
+supabase: "AsyncClient" = _ClientProxy("supabase")  # type: ignore[assignment]
+# Separate GoTrue client for sign-in/sign-up/token checks: signing users in on
+# the data client would swap its Authorization header for everyone.
+auth: "AsyncGoTrueClient" = _ClientProxy("auth")  # type: ignore[assignment]
+
+_http: Optional[httpx.AsyncClient] = None
+# set instead of the clients above when settings.data_backend == "fake"
+_fake: Any = None
+
+
+def _auth_headers() -> dict:
+    return {"apiKey": SUPABASE_KEY, "Authorization": f"Bearer {SUPABASE_KEY}"}
+
+
+def storage_http() -> Optional[Tuple[httpx.AsyncClient, str, dict]]:
+    """
+    (pool, Storage API base URL, service headers) for raw Storage calls such
+    as streamed uploads; None when there is no Storage (DATA_BACKEND=fake).
+    """
+    if _http is None:
+        return None
+    return _http, f"{SUPABASE_URL}/storage/v1", _auth_headers()
+
+
+def user_auth_client() -> "AsyncGoTrueClient":
+    """
+    Throwaway GoTrue client on the shared connection pool, for calls that
+    need a user's own session (e.g. changing their password).
+    """
+    if _fake is not None:
+        return _fake.auth_client()
+    from gotrue import AsyncGoTrueClient
+
+    return AsyncGoTrueClient(
+        url=f"{SUPABASE_URL}/auth/v1",
+        headers=_auth_headers(),
+        http_client=_http,
+        auto_refresh_token=False,
+        persist_session=False,
+    )
+
+
+def _resilient(client: Any) -> Any:
+    # timeouts, read retries and the circuit breaker for every query
+    from backend.services.resilience import ResilientClient, resilience
+
+    return ResilientClient(client, resilience)
+
+
+def _init_fake() -> None:
+    global _fake
+    from backend.services.fake_supabase import FakeSupabase, seed
+
+    _fake = FakeSupabase(
+        settings.fake_db,
+        jwt_secret=settings.supabase_jwt_secret or "fake-jwt-secret",
+        latency_ms=settings.fake_latency_ms,
+        max_rows=settings.fake_max_rows,
+    )
+    if _fake.is_empty():
+        seed(_fake, settings.fake_seed_users, settings.fake_seed_courses,
+             settings.fake_seed_records, settings.fake_seed)
+    supabase._target = _resilient(_fake)
+    auth._target = _fake.auth
+
+
+async def init_supabase() -> None:
+    global _http
+    if settings.data_backend == "fake":
+        _init_fake()
+        return
+    from supabase import AsyncClient, AsyncClientOptions
+
+    # one HTTP/2 pool shared by PostgREST and GoTrue
+    _http = httpx.AsyncClient(
+        http2=settings.supabase_http2,
+        follow_redirects=True,
+        # per-request supabase/auth timings for core/metrics.py
+        event_hooks=HTTPX_HOOKS,
+        limits=httpx.Limits(
+            max_connections=settings.supabase_max_connections,
+            max_keepalive_connections=settings.supabase_max_keepalive,
+            keepalive_expiry=settings.supabase_keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(
+            settings.supabase_timeout,
+            connect=settings.supabase_connect_timeout,
+        ),
+    )
+    supabase._target = _resilient(AsyncClient(
+        SUPABASE_URL,
+        SUPABASE_KEY,
+        AsyncClientOptions(
+            httpx_client=_http,
+            auto_refresh_token=False,
+            persist_session=False,
+        ),
+    ))
+    auth._target = user_auth_client()
+
+
+async def close_supabase() -> None:
+    global _http, _fake
+    supabase._target = None
+    auth._target = None
+    if _fake is not None:
+        _fake.close()
+        _fake = None
+    if _http is not None:
+        await _http.aclose()
+        _http = None
@@ -0,0 +1,172 @@
+# backend/services/versions.py
+
+import asyncio
+import logging
+import secrets
+import sqlite3
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.core.assets import assets
+from backend.core.cache import TTLCache
+from backend.core.config import settings
+from backend.core.etag import make_etag
+from backend.services.reference import reference
+
+log = logging.getLogger("credenticare.versions")
+
+class MemoryVersionStore:
+    """Versions for a single process."""
+
+    def __init__(self) -> None:
+        self._versions: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def read(self, user_id: str) -> str:
+        with self._lock:
+            return self._versions.setdefault(user_id, secrets.token_hex(8))
+
+    def replace(self, user_id: str, version: str) -> Optional[str]:
+        with self._lock:
+            old = self._versions.get(user_id)
+            self._versions[user_id] = version
+            return old
+
+
+class SQLiteVersionStore:
+    """
+    Versions in an SQLite file every worker on the host shares, so a write
+    handled by one worker changes the ETags all of them hand out. Each
+    call is one short statement on a WAL database.
+    """
+
+    def __init__(self, db_path: str):
+        self._db_path = db_path
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            Path(self._db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(self._db_path, check_same_thread=False, isolation_level=None, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS data_versions (user_id TEXT PRIMARY KEY, version TEXT NOT NULL)"
+            )
+        return self._db
+
+    def read(self, user_id: str) -> str:
+        with self._lock:
+            db = self._conn()
+            row = db.execute("SELECT version FROM data_versions WHERE user_id = ?", (user_id,)).fetchone()
+            if row is not None:
+                return row[0]
+            # first sight of this user anywhere: whoever inserts first wins
+            db.execute(
+                "INSERT OR IGNORE INTO data_versions (user_id, version) VALUES (?, ?)",
+                (user_id, secrets.token_hex(8)),
+            )
+            return db.execute("SELECT version FROM data_versions WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+    def replace(self, user_id: str, version: str) -> Optional[str]:
+        with self._lock:
+            db = self._conn()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute("SELECT version FROM data_versions WHERE user_id = ?", (user_id,)).fetchone()
+                db.execute(
+                    "INSERT INTO data_versions (user_id, version) VALUES (?, ?) "
+                    "ON CONFLICT (user_id) DO UPDATE SET version = excluded.version",
+                    (user_id, version),
+                )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            return row[0] if row else None
+
+
+class DataVersions:
+    """
+    An opaque per-user token that changes whenever the user's CE records or
+    profile do. Page ETags and the rendered-page cache are keyed on it, so
+    an unchanged user costs no upstream calls and no rendering.
+
+    Writers must await bump(). The token lives in `store`; with the SQLite
+    store it is shared by every worker. Each process remembers the token it
+    last saw per user, and when the stored one differs (another worker
+    wrote) the on_change() callbacks drop this process's per-user caches
+    before anything is served from them.
+
+    Store calls run on a worker thread. If the store fails (e.g. the file
+    stays locked), the request is served uncached: per-user caches are
+    dropped and a one-off token that matches no ETag is handed out.
+    """
+
+    def __init__(self, store, seen: TTLCache):
+        self._store = store
+        self._seen = seen
+        self._listeners: List[Callable[[str], None]] = []
+
+    def on_change(self, listener: Callable[[str], None]) -> None:
+        """Call `listener(user_id)` when a user's data changed elsewhere."""
+        self._listeners.append(listener)
+
+    def _changed(self, user_id: str) -> None:
+        for listener in self._listeners:
+            listener(user_id)
+
+    def _unknown(self, user_id: str) -> str:
+        log.warning("data version store failed for %s", user_id, exc_info=True)
+        self._changed(user_id)
+        self._seen.pop(user_id)
+        return secrets.token_hex(8)
+
+    async def get(self, user_id: str) -> str:
+        try:
+            version = await asyncio.to_thread(self._store.read, user_id)
+        except sqlite3.Error:
+            return self._unknown(user_id)
+        if self._seen.get(user_id) != version:
+            # changed by another worker, or not seen lately: nothing cached here is trustworthy
+            self._changed(user_id)
+            self._seen.set(user_id, version)
+        return version
+
+    async def bump(self, user_id: str) -> None:
+        version = secrets.token_hex(8)
+        try:
+            previous = await asyncio.to_thread(self._store.replace, user_id, version)
+        except sqlite3.Error:
+            # the data changed anyway: at least this worker stops serving the old copies
+            self._unknown(user_id)
+            return
+        if previous is not None and self._seen.get(user_id) != previous:
+            # another worker wrote since we last looked; our copies predate both writes
+            self._changed(user_id)
+        self._seen.set(user_id, version)
+
+    async def etag(self, view: str, user: Any, *parts: Any) -> str:
+        """
+        ETag for `view` of `user`'s data; status depends on the date too, and
+        every page on the stylesheet build and the requirement/course tables.
+        """
+        version, tables = await asyncio.gather(self.get(user.id), reference.versions())
+        return make_etag(
+            view, user.id, version, date.today(), user.state, user.is_pro, assets.version, tables, *parts,
+        )
+
+
+def _store():
+    if settings.data_version_backend == "sqlite":
+        return SQLiteVersionStore(settings.data_version_db)
+    return MemoryVersionStore()
+
+
+data_versions = DataVersions(
+    store=_store(),
+    seen=TTLCache(maxsize=settings.compliance_cache_size, ttl=settings.data_version_ttl),
+)
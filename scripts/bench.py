@@ -0,0 +1,178 @@
+# scripts/bench.py
+#
+# Offline load benchmark: runs the app in-process against the seeded fake
+# data backend (services/fake_supabase.py) and hammers the main read paths.
+#
+#   python -m scripts.bench [--concurrency 16] [--requests 500] [--users 50] \
+#       [--records-per-user 200] [--latency-ms 0] [--endpoints dashboard,csv] \
+#       [--json out.json] [--compare baseline.json --max-regression 0.10]
+#
+# Reports p50/p95/p99 latency and throughput per endpoint. With --compare,
+# exits non-zero when any endpoint's p95 got worse than the baseline by more
+# than --max-regression, so it can gate a change.
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+ENDPOINTS = {
+    "dashboard": "/dashboard",
+    "ce_status": "/ce/status",
+    "ce_records": "/ce/records",
+    "csv": "/report/download_csv",
+    "pdf": "/report/download_pdf",
+}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest-rank
+    k = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[k]
+
+
+async def login(client: Any, email: str, password: str) -> str:
+    resp = await client.post("/login", data={"email": email, "password": password})
+    cookie = resp.cookies.get("sb_token")
+    if resp.status_code != 303 or not cookie:
+        raise RuntimeError(f"login failed for {email}: {resp.status_code}")
+    return cookie
+
+
+async def run_endpoint(
+    client: Any, path: str, cookies: List[str], requests: int, concurrency: int,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    next_request = iter(range(requests))
+
+    async def worker() -> None:
+        for i in next_request:
+            start = time.perf_counter()
+            resp = await client.get(path, cookies={"sb_token": cookies[i % len(cookies)]})
+            latencies.append(time.perf_counter() - start)
+            statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": sum(n for code, n in statuses.items() if code >= 400),
+        "statuses": {str(code): n for code, n in sorted(statuses.items())},
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+        "rps": requests / elapsed if elapsed else 0.0,
+    }
+
+
+async def bench(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+
+    # imported late: settings are read from the environment set up in main()
+    from backend.main import app
+    from backend.services.fake_supabase import SEED_PASSWORD, seed_email
+
+    results: Dict[str, Any] = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            cookies = [await login(client, seed_email(i), SEED_PASSWORD) for i in range(args.users)]
+            # seeded users with an even index are Pro, and only they can export PDFs
+            pro_cookies = cookies[::2]
+
+            for name in args.endpoints:
+                path = ENDPOINTS[name]
+                pool = pro_cookies if name == "pdf" else cookies
+                if args.warmup:
+                    await run_endpoint(client, path, pool, args.warmup, args.concurrency)
+                results[name] = await run_endpoint(client, path, pool, args.requests, args.concurrency)
+                print(_format_row(name, results[name]), file=sys.stderr)
+    return results
+
+
+def _format_row(name: str, r: Dict[str, Any]) -> str:
+    return (
+        f"{name:<11} p50 {r['p50_ms']:8.1f}ms  p95 {r['p95_ms']:8.1f}ms  p99 {r['p99_ms']:8.1f}ms  "
+        f"{r['rps']:8.1f} req/s  errors {r['errors']}/{r['requests']}"
+    )
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    regressions = []
+    for name, r in results.items():
+        old = baseline.get("results", {}).get(name)
+        if not old or not old["p95_ms"]:
+            continue
+        change = r["p95_ms"] / old["p95_ms"] - 1
+        if change > max_regression:
+            regressions.append(f"{name}: p95 {old['p95_ms']:.1f}ms -> {r['p95_ms']:.1f}ms (+{change:.0%})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the app against the fake data backend")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS),
+                        help=f"comma-separated subset of: {', '.join(ENDPOINTS)}")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="timed requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=50, help="untimed requests per endpoint first")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--courses", type=int, default=200)
+    parser.add_argument("--records-per-user", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated round trip per fake query")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the results here")
+    parser.add_argument("--compare", help="results JSON from an earlier run")
+    parser.add_argument("--max-regression", type=float, default=0.10, help="allowed p95 increase, e.g. 0.10")
+    args = parser.parse_args()
+
+    args.endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = set(args.endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+    if args.users < 1 or args.concurrency < 1:
+        parser.error("--users and --concurrency must be at least 1")
+
+    os.environ.update({
+        "DATA_BACKEND": "fake",
+        "FAKE_DB": ":memory:",
+        "FAKE_SEED_USERS": str(args.users),
+        "FAKE_SEED_COURSES": str(args.courses),
+        "FAKE_SEED_RECORDS": str(args.records_per_user),
+        "FAKE_SEED": str(args.seed),
+        "FAKE_LATENCY_MS": str(args.latency_ms),
+        # every benchmark user logs in from the same address
+        "LOGIN_IP_BURST": str(max(args.users, 30)),
+    })
+    results = asyncio.run(bench(args))
+
+    report = {
+        "config": {k: getattr(args, k) for k in (
+            "concurrency", "requests", "users", "courses", "records_per_user", "latency_ms", "seed",
+        )},
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# scripts/bench_startup.py
+#
+# Cold-start budget: how long a fresh worker takes to import backend.main
+# and get through the lifespan startup (against the fake data backend, so
+# no network is involved).
+#
+#   python -m scripts.bench_startup [--runs 5] [--budget-ms 1000] [--top 15]
+#
+# Each run is a new interpreter. Prints the median import and startup times
+# and the slowest modules from `python -X importtime`; exits non-zero when
+# import + startup goes over --budget-ms.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+_PROBE = """
+import asyncio, json, time
+start = time.perf_counter()
+from backend.main import app
+imported = time.perf_counter()
+
+async def startup():
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+ready = asyncio.run(startup())
+print(json.dumps({"import_ms": (imported - start) * 1000, "startup_ms": (ready - imported) * 1000}))
+"""
+
+
+def _env() -> Dict[str, str]:
+    return {**os.environ, "DATA_BACKEND": "fake", "FAKE_SEED_USERS": "0"}
+
+
+def run_once() -> Dict[str, float]:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE], env=_env(), capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int) -> List[Tuple[str, float]]:
+    """(module, cumulative ms) for the slowest imports made directly by backend.main."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        env=_env(), capture_output=True, text=True, check=True,
+    )
+    modules = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            us = int(cumulative.strip())
+        except ValueError:
+            continue  # header line
+        # one level below backend.main, so a slow dependency isn't listed once per submodule
+        if name.startswith("   ") and not name.startswith("    "):
+            modules.append((name.strip(), us / 1000))
+    return sorted(modules, key=lambda m: m[1], reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure app import and startup time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="import + startup budget")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list (0 for none)")
+    parser.add_argument("--json", help="write the results here")
+    args = parser.parse_args()
+
+    run_once()  # warm the bytecode and OS file caches
+    runs = [run_once() for _ in range(args.runs)]
+    import_ms = statistics.median(r["import_ms"] for r in runs)
+    startup_ms = statistics.median(r["startup_ms"] for r in runs)
+    total_ms = import_ms + startup_ms
+
+    print(f"import   {import_ms:8.1f}ms (median of {args.runs})", file=sys.stderr)
+    print(f"startup  {startup_ms:8.1f}ms", file=sys.stderr)
+    print(f"total    {total_ms:8.1f}ms  budget {args.budget_ms:.0f}ms", file=sys.stderr)
+    top = slowest_imports(args.top) if args.top else []
+    for name, ms in top:
+        print(f"  {ms:8.1f}ms  {name}", file=sys.stderr)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({
+                "import_ms": import_ms, "startup_ms": startup_ms, "total_ms": total_ms,
+                "budget_ms": args.budget_ms, "slowest_imports": top,
+            }, f, indent=2)
+    if total_ms > args.budget_ms:
+        print("OVER BUDGET", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
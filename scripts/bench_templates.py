@@ -0,0 +1,135 @@
+# scripts/bench_templates.py
+#
+# Template render timings over synthetic record tables:
+#
+#   python -m scripts.bench_templates [--records 100,1000,5000,20000] [--repeat 5]
+#
+# For each table size, report.html and dashboard.html are rendered whole
+# (templates.TemplateResponse's path) and streamed (stream_template), giving
+# the time to the full page and, for streaming, to the first bytes. Also
+# times compiling every template from source against loading them from
+# the bytecode cache, i.e. what precompile() saves a fresh worker.
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from starlette.requests import Request
+
+from backend.jinja_env import TEMPLATES_DIR, stream_template, templates
+from backend.main import app
+
+
+def _request(path: str) -> Request:
+    return Request({
+        "type": "http", "method": "GET", "path": path, "raw_path": path.encode(), "query_string": b"",
+        "headers": [(b"cookie", b"sb_token=bench")], "scheme": "http", "server": ("bench", 80),
+        "root_path": "", "app": app, "router": app.router,
+    })
+
+
+def _records(n: int) -> List[Dict[str, Any]]:
+    rng = random.Random(n)
+    today = date.today()
+    return [
+        {
+            "id": f"{i:08x}", "course_id": f"course-{rng.randrange(200)}",
+            "date_completed": (today - timedelta(days=rng.randrange(1000))).isoformat(),
+            "hours_earned": rng.randint(1, 8), "notes": rng.choice(["", "online", "conference <b>day 2</b>"]),
+        }
+        for i in range(n)
+    ]
+
+
+_STATUS = {
+    "hours_completed": 18, "required_hours": 30, "hours_remaining": 12,
+    "next_renewal_date": (date.today() + timedelta(days=90)).isoformat(),
+}
+
+
+async def _stream(name: str, context: Dict[str, Any]) -> Dict[str, float]:
+    start = time.perf_counter()
+    first = None
+    size = 0
+    async for chunk in stream_template(name, context).body_iterator:
+        if first is None:
+            first = time.perf_counter() - start
+        size += len(chunk)
+    return {"first": first or 0.0, "total": time.perf_counter() - start, "bytes": size}
+
+
+def _median_ms(values: List[float]) -> float:
+    return statistics.median(values) * 1000
+
+
+async def bench_render(counts: List[int], repeat: int) -> None:
+    print(f"{'template':<15}{'rows':>7}{'render':>11}{'stream 1st':>12}{'stream all':>12}{'KB':>8}", file=sys.stderr)
+    for name, path in (("report.html", "/report"), ("dashboard.html", "/dashboard")):
+        for n in counts:
+            context = {
+                "request": _request(path), "records": _records(n), "status": _STATUS, "next_cursor": None,
+            }
+            template = templates.get_template(name)
+            template.render(context)  # warm
+            await _stream(name, context)
+
+            renders, firsts, totals = [], [], []
+            size = 0
+            for _ in range(repeat):
+                start = time.perf_counter()
+                template.render(context)
+                renders.append(time.perf_counter() - start)
+                streamed = await _stream(name, context)
+                firsts.append(streamed["first"])
+                totals.append(streamed["total"])
+                size = streamed["bytes"]
+            print(
+                f"{name:<15}{n:>7}{_median_ms(renders):>9.1f}ms{_median_ms(firsts):>10.2f}ms"
+                f"{_median_ms(totals):>10.1f}ms{size / 1024:>8.0f}",
+                file=sys.stderr,
+            )
+
+
+def bench_compile(repeat: int) -> None:
+    names = templates.env.list_templates(extensions=["html"])
+
+    def load_all(cache_dir: str = None) -> float:
+        env = Environment(
+            loader=FileSystemLoader(str(TEMPLATES_DIR)), autoescape=True,
+            bytecode_cache=FileSystemBytecodeCache(cache_dir) if cache_dir else None,
+        )
+        start = time.perf_counter()
+        for name in names:
+            env.get_template(name)
+        return time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        load_all(cache_dir)  # fill the bytecode cache
+        cold = [load_all() for _ in range(repeat)]
+        cached = [load_all(cache_dir) for _ in range(repeat)]
+    print(
+        f"\ncompile {len(names)} templates: {_median_ms(cold):.1f}ms from source, "
+        f"{_median_ms(cached):.1f}ms from the bytecode cache",
+        file=sys.stderr,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark template rendering")
+    parser.add_argument("--records", default="100,1000,5000,20000", help="comma-separated table sizes")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    counts = [int(n) for n in args.records.split(",") if n.strip()]
+    asyncio.run(bench_render(counts, args.repeat))
+    bench_compile(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
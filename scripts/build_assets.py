@@ -0,0 +1,135 @@
+# scripts/build_assets.py
+#
+# Fingerprints and precompresses everything under static/ into static/dist/,
+# with a manifest mapping each logical path to its hashed file:
+#
+#   static/css/tailwind.min.css -> static/dist/css/tailwind.min.3f2a9c01d4.css
+#                                  (+ .gz, + .br when Brotli is installed)
+#
+# Runs after `npm run build:css` (the "postbuild:css" hook in package.json),
+# or by hand:
+#
+#   python -m scripts.build_assets [--static static] [--keep-hours 24]
+#
+# Templates link assets with asset_url() (core/assets.py); the static mount
+# serves the precompressed variants with a year-long immutable Cache-Control.
+#
+# Outputs a rebuild no longer references are kept for --keep-hours after
+# that build: pages rendered before it (open tabs, the page cache, anything
+# revalidated with a 304) still link them.
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Set
+
+from backend.core.assets import COMPRESSIBLE, DIST, MANIFEST
+
+# build output and other generated trees, and inputs that are never linked
+SKIP_DIRS = {DIST, "sitemap"}
+SKIP_FILES = {"css/tailwind.css"}
+HASH_LEN = 10
+# output path -> when a build first left it out
+RETIRED = ".retired.json"
+
+
+def _write(path: Path, data: bytes) -> None:
+    if path.exists():
+        return  # the name carries the content hash, so it's already right
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _compressors() -> Dict[str, Callable[[bytes], bytes]]:
+    compressors: Dict[str, Callable[[bytes], bytes]] = {
+        ".gz": lambda data: gzip.compress(data, compresslevel=9, mtime=0),
+    }
+    try:
+        import brotli
+    except ImportError:
+        print("Brotli not installed; writing gzip variants only", file=sys.stderr)
+    else:
+        compressors[".br"] = lambda data: brotli.compress(data, quality=11)
+    return compressors
+
+
+def _retire(dist: Path, written: Set[Path], keep: float) -> None:
+    """Delete outputs no build has referenced for `keep` seconds."""
+    path = dist / RETIRED
+    try:
+        retired: Dict[str, float] = json.loads(path.read_text())
+    except (FileNotFoundError, ValueError):
+        retired = {}
+    now = time.time()
+    still: Dict[str, float] = {}
+    for old in dist.rglob("*"):
+        if not old.is_file() or old in written or old.name.startswith("."):
+            continue
+        rel = old.relative_to(dist).as_posix()
+        since = retired.get(rel, now)
+        if now - since >= keep:
+            old.unlink()
+        else:
+            still[rel] = since
+    tmp = dist / f"{RETIRED}.tmp"
+    tmp.write_text(json.dumps(still, indent=2, sort_keys=True))
+    os.replace(tmp, path)
+
+
+def build(static: Path, keep: float = 24 * 3600) -> Dict[str, str]:
+    dist = static / DIST
+    compressors = _compressors()
+    manifest: Dict[str, str] = {}
+    written: Set[Path] = {dist / MANIFEST}
+
+    for source in sorted(static.rglob("*")):
+        rel = source.relative_to(static)
+        if not source.is_file() or rel.parts[0] in SKIP_DIRS or rel.as_posix() in SKIP_FILES:
+            continue
+        if source.name.startswith("."):
+            continue
+        data = source.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()[:HASH_LEN]
+        hashed = rel.with_name(f"{source.stem}.{digest}{source.suffix}")
+        target = dist / hashed
+        target.parent.mkdir(parents=True, exist_ok=True)
+        _write(target, data)
+        written.add(target)
+
+        if source.suffix in COMPRESSIBLE:
+            for ext, compress in compressors.items():
+                packed = compress(data)
+                # not worth a variant (tiny files can grow)
+                if len(packed) < len(data):
+                    variant = target.with_name(target.name + ext)
+                    _write(variant, packed)
+                    written.add(variant)
+        manifest[rel.as_posix()] = hashed.as_posix()
+
+    tmp = dist / f".{MANIFEST}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, dist / MANIFEST)
+
+    # outputs of earlier builds whose source changed or went away
+    _retire(dist, written, keep)
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fingerprint and precompress static assets")
+    parser.add_argument("--static", default="static")
+    parser.add_argument("--keep-hours", type=float, default=24,
+                        help="how long outputs of earlier builds stay after they are replaced")
+    args = parser.parse_args()
+    manifest = build(Path(args.static), keep=args.keep_hours * 3600)
+    print(json.dumps({"assets": len(manifest)}), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
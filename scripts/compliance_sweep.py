@@ -0,0 +1,41 @@
+# scripts/compliance_sweep.py
+#
+# Nightly CE compliance sweep across every user.
+#
+#   python -m scripts.compliance_sweep [--as-of YYYY-MM-DD] [--out sweep.jsonl]
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import date
+
+from backend.services.supabase_client import init_supabase, close_supabase
+from backend.services.compliance import compliance
+
+
+async def run(as_of: date, page_size: int, out) -> None:
+    await init_supabase()
+    try:
+        results = await compliance.sweep(as_of=as_of, page_size=page_size)
+    finally:
+        await close_supabase()
+
+    non_compliant = 0
+    for user_id, status in results.items():
+        non_compliant += not status["compliant"]
+        out.write(json.dumps({"user_id": user_id, **status}) + "\n")
+    print(f"{len(results)} users checked, {non_compliant} not compliant", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Nightly CE compliance sweep")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--out", type=argparse.FileType("w"), default=sys.stdout)
+    args = parser.parse_args()
+    asyncio.run(run(args.as_of, args.page_size, args.out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# scripts/fake_onesignal.py
+#
+# Stand-in for OneSignal's REST API, for exercising the reminder sender
+# locally. Records every notification and can answer with 429s to test
+# rate-limit handling.
+#
+#   python -m scripts.fake_onesignal [--port 8765] [--throttle-every 3]
+#   ONESIGNAL_API_URL=http://127.0.0.1:8765 ONESIGNAL_APP_ID=x ONESIGNAL_API_KEY=x \
+#       python -m scripts.send_renewal_reminders
+#   curl http://127.0.0.1:8765/_sent
+
+import argparse
+import uuid
+from typing import Any, Dict, List
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+
+def create_app(throttle_every: int = 0) -> FastAPI:
+    app = FastAPI()
+    sent: List[Dict[str, Any]] = []
+    seen = {"requests": 0}
+
+    @app.post("/notifications")
+    async def notifications(request: Request):
+        seen["requests"] += 1
+        if throttle_every and seen["requests"] % throttle_every == 0:
+            return JSONResponse({"errors": ["rate limited"]}, status_code=429, headers={"Retry-After": "1"})
+        if not request.headers.get("authorization", "").startswith("Key "):
+            raise HTTPException(status_code=403, detail="missing API key")
+        body = await request.json()
+        recipients = body.get("include_aliases", {}).get("external_id", [])
+        if not body.get("app_id") or not recipients:
+            return JSONResponse({"errors": ["app_id and recipients are required"]}, status_code=400)
+        notification = {"id": str(uuid.uuid4()), "body": body}
+        sent.append(notification)
+        return {"id": notification["id"], "external_id": None}
+
+    @app.get("/_sent")
+    async def sent_notifications():
+        return sent
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Fake OneSignal API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--throttle-every", type=int, default=0, help="answer every Nth request with a 429")
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.throttle_every), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
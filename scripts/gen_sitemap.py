@@ -0,0 +1,183 @@
+# scripts/gen_sitemap.py
+#
+# Sitemaps for the public course and state landing pages.
+#
+#   python -m scripts.gen_sitemap --base-url https://credenticare.com [--out static/sitemap]
+#
+# URLs are streamed from Supabase a page at a time into gzipped shards of
+# at most 50,000 URLs (the protocol limit) plus a sitemap index. A manifest
+# of each shard's content hash is kept next to them; shards whose URLs
+# didn't change since the last run are left untouched, lastmod included.
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional
+from xml.sax.saxutils import escape
+
+from backend.services.supabase_client import init_supabase, close_supabase, supabase
+
+MAX_URLS = 50_000
+MANIFEST = "manifest.json"
+INDEX = "sitemap_index.xml.gz"
+STATIC_PATHS = ["/", "/signup", "/login"]
+
+_URLSET_OPEN = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+_URLSET_CLOSE = "</urlset>\n"
+_INDEX_OPEN = '<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+_INDEX_CLOSE = "</sitemapindex>\n"
+
+
+async def iter_keys(table: str, key: str, page_size: int) -> AsyncIterator[Any]:
+    """Every value of `key` in `table`, keyset-paginated so memory stays flat."""
+    last = None
+    while True:
+        query = supabase.table(table).select(key)
+        if last is not None:
+            query = query.gt(key, last)
+        resp = await query.order(key).limit(page_size).execute()
+        rows = resp.data or []
+        for row in rows:
+            yield row[key]
+        if len(rows) < page_size:
+            return
+        last = rows[-1][key]
+
+
+async def iter_urls(base_url: str, state_url: str, course_url: str, page_size: int) -> AsyncIterator[str]:
+    base_url = base_url.rstrip("/")
+    for path in STATIC_PATHS:
+        yield base_url + path
+    async for code in iter_keys("states", "code", page_size):
+        yield base_url + state_url.format(code=str(code).lower())
+    async for course_id in iter_keys("courses", "id", page_size):
+        yield base_url + course_url.format(id=course_id)
+
+
+class _ShardWriter:
+    """
+    Writes one gzipped XML file to a temporary path while hashing its
+    uncompressed content, then either moves it into place or, when the
+    hash matches the manifest, throws it away.
+    """
+
+    def __init__(self, out: Path, name: str, opening: str):
+        self.name = name
+        self.count = 0
+        self._final = out / name
+        self._tmp = out / f".{name}.tmp"
+        self._hash = hashlib.sha256()
+        # mtime=0: the same content always compresses to the same bytes
+        self._gz = gzip.GzipFile(filename="", mode="wb", fileobj=open(self._tmp, "wb"), mtime=0)
+        self.write(opening)
+
+    def write(self, text: str) -> None:
+        data = text.encode()
+        self._hash.update(data)
+        self._gz.write(data)
+
+    def add(self, url: str) -> None:
+        self.write(f"  <url><loc>{escape(url)}</loc></url>\n")
+        self.count += 1
+
+    def finish(self, closing: str, previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        self.write(closing)
+        fileobj = self._gz.fileobj
+        self._gz.close()
+        fileobj.close()
+        digest = self._hash.hexdigest()
+        if previous and previous.get("sha256") == digest and self._final.exists():
+            self._tmp.unlink()
+            return {**previous, "changed": False}
+        os.replace(self._tmp, self._final)
+        lastmod = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return {"sha256": digest, "urls": self.count, "lastmod": lastmod, "changed": True}
+
+
+async def generate(
+    out: Path,
+    base_url: str,
+    state_url: str,
+    course_url: str,
+    page_size: int,
+    shard_size: int = MAX_URLS,
+    public_path: str = "/static/sitemap",
+) -> Dict[str, Any]:
+    out.mkdir(parents=True, exist_ok=True)
+    manifest_path = out / MANIFEST
+    old = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+    old_shards: Dict[str, Any] = old.get("shards", {})
+    shards: Dict[str, Any] = {}
+
+    shard: Optional[_ShardWriter] = None
+
+    def close_shard() -> None:
+        shards[shard.name] = shard.finish(_URLSET_CLOSE, old_shards.get(shard.name))
+
+    async for url in iter_urls(base_url, state_url, course_url, page_size):
+        if shard is None or shard.count >= shard_size:
+            if shard is not None:
+                close_shard()
+            shard = _ShardWriter(out, f"sitemap-{len(shards) + 1}.xml.gz", _URLSET_OPEN)
+        shard.add(url)
+    if shard is not None:
+        close_shard()
+
+    # shards from a bigger previous run
+    for name in set(old_shards) - set(shards):
+        (out / name).unlink(missing_ok=True)
+
+    index = _ShardWriter(out, INDEX, _INDEX_OPEN)
+    for name, info in shards.items():
+        loc = escape(f"{base_url.rstrip('/')}{public_path.rstrip('/')}/{name}")
+        index.write(f"  <sitemap><loc>{loc}</loc><lastmod>{info['lastmod']}</lastmod></sitemap>\n")
+    index_info = index.finish(_INDEX_CLOSE, old.get("index"))
+
+    manifest = {
+        "shards": {name: {k: v for k, v in info.items() if k != "changed"} for name, info in shards.items()},
+        "index": {k: v for k, v in index_info.items() if k != "changed"},
+    }
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+    return {
+        "urls": sum(info["urls"] for info in shards.values()),
+        "shards": len(shards),
+        "rewritten": [name for name, info in shards.items() if info["changed"]],
+        "removed": sorted(set(old_shards) - set(shards)),
+    }
+
+
+async def run(args: argparse.Namespace) -> None:
+    await init_supabase()
+    try:
+        summary = await generate(
+            Path(args.out), args.base_url, args.state_url, args.course_url,
+            args.page_size, args.shard_size, args.public_path,
+        )
+    finally:
+        await close_supabase()
+    print(json.dumps(summary), file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate sharded, gzipped sitemaps")
+    parser.add_argument("--base-url", required=True)
+    parser.add_argument("--out", default="static/sitemap")
+    parser.add_argument("--public-path", default="/static/sitemap", help="URL path the --out directory is served from")
+    parser.add_argument("--state-url", default="/states/{code}", help="path template for state pages")
+    parser.add_argument("--course-url", default="/courses/{id}", help="path template for course pages")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--shard-size", type=int, default=MAX_URLS)
+    args = parser.parse_args()
+    if not 0 < args.shard_size <= MAX_URLS:
+        parser.error(f"--shard-size must be between 1 and {MAX_URLS}")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# scripts/send_renewal_reminders.py
+#
+# Renewal reminders through OneSignal; run from cron, e.g. hourly, with
+# --refresh once a night to rebuild the due-date index from a full sweep.
+# In between, each run re-indexes the users the app changed since the last.
+#
+#   python -m scripts.send_renewal_reminders [--refresh] [--as-of YYYY-MM-DD] [--dry-run]
+#
+# Against the local fake: ONESIGNAL_API_URL=http://127.0.0.1:8765 (scripts/fake_onesignal.py)
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import date
+
+from backend.services.supabase_client import init_supabase, close_supabase
+from backend.services.onesignal import onesignal_client
+from backend.services.reminders import RenewalReminders, reminder_windows
+from backend.services.renewal_index import renewal_index
+
+
+async def run(as_of: date, refresh: bool, dry_run: bool) -> None:
+    client = onesignal_client()
+    if not client.configured and not dry_run:
+        sys.exit("ONESIGNAL_APP_ID and ONESIGNAL_API_KEY must be set (or pass --dry-run)")
+
+    index = renewal_index
+    index.open()
+    await init_supabase()
+    try:
+        async with client:
+            summary = await RenewalReminders(index, client, reminder_windows()).run(
+                as_of=as_of, refresh=refresh, dry_run=dry_run
+            )
+    finally:
+        await close_supabase()
+        index.close()
+    print(json.dumps(summary), file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Send CE renewal reminders")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today())
+    parser.add_argument("--refresh", action="store_true", help="rebuild the index from a full compliance sweep first")
+    parser.add_argument("--dry-run", action="store_true", help="work out who is due without sending anything")
+    args = parser.parse_args()
+    asyncio.run(run(args.as_of, args.refresh, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
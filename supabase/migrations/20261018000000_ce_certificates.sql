@@ -0,0 +1,24 @@
+-- Certificate files attached to CE records (api/upload.py, services/storage.py).
+-- The file itself lives under storage_key (local disk or the CERT_STORAGE_BUCKET
+-- bucket), content-addressed by sha256; this row ties it to a record.
+
+create table if not exists public.ce_certificates (
+    id           uuid primary key default gen_random_uuid(),
+    record_id    uuid not null references public.ce_records (id) on delete cascade,
+    user_id      uuid not null references public.users (id) on delete cascade,
+    storage_key  text not null,
+    sha256       text not null,
+    size_bytes   bigint not null,
+    content_type text,
+    filename     text,
+    created_at   timestamptz not null default now()
+);
+
+-- "is this file already attached to this record?" on every upload
+create index if not exists ce_certificates_record on public.ce_certificates (record_id, sha256);
+create index if not exists ce_certificates_user on public.ce_certificates (user_id);
+
+alter table public.ce_certificates enable row level security;
+
+create policy "own certificates" on public.ce_certificates
+    for all using (auth.uid() = user_id) with check (auth.uid() = user_id);
@@ -0,0 +1,97 @@
+# tests/conftest.py
+
+import itertools
+import os
+import tempfile
+
+# settings are read at import: point everything at the in-process fake first
+_VAR = tempfile.mkdtemp(prefix="credenticare-tests-")
+os.environ.update({
+    "DATA_BACKEND": "fake",
+    "FAKE_DB": ":memory:",
+    "FAKE_SEED_USERS": "4",
+    "FAKE_SEED_COURSES": "20",
+    "FAKE_SEED_RECORDS": "30",
+    "FAKE_LATENCY_MS": "0",
+    "RATELIMIT_BACKEND": "memory",
+    "DATA_VERSION_BACKEND": "memory",
+    "REMINDERS_DB": ":memory:",
+    "REPORT_JOBS_DB": ":memory:",
+    "STRIPE_EVENTS_DB": ":memory:",
+    "REPORT_ARTIFACTS_DIR": os.path.join(_VAR, "reports"),
+    "CERT_STORAGE_DIR": os.path.join(_VAR, "certificates"),
+    "TEMPLATE_CACHE_DIR": os.path.join(_VAR, "jinja"),
+})
+
+import httpx
+import pytest
+
+from backend.core.config import settings
+from backend.services.compliance import compliance
+from backend.services.reference import reference
+from backend.services.renewal_index import renewal_index
+from backend.services.resilience import resilience
+from backend.services.supabase_client import close_supabase, init_supabase, supabase
+
+_seeds = itertools.count(1)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def fresh_seed(monkeypatch):
+    # new ids every test, so nothing cached by id carries over from the last one
+    monkeypatch.setattr(settings, "fake_seed", next(_seeds))
+    yield
+    compliance._aggregates.clear()
+    compliance._rulebook = None
+    reference.invalidate()
+    reference._last.clear()
+    resilience.breaker.success()
+    renewal_index.close()
+
+
+@pytest.fixture
+async def db():
+    """A freshly seeded fake Supabase."""
+    await init_supabase()
+    yield supabase
+    await close_supabase()
+
+
+@pytest.fixture
+async def users(db):
+    return (await db.table("users").select("id,state").order("id").execute()).data
+
+
+@pytest.fixture
+async def app():
+    """The app with its lifespan running (which seeds its own fake)."""
+    from backend.main import app
+
+    async with app.router.lifespan_context(app):
+        yield app
+
+
+@pytest.fixture
+async def client(app):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def login(client: httpx.AsyncClient, i: int = 0) -> str:
+    """Sign in as seeded user `i` (the cookie stays on `client`); returns their id."""
+    from backend.services.fake_supabase import SEED_PASSWORD, seed_email
+
+    resp = await client.post("/login", data={"email": seed_email(i), "password": SEED_PASSWORD})
+    assert resp.status_code == 303, resp.text
+    return (await supabase.table("users").select("id").eq("email", seed_email(i)).single().execute()).data["id"]
+
+
+@pytest.fixture
+async def user_id(client):
+    """Seeded user 0, signed in on `client`."""
+    return await login(client)
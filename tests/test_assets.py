@@ -0,0 +1,106 @@
+# tests/test_assets.py
+
+import os
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from backend.core.assets import IMMUTABLE, AssetManifest, PrecompressedStaticFiles, accepts_encoding, assets
+from scripts.build_assets import build
+
+pytestmark = pytest.mark.anyio
+
+CSS = b"body { color: #123456; }\n" * 64
+
+
+@pytest.fixture
+def static(tmp_path):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "site.css").write_bytes(CSS)
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG not really")
+    return tmp_path
+
+
+@pytest.fixture
+async def static_client(static):
+    build(static)
+    app = Starlette(routes=[Mount("/static", PrecompressedStaticFiles(directory=str(static)))])
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        client.manifest = AssetManifest(static)
+        yield client
+
+
+@pytest.mark.parametrize("header, encoding", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0, gzip;q=0.5", "gzip"),
+    ("identity", None),
+])
+async def test_serves_the_variant_the_client_accepts(static_client, header, encoding):
+    url = static_client.manifest.url("css/site.css")
+    assert url.startswith("/static/dist/css/site.") and url.endswith(".css")
+
+    resp = await static_client.get(url, headers={"accept-encoding": header})
+    assert resp.status_code == 200
+    assert resp.headers.get("content-encoding") == encoding
+    assert resp.headers["content-type"] == "text/css; charset=utf-8"
+    assert resp.headers["cache-control"] == IMMUTABLE
+    assert resp.headers["vary"] == "Accept-Encoding"
+    # httpx decodes the body; the wire carried the smaller variant
+    assert resp.content == CSS
+    assert (resp.num_bytes_downloaded < len(CSS)) is (encoding is not None)
+
+
+async def test_revalidation_stays_immutable(static_client):
+    url = static_client.manifest.url("css/site.css")
+    first = await static_client.get(url, headers={"accept-encoding": "gzip"})
+    resp = await static_client.get(url, headers={"accept-encoding": "gzip", "if-none-match": first.headers["etag"]})
+    assert resp.status_code == 304
+    assert resp.headers["cache-control"] == IMMUTABLE
+
+
+async def test_other_paths_are_served_as_before(static_client):
+    resp = await static_client.get("/static/css/site.css", headers={"accept-encoding": "br"})
+    assert resp.status_code == 200 and resp.content == CSS
+    assert "content-encoding" not in resp.headers
+    assert resp.headers.get("cache-control") != IMMUTABLE
+
+    # the manifest changes with every build, and binary files have no variants
+    resp = await static_client.get("/static/dist/manifest.json")
+    assert resp.headers.get("cache-control") != IMMUTABLE
+    resp = await static_client.get(static_client.manifest.url("logo.png"), headers={"accept-encoding": "br"})
+    assert resp.status_code == 200 and "content-encoding" not in resp.headers
+    assert "vary" not in resp.headers
+
+
+def test_accepts_encoding():
+    assert accepts_encoding("gzip, br", "br")
+    assert accepts_encoding("*", "br")
+    assert not accepts_encoding("br;q=0", "br")
+    assert not accepts_encoding("gzip", "br")
+
+
+def test_manifest_falls_back_without_a_build(tmp_path):
+    manifest = AssetManifest(tmp_path)
+    assert manifest.url("css/site.css") == "/static/css/site.css"
+    assert manifest.version == ""
+
+
+async def test_page_etag_changes_when_assets_are_rebuilt(client, user_id, static, monkeypatch):
+    path = "/ce/records/upload"
+    monkeypatch.setattr(assets, "_path", AssetManifest(static)._path)
+    build(static)
+    first = await client.get(path)
+    assert first.status_code == 200, first.text
+    etag = first.headers["etag"]
+    assert (await client.get(path, headers={"if-none-match": etag})).status_code == 304
+
+    # a rebuild links new fingerprinted URLs, so cached copies of the page are stale
+    manifest = static / "dist" / "manifest.json"
+    mtime = manifest.stat().st_mtime
+    os.utime(manifest, (mtime + 10, mtime + 10))
+    resp = await client.get(path, headers={"if-none-match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
@@ -0,0 +1,44 @@
+# tests/test_ce_api.py
+
+from datetime import date
+
+import pytest
+
+from backend.services.supabase_client import supabase
+
+pytestmark = pytest.mark.anyio
+
+
+async def _course_id() -> str:
+    return (await supabase.table("courses").select("id").limit(1).execute()).data[0]["id"]
+
+
+async def test_create_record_without_notes(client, user_id):
+    record = {"course_id": await _course_id(), "date_completed": str(date.today()), "hours_earned": 2}
+    resp = await client.post("/ce/records", json=record)
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["notes"] is None
+
+    rows = (await supabase.table("ce_records").select("id").eq("user_id", user_id).execute()).data
+    assert resp.json()["id"] in {r["id"] for r in rows}
+
+
+async def test_list_records_with_null_notes(client, user_id):
+    await supabase.table("ce_records").insert({
+        "user_id": user_id, "course_id": await _course_id(), "date_completed": str(date.today()),
+        "hours_earned": 1, "notes": None,
+    }).execute()
+
+    resp = await client.get("/ce/records", params={"limit": 5})
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["items"][0]["notes"] is None
+
+
+async def test_list_records_pages_with_cursor(client, user_id):
+    first = (await client.get("/ce/records", params={"limit": 20})).json()
+    second = (await client.get("/ce/records", params={"limit": 20, "cursor": first["next_cursor"]})).json()
+    assert second["next_cursor"] is None
+    ids = [r["id"] for r in first["items"] + second["items"]]
+    assert len(ids) == len(set(ids)) == 30
+
+    assert (await client.get("/ce/records", params={"cursor": "bogus"})).status_code == 400
@@ -0,0 +1,137 @@
+# tests/test_certificates.py
+
+import asyncio
+from datetime import date
+
+import pytest
+
+from backend.cert_parser import CertificateFields, _parse, extract_text, parse_fields
+from backend.core.cache import TTLCache
+from backend.core.process_pool import PoolBusy, ProcessPool
+from backend.services.supabase_client import supabase
+
+pytestmark = pytest.mark.anyio
+
+
+def _certificate(title: str, hours: str, completed: str = "March 4, 2025") -> str:
+    return "\n".join([
+        "Certificate of Completion",
+        "This certifies that Jane Doe, RN",
+        f"has successfully completed the course: \"{title}\"",
+        "Provider: Example Nursing Education",
+        f"Date of completion: {completed}",
+        f"Contact hours: {hours}",
+    ])
+
+
+def _pdf(lines) -> bytes:
+    # smallest well-formed PDF with one page of Helvetica text
+    text = "BT /F1 12 Tf 72 720 Td 14 TL " + " ".join(
+        "(" + line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ") '" for line in lines
+    ) + " ET"
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(text), text.encode("latin-1")),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for n, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (n, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+# ─── parsing ────────────────────────────────────────────────────
+
+def test_parse_fields_reads_labelled_certificate():
+    fields = parse_fields(_certificate("Wound Care Basics", "2.0"))
+    assert fields == {
+        "course_title": "Wound Care Basics",
+        "provider": "Example Nursing Education",
+        "date_completed": date(2025, 3, 4),
+        "contact_hours": 2.0,
+    }
+
+
+def test_pdf_text_is_extracted():
+    text = extract_text(_pdf(_certificate("Wound Care Basics", "3").splitlines()))
+    assert parse_fields(text)["contact_hours"] == 3.0
+    assert parse_fields(text)["course_title"] == "Wound Care Basics"
+
+
+def test_unreadable_file_comes_back_as_error():
+    assert _parse(b"\xff\xfe\x00\xd8") == {"error": "Unsupported certificate format; upload a PDF or text file"}
+    assert "error" in _parse(b"%PDF-1.4 truncated")
+
+
+@pytest.mark.parametrize("hours, earned", [(2.0, 2), (1.5, None), (0.5, None), (None, None)])
+def test_hours_are_never_rounded(hours, earned):
+    cert = CertificateFields(sha256="x", course_id="c", date_completed=date(2025, 3, 4), contact_hours=hours)
+    assert cert.hours_earned == earned
+    assert cert.complete is (earned is not None)
+
+
+def test_fractional_hours_are_kept_in_notes():
+    cert = CertificateFields(sha256="x", provider="P", contact_hours=1.5, filename="c.pdf")
+    assert cert.notes() == "Provider: P; 1.5 contact hours; Certificate: c.pdf"
+
+
+# ─── pool ───────────────────────────────────────────────────────
+
+async def test_pool_shares_inflight_calls_and_caches_results():
+    pool = ProcessPool(workers=1, cache=TTLCache(maxsize=8, ttl=60), limit=1)
+    data = _certificate("Wound Care Basics", "2").encode()
+    try:
+        first, second = await asyncio.gather(pool.run("k", _parse, data), pool.run("k", _parse, data))
+        assert first == second and first["contact_hours"] == 2.0
+        # cached: no worker round-trip, and never refused as busy
+        assert pool._cache.get("k") == first
+        assert await pool.run("k", _parse, b"ignored") == first
+
+        slow = asyncio.ensure_future(pool.run("a", _parse, data))
+        await asyncio.sleep(0)
+        with pytest.raises(PoolBusy):
+            await pool.run("b", _parse, data)
+        await slow
+    finally:
+        pool.shutdown()
+
+
+# ─── api ────────────────────────────────────────────────────────
+
+async def test_import_inserts_whole_hours_and_reviews_fractional(client, user_id):
+    courses = (await supabase.table("courses").select("id,name").order("id").limit(2).execute()).data
+    whole, fractional = (c["name"] for c in courses)
+    files = [
+        ("files", ("whole.pdf", _pdf(_certificate(whole, "3").splitlines()), "application/pdf")),
+        ("files", ("fractional.txt", _certificate(fractional, "1.5").encode(), "text/plain")),
+    ]
+    resp = await client.post("/ce/certificates/import", files=files)
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["inserted"] == 1
+    [review] = body["needs_review"]
+    assert (review["filename"], review["contact_hours"], review["course_id"]) == ("fractional.txt", 1.5, courses[1]["id"])
+
+    records = (await supabase.table("ce_records").select("course_id,hours_earned,notes")
+               .eq("user_id", user_id).eq("course_id", courses[0]["id"]).execute()).data
+    assert {"course_id": courses[0]["id"], "hours_earned": 3,
+            "notes": "Provider: Example Nursing Education; Certificate: whole.pdf"} in records
+
+
+async def test_prefill_explains_fractional_hours(client, user_id):
+    resp = await client.post(
+        "/ce/records/upload/certificate",
+        files={"file": ("c.txt", _certificate("Anything", "2.5").encode(), "text/plain")},
+    )
+    assert resp.status_code == 200, resp.text
+    assert "2.5 contact hours" in resp.text
+    assert "CE records take whole hours" in resp.text
@@ -0,0 +1,120 @@
+# tests/test_compliance.py
+
+import asyncio
+import uuid
+from datetime import date, timedelta
+
+import pytest
+
+from backend.core.config import settings
+from backend.services import compliance as compliance_module
+from backend.services.compliance import CEAggregate, compliance
+from backend.services.rules import RuleBook, StateRule, as_date, build_status, cycle_window, evaluate_batch
+
+pytestmark = pytest.mark.anyio
+
+TODAY = date(2026, 10, 18)
+
+
+def _rulebook() -> RuleBook:
+    return RuleBook(
+        [StateRule(state="", required_hours=10, renewal_interval_days=365, category_minimums={"ethics": 2})],
+        {"c-ethics": "ethics", "c-other": "general"},
+    )
+
+
+def _aggregate_status(rulebook: RuleBook, records) -> dict:
+    rule = rulebook.for_state(None)
+    start, end = cycle_window(rule.renewal_interval_days, TODAY)
+    agg = CEAggregate(renewal_interval_days=rule.renewal_interval_days, cycle_start=start, cycle_end=end)
+    for r in records:
+        agg.add(r["date_completed"], r["hours_earned"], rulebook.category_of(r.get("course_id")))
+    return build_status(rule, agg.cycle_hours, agg.cycle_category_hours, agg.latest_completed, TODAY)
+
+
+@pytest.mark.parametrize("offset", [-366, -365, -364, -1, 0, 1, 30])
+def test_aggregate_and_batch_agree_on_the_window(offset):
+    rulebook = _rulebook()
+    records = [
+        {"user_id": "u", "course_id": "c-ethics", "hours_earned": 3,
+         "date_completed": str(TODAY + timedelta(days=offset))},
+        {"user_id": "u", "course_id": "c-other", "hours_earned": 2, "date_completed": str(TODAY - timedelta(days=10))},
+    ]
+    batch = evaluate_batch(rulebook, [("u", None)], records, TODAY)["u"]
+    assert _aggregate_status(rulebook, records) == batch
+
+
+async def test_status_matches_sweep(db, users):
+    future = {"user_id": users[0]["id"], "date_completed": str(date.today() + timedelta(days=30)), "hours_earned": 50}
+    edge = {"user_id": users[1]["id"], "date_completed": str(date.today()), "hours_earned": 7}
+    await db.table("ce_records").insert([future, edge]).execute()
+
+    swept = await compliance.sweep()
+    assert set(swept) == {u["id"] for u in users}
+    for u in users:
+        assert await compliance.status(u["id"], u["state"]) == swept[u["id"]]
+    assert await compliance.sweep(user_ids=[users[0]["id"]]) == {users[0]["id"]: swept[users[0]["id"]]}
+
+
+async def test_status_sees_records_added_to_a_warm_aggregate(db, users):
+    user = users[0]
+    before = await compliance.status(user["id"], user["state"])
+    record = {"user_id": user["id"], "date_completed": str(date.today()), "hours_earned": 4}
+    await db.table("ce_records").insert(record).execute()
+    await compliance.record_added(user["id"], record)
+
+    after = await compliance.status(user["id"], user["state"])
+    assert after["hours_completed"] == before["hours_completed"] + 4
+    assert after == (await compliance.sweep(user_ids=[user["id"]]))[user["id"]]
+
+
+async def test_build_racing_a_write_is_not_cached(db, users, monkeypatch):
+    user = users[0]
+    rulebook = await compliance.rulebook()
+    interval = rulebook.for_state(user["state"]).renewal_interval_days
+    reading, release = asyncio.Event(), asyncio.Event()
+    fetch_all = compliance_module._fetch_all
+
+    async def slow_fetch_all(query, page_size):
+        rows = await fetch_all(query, page_size)
+        reading.set()
+        await release.wait()
+        return rows
+
+    monkeypatch.setattr(compliance_module, "_fetch_all", slow_fetch_all)
+    build = asyncio.ensure_future(compliance.aggregate(user["id"], interval, rulebook))
+    await reading.wait()
+    record = {"user_id": user["id"], "date_completed": str(date.today()), "hours_earned": 4}
+    await db.table("ce_records").insert(record).execute()
+    await compliance.record_added(user["id"], record)
+    release.set()
+    await build
+
+    assert compliance._aggregates.get(user["id"]) is None
+    monkeypatch.setattr(compliance_module, "_fetch_all", fetch_all)
+    status = await compliance.status(user["id"], user["state"])
+    assert status == (await compliance.sweep(user_ids=[user["id"]]))[user["id"]]
+
+
+@pytest.mark.parametrize("total, chunks", [(100, 1), (101, 2)])
+async def test_sweep_filters_ids_a_slice_at_a_time(db, users, monkeypatch, total, chunks):
+    assert settings.ids_per_query == 100
+    # the last real user is the 101st id when there is one
+    unknown = [str(uuid.UUID(int=i + 1)) for i in range(total - len(users))]
+    ids = unknown[:-1] + [u["id"] for u in users[:-1]] + unknown[-1:] + [users[-1]["id"]]
+    fetch_all = compliance_module._fetch_all
+    fetches = []
+
+    async def counting_fetch_all(query, page_size):
+        fetches.append(query)
+        return await fetch_all(query, page_size)
+
+    expected = await compliance.sweep()
+    monkeypatch.setattr(compliance_module, "_fetch_all", counting_fetch_all)
+    swept = await compliance.sweep(user_ids=ids)
+    assert len(fetches) == 2 * chunks  # users and records per slice
+    assert swept == expected
+
+
+def test_as_date_accepts_timestamps():
+    assert as_date("2026-10-18T12:00:00+00:00") == TODAY
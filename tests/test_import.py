@@ -0,0 +1,81 @@
+# tests/test_import.py
+
+import json
+from datetime import date
+
+import pytest
+
+from backend.core.config import settings
+from backend.services.supabase_client import supabase
+
+pytestmark = pytest.mark.anyio
+
+
+async def _courses():
+    return (await supabase.table("courses").select("id,name").order("id").limit(2).execute()).data
+
+
+async def _import(client, name: str, body: str, content_type: str = "text/csv"):
+    resp = await client.post("/ce/records/import", files={"file": (name, body.encode(), content_type)})
+    assert resp.status_code == 200, resp.text
+    return resp.json()
+
+
+async def test_csv_row_with_empty_notes_can_be_listed(client, user_id):
+    course = (await _courses())[0]
+    body = f"course_id,date_completed,hours_earned,notes\n{course['id']},{date.today()},3,\n"
+    report = await _import(client, "records.csv", body)
+    assert report == {"inserted": 1, "failed": 0, "errors": []}
+
+    resp = await client.get("/ce/records", params={"limit": 1})
+    assert resp.status_code == 200, resp.text
+    [item] = resp.json()["items"]
+    assert (item["course_id"], item["hours_earned"], item["notes"]) == (course["id"], 3, None)
+
+
+async def test_rows_fail_one_at_a_time(client, user_id):
+    first, second = await _courses()
+    today = str(date.today())
+    body = "\n".join([
+        "course,date_completed,hours_earned,notes",
+        f"{first['name'].upper()},{today},2,by title",
+        f"No Such Course,{today},2,",
+        f"{second['id']},not-a-date,2,",
+        f"{second['id']},{today},0,",
+        f"{second['id']},{today},4,ok",
+    ])
+    report = await _import(client, "records.csv", body)
+    assert report["inserted"] == 2
+    assert [e["row"] for e in report["errors"]] == [2, 3, 4]
+    assert report["errors"][0]["error"] == "Unknown course"
+
+
+async def test_ndjson_and_json(client, user_id):
+    course = (await _courses())[0]
+    row = {"course_id": course["id"], "date_completed": str(date.today()), "hours_earned": 1}
+    ndjson = "\n".join([json.dumps(row), "{not json", "[1]", ""])
+    report = await _import(client, "records.ndjson", ndjson, "application/x-ndjson")
+    assert report["inserted"] == 1
+    assert [e["row"] for e in report["errors"]] == [2, 3]
+
+    report = await _import(client, "records.json", json.dumps([row, row]), "application/json")
+    assert report["inserted"] == 2
+    report = await _import(client, "records.json", json.dumps(row), "application/json")
+    assert report["inserted"] == 0 and report["errors"][0]["row"] is None
+
+
+async def test_import_is_capped(client, user_id, monkeypatch):
+    monkeypatch.setattr(settings, "import_max_rows", 3)
+    course = (await _courses())[0]
+    body = "course_id,date_completed,hours_earned\n" + f"{course['id']},{date.today()},1\n" * 5
+    report = await _import(client, "records.csv", body)
+    assert report["inserted"] == 3
+    assert report["errors"] == [{"row": 4, "error": "Import is limited to 3 rows"}]
+
+
+async def test_import_updates_status(client, user_id):
+    before = (await client.get("/ce/status")).json()
+    course = (await _courses())[0]
+    await _import(client, "records.csv", f"course_id,date_completed,hours_earned\n{course['id']},{date.today()},5\n")
+    after = (await client.get("/ce/status")).json()
+    assert after["hours_completed"] == before["hours_completed"] + 5
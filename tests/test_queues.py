@@ -0,0 +1,183 @@
+# tests/test_queues.py
+
+import asyncio
+import hashlib
+import hmac
+import json
+import threading
+import time
+
+import pytest
+
+from backend.core.config import settings
+from backend.services.fake_supabase import seed_email
+from backend.services.report_jobs import ReportJobQueue
+from backend.services.stripe_events import StripeEventQueue
+
+pytestmark = pytest.mark.anyio
+
+
+def _report_queue(path, owner: str, lease: float = 60) -> ReportJobQueue:
+    queue = ReportJobQueue(str(path / "jobs.sqlite3"), str(path / "artifacts"), 1, 3600, lease)
+    queue._owner = owner
+    queue._open()
+    return queue
+
+
+def _queue_jobs(queue: ReportJobQueue, count: int) -> None:
+    now = time.time()
+    for i in range(count):
+        queue._execute(
+            "INSERT INTO report_jobs (id, owner_id, user_ids, status, base_url, created_at) "
+            "VALUES (?, 'o', '[]', 'queued', 'http://test', ?)",
+            (f"job-{i}", now + i),
+        )
+
+
+def test_report_jobs_are_claimed_once_across_processes(tmp_path):
+    queues = [_report_queue(tmp_path, "A"), _report_queue(tmp_path, "B")]
+    _queue_jobs(queues[0], 40)
+    claimed = {"A": [], "B": []}
+
+    def drain(queue):
+        while (row := queue._claim()) is not None:
+            claimed[queue._owner].append(row["id"])
+
+    threads = [threading.Thread(target=drain, args=(q,)) for q in queues]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not set(claimed["A"]) & set(claimed["B"])
+    assert len(claimed["A"]) + len(claimed["B"]) == 40
+    owners = dict(queues[0]._execute("SELECT id, owner FROM report_jobs"))
+    assert all(owners[job] == owner for owner, jobs in claimed.items() for job in jobs)
+
+
+def test_report_jobs_recover_only_expired_leases(tmp_path):
+    queue = _report_queue(tmp_path, "A", lease=0.2)
+    _queue_jobs(queue, 2)
+    held, dead = queue._claim(), queue._claim()
+    time.sleep(0.3)
+    assert queue._renew(held["id"]) == 1
+
+    # opening the queue (another process starting) recovers what is due
+    other = _report_queue(tmp_path, "B")
+    assert other._recover() == 0
+    status = dict(other._execute("SELECT id, status FROM report_jobs"))
+    assert status == {held["id"]: "running", dead["id"]: "queued"}
+    # the job went back to the queue: the old worker's result no longer counts
+    assert queue._renew(dead["id"]) == 0
+
+
+def _event(event_id: str) -> dict:
+    return {"id": event_id, "type": "test.event", "data": {"object": {"n": event_id}}}
+
+
+async def test_stripe_events_retry_then_succeed():
+    queue = StripeEventQueue(":memory:", workers=2, max_attempts=3, retry_base=0.05, retention=60, lease=10)
+    calls = []
+
+    @queue.handler("test.event")
+    async def flaky(obj):
+        calls.append(obj["n"])
+        if len(calls) == 1:
+            raise RuntimeError("upstream hiccup")
+
+    await queue.start()
+    try:
+        assert await queue.enqueue(_event("evt_1"))
+        assert not await queue.enqueue(_event("evt_1"))
+        for _ in range(100):
+            row = queue._execute("SELECT status, attempts, error, owner FROM stripe_events")[0]
+            if row["status"] == "done":
+                break
+            await asyncio.sleep(0.02)
+    finally:
+        await queue.stop()
+
+    assert calls == ["evt_1", "evt_1"]
+    assert (row["status"], row["attempts"], row["error"]) == ("done", 2, None)
+
+
+async def test_stripe_events_give_up_after_max_attempts():
+    queue = StripeEventQueue(":memory:", workers=1, max_attempts=2, retry_base=0.01, retention=60, lease=10)
+    calls = []
+
+    @queue.handler("test.event")
+    async def broken(obj):
+        calls.append(obj["n"])
+        raise RuntimeError("always")
+
+    await queue.start()
+    try:
+        await queue.enqueue(_event("evt_2"))
+        for _ in range(100):
+            row = queue._execute("SELECT status, attempts, error FROM stripe_events")[0]
+            if row["status"] == "failed":
+                break
+            await asyncio.sleep(0.02)
+    finally:
+        await queue.stop()
+
+    assert len(calls) == 2
+    assert (row["status"], row["attempts"], row["error"]) == ("failed", 2, "always")
+
+
+def test_stripe_event_claim_is_atomic(tmp_path):
+    path = str(tmp_path / "events.sqlite3")
+    queues = []
+    for owner in ("A", "B"):
+        queue = StripeEventQueue(path, workers=1, max_attempts=3, retry_base=1, retention=60, lease=60)
+        queue._owner = owner
+        queue._open()
+        queues.append(queue)
+    for i in range(30):
+        queues[0]._insert(_event(f"evt_{i}"))
+    claimed = {"A": [], "B": []}
+
+    def drain(queue):
+        while (row := queue._claim()) is not None:
+            claimed[queue._owner].append(row["id"])
+
+    threads = [threading.Thread(target=drain, args=(q,)) for q in queues]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not set(claimed["A"]) & set(claimed["B"])
+    assert len(claimed["A"]) + len(claimed["B"]) == 30
+    assert {r["attempts"] for r in queues[0]._execute("SELECT attempts FROM stripe_events")} == {1}
+
+
+def _signed(body: str, secret: str) -> dict:
+    t = int(time.time())
+    signature = hmac.new(secret.encode(), f"{t}.{body}".encode(), hashlib.sha256).hexdigest()
+    return {"Stripe-Signature": f"t={t},v1={signature}", "Content-Type": "application/json"}
+
+
+async def test_stripe_webhook_is_queued_once_and_handled(client, monkeypatch):
+    from backend.services.supabase_client import supabase
+
+    monkeypatch.setattr(settings, "stripe_webhook_secret", "whsec_test")
+    email = seed_email(1)  # odd seeds are on the free plan
+    body = json.dumps({
+        "id": "evt_checkout", "object": "event", "type": "checkout.session.completed",
+        "data": {"object": {"object": "checkout.session", "customer_email": email}},
+    })
+
+    first = await client.post("/payments/webhook", content=body, headers=_signed(body, "whsec_test"))
+    again = await client.post("/payments/webhook", content=body, headers=_signed(body, "whsec_test"))
+    assert first.json() == {"status": "success", "duplicate": False}
+    assert again.json() == {"status": "success", "duplicate": True}
+    forged = await client.post("/payments/webhook", content=body, headers=_signed(body, "whsec_other"))
+    assert forged.status_code == 400
+
+    for _ in range(100):
+        user = (await supabase.table("users").select("is_pro").eq("email", email).execute()).data[0]
+        if user["is_pro"]:
+            break
+        await asyncio.sleep(0.02)
+    assert user["is_pro"]
@@ -0,0 +1,110 @@
+# tests/test_ratelimit.py
+
+import asyncio
+
+import pytest
+
+from backend.core import ratelimit
+from backend.core.ratelimit import (
+    ConcurrencyLimiter, MemoryBuckets, RateLimited, SQLiteBuckets, TokenBucket, _refill,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def test_refill_caps_at_burst():
+    assert _refill(0, 0, 1000, rate=1, burst=5) == (4, 0.0)
+
+
+def test_refill_reports_the_wait():
+    tokens, wait = _refill(0.25, 100, 100, rate=0.5, burst=5)
+    assert tokens == 0.25
+    assert wait == pytest.approx(1.5)
+
+
+def test_refill_check_does_not_spend():
+    assert _refill(2, 100, 100, rate=1, burst=5, spend=False) == (2, 0.0)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def limiter(request, tmp_path, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit.time, "monotonic", clock)
+    monkeypatch.setattr(ratelimit.time, "time", clock)
+    buckets = MemoryBuckets() if request.param == "memory" else SQLiteBuckets(str(tmp_path / "rl.sqlite3"))
+    # one token every 2 seconds, bursts of 3
+    return TokenBucket("test", per_minute=30, burst=3, buckets=buckets), clock
+
+
+async def test_bucket_refills_over_time(limiter):
+    bucket, clock = limiter
+    for _ in range(3):
+        await bucket.hit("k")
+    with pytest.raises(RateLimited) as e:
+        await bucket.hit("k")
+    assert e.value.retry_after == pytest.approx(2)
+    assert e.value.retry_after_header == "2"
+
+    clock.now += 1
+    with pytest.raises(RateLimited):
+        await bucket.hit("k")
+    clock.now += 1
+    await bucket.hit("k")
+
+    # idle long enough, it refills to the burst and no further
+    clock.now += 3600
+    for _ in range(3):
+        await bucket.hit("k")
+    with pytest.raises(RateLimited):
+        await bucket.hit("k")
+
+
+async def test_keys_have_their_own_buckets(limiter):
+    bucket, _ = limiter
+    for _ in range(3):
+        await bucket.hit("a")
+    await bucket.hit("b")
+
+
+async def test_check_only_limits_after_spends(limiter):
+    bucket, _ = limiter
+    for _ in range(10):
+        await bucket.check("k")
+    for _ in range(4):
+        await bucket.spend("k")  # never raises, even when empty
+    with pytest.raises(RateLimited):
+        await bucket.check("k")
+
+
+async def test_memory_buckets_are_bounded():
+    buckets = MemoryBuckets(maxsize=2)
+    for key in ("a", "b", "c"):
+        await buckets.take(key, rate=1, burst=1)
+    assert list(buckets._buckets) == ["b", "c"]
+
+
+async def test_concurrency_limiter_sheds_waiters():
+    limiter = ConcurrencyLimiter(limit=1, max_wait=0.05)
+    release = asyncio.Event()
+
+    async def hold():
+        async with limiter.slot():
+            await release.wait()
+
+    holder = asyncio.ensure_future(hold())
+    await asyncio.sleep(0)
+    with pytest.raises(RateLimited):
+        async with limiter.slot():
+            pass
+    release.set()
+    await holder
+    async with limiter.slot():
+        pass
@@ -0,0 +1,106 @@
+# tests/test_records.py
+
+import base64
+import json
+import uuid
+from datetime import date, timedelta
+
+import pytest
+
+from backend.core.config import settings
+from backend.services import exports
+from backend.services.records import MAX_ROWS, decode_cursor, encode_cursor, fetch_all, fetch_page
+
+pytestmark = pytest.mark.anyio
+
+
+def _token(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    row = {"date_completed": "2026-03-01", "id": str(uuid.uuid4())}
+    assert decode_cursor(encode_cursor(row)) == ("2026-03-01", row["id"])
+
+
+@pytest.mark.parametrize("token", [
+    "not base64!",
+    _token({"date": "2026-03-01"}),
+    _token([1, 2]),
+    _token(["2026-03-01", "x)"]),
+    _token(["2026-03-01,", str(uuid.uuid4())]),
+    _token(["2026-03-01)", str(uuid.uuid4())]),
+    _token(["2026-03-01", str(uuid.uuid4()) + ",id.gt.0"]),
+])
+def test_decode_cursor_rejects_anything_else(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+
+async def test_keyset_pages_cover_every_record_once(db, users):
+    user_id = users[0]["id"]
+    expected = (await db.table("ce_records").select("id").eq("user_id", user_id).execute()).data
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page, cursor = await fetch_page(user_id, 7, cursor)
+        seen += page
+        pages += 1
+        if cursor is None:
+            break
+    assert pages == -(-len(expected) // 7)
+    assert sorted(r["id"] for r in seen) == sorted(r["id"] for r in expected)
+    keys = [(r["date_completed"], r["id"]) for r in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+async def test_keyset_paging_ties_on_date(db, users):
+    user_id = users[0]["id"]
+    day = str(date.today() - timedelta(days=1))
+    await db.table("ce_records").delete().eq("user_id", user_id).execute()
+    await db.table("ce_records").insert([
+        {"id": str(uuid.uuid4()), "user_id": user_id, "date_completed": day, "hours_earned": 1}
+        for _ in range(10)
+    ]).execute()
+
+    first, cursor = await fetch_page(user_id, 4)
+    second, cursor = await fetch_page(user_id, 4, cursor)
+    third, cursor = await fetch_page(user_id, 4, cursor)
+    assert cursor is None
+    ids = [r["id"] for r in first + second + third]
+    assert len(ids) == len(set(ids)) == 10
+
+
+async def test_fetch_all_reads_past_max_rows(db, users):
+    user_id = users[0]["id"]
+    await db.table("ce_records").insert([
+        {"user_id": user_id, "date_completed": str(date.today() - timedelta(days=i % 900)), "hours_earned": 1}
+        for i in range(MAX_ROWS + 500)
+    ]).execute()
+    total = 30 + MAX_ROWS + 500
+
+    # a plain select is cut short, like PostgREST's max-rows
+    capped = (await db.table("ce_records").select("id").eq("user_id", user_id).execute()).data
+    assert len(capped) == MAX_ROWS
+
+    rows = await fetch_all(user_id)
+    assert len(rows) == len({r["id"] for r in rows}) == total
+
+
+@pytest.mark.parametrize("total, slices", [(100, [100]), (101, [100, 1])])
+async def test_org_export_filters_ids_a_slice_at_a_time(db, users, monkeypatch, total, slices):
+    assert settings.ids_per_query == 100
+    unknown = [str(uuid.UUID(int=i + 1)) for i in range(total - len(users))]
+    ids = [u["id"] for u in users[:-1]] + unknown + [users[-1]["id"]]
+    iter_records = exports._iter_records
+    seen = []
+
+    def counting_iter_records(page_size, user_ids):
+        seen.append(len(user_ids))
+        return iter_records(page_size, user_ids)
+
+    monkeypatch.setattr(exports, "_iter_records", counting_iter_records)
+    rows = [r async for page in exports.iter_all_records(7, ids) for r in page]
+    assert seen == slices
+    assert {r["user_id"] for r in rows} == {u["id"] for u in users}
+    assert len(rows) == len({r["id"] for r in rows}) == 30 * len(users)
@@ -0,0 +1,146 @@
+# tests/test_reference.py
+
+import asyncio
+
+import pytest
+
+from backend.core.config import settings
+from backend.services.reference import ReferenceCache, reference
+from backend.services.resilience import UpstreamUnavailable
+from backend.services.supabase_client import supabase
+
+pytestmark = pytest.mark.anyio
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_concurrent_gets_share_one_load():
+    cache = ReferenceCache(ttl=60)
+    calls = []
+    gate = asyncio.Event()
+
+    async def loader():
+        calls.append(1)
+        await gate.wait()
+        return [{"code": "CA"}]
+
+    cache.register("states", loader)
+    waiters = [asyncio.ensure_future(cache.get("states")) for _ in range(20)]
+    await _settle()
+    gate.set()
+    results = await asyncio.gather(*waiters)
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert (await cache.get("states")) is results[0]
+    assert not cache._inflight
+
+
+async def test_invalidate_during_a_load():
+    cache = ReferenceCache(ttl=60)
+    gates = []
+
+    async def loader():
+        gate = asyncio.Event()
+        gates.append(gate)
+        load = len(gates)
+        await gate.wait()
+        return [{"load": load}]
+
+    cache.register("courses", loader)
+    first = asyncio.ensure_future(cache.get("courses"))
+    await _settle()
+    cache.invalidate("courses")
+    second = asyncio.ensure_future(cache.get("courses"))
+    await _settle()
+
+    # the superseded load finishing must neither be cached nor unregister its successor
+    gates[0].set()
+    assert (await first).rows == [{"load": 1}]
+    await _settle()
+    third = asyncio.ensure_future(cache.get("courses"))
+    await _settle()
+    assert len(gates) == 2
+    assert "courses" not in cache._last
+
+    gates[1].set()
+    assert (await second).rows == (await third).rows == [{"load": 2}]
+    assert (await cache.get("courses")).rows == [{"load": 2}]
+    assert len(gates) == 2
+
+
+async def test_cancelled_caller_does_not_cancel_the_load():
+    cache = ReferenceCache(ttl=60)
+    gate = asyncio.Event()
+
+    async def loader():
+        await gate.wait()
+        return [{"ok": True}]
+
+    cache.register("t", loader)
+    impatient = asyncio.ensure_future(cache.get("t"))
+    patient = asyncio.ensure_future(cache.get("t"))
+    await _settle()
+    impatient.cancel()
+    gate.set()
+    assert (await patient).rows == [{"ok": True}]
+
+
+async def test_outage_serves_the_last_rows():
+    cache = ReferenceCache(ttl=60)
+    state = {"down": False}
+
+    async def loader():
+        if state["down"]:
+            raise UpstreamUnavailable("down")
+        return [{"n": 1}]
+
+    cache.register("t", loader)
+    loaded = await cache.get("t")
+    cache.invalidate("t")
+    state["down"] = True
+    assert (await cache.get("t")).rows == loaded.rows
+
+    cache.register("cold", loader)
+    with pytest.raises(UpstreamUnavailable):
+        await cache.get("cold")
+
+
+# ─── pages built from reference data ────────────────────────────
+
+async def test_upload_form_revalidates(client, user_id):
+    first = await client.get("/ce/records/upload")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        resp = await client.get("/ce/records/upload", headers={"If-None-Match": header})
+        assert resp.status_code == 304, header
+        assert resp.headers["etag"] == etag and not resp.content
+    resp = await client.get("/ce/records/upload", headers={"If-None-Match": '"other"'})
+    assert resp.status_code == 200
+
+
+async def test_admin_invalidate_reloads_the_catalog(client, user_id, monkeypatch):
+    etag = (await client.get("/ce/records/upload")).headers["etag"]
+    await supabase.table("courses").insert({"id": "new-course", "name": "Brand New Course"}).execute()
+    # still cached: the new course isn't on the page yet
+    assert (await client.get("/ce/records/upload", headers={"If-None-Match": etag})).status_code == 304
+
+    assert (await client.post("/admin/reference/invalidate")).status_code == 404  # no ADMIN_TOKEN: no admin routes
+    monkeypatch.setattr(settings, "admin_token", "s3cret")
+    assert (await client.post("/admin/reference/invalidate", headers={"x-admin-token": "wrong"})).status_code == 403
+    headers = {"x-admin-token": "s3cret"}
+    assert (await client.post("/admin/reference/invalidate", params={"name": "nope"}, headers=headers)).status_code == 404
+    resp = await client.post("/admin/reference/invalidate", params={"name": "courses"}, headers=headers)
+    assert resp.json() == {"invalidated": ["courses"]}
+
+    resp = await client.get("/ce/records/upload", headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert "Brand New Course" in resp.text
+    assert resp.headers["etag"] != etag
+    assert [r["id"] for r in await reference.rows("courses")].count("new-course") == 1
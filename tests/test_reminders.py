@@ -0,0 +1,123 @@
+# tests/test_reminders.py
+
+import sqlite3
+import threading
+from datetime import date, timedelta
+
+import httpx
+import pytest
+
+from backend.services.compliance import compliance
+from backend.services.onesignal import OneSignalClient
+from backend.services.profiles import invalidate_profile
+from backend.services.reminders import RenewalReminders
+from backend.services.renewal_index import RenewalIndex, renewal_index
+from backend.services.supabase_client import supabase
+from scripts.fake_onesignal import create_app
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def onesignal():
+    """A OneSignal client wired to scripts/fake_onesignal.py, and a reader for what it received."""
+    transport = httpx.ASGITransport(app=create_app())
+    client = OneSignalClient("app", "key", "http://onesignal.test", batch_size=100, rate_per_sec=0, max_attempts=2,
+                             transport=transport)
+
+    async def sent():
+        async with httpx.AsyncClient(transport=transport, base_url="http://onesignal.test") as http:
+            return (await http.get("/_sent")).json()
+
+    return client, sent
+
+
+async def _run(client, **kwargs):
+    async with client:
+        return await RenewalReminders(renewal_index, client, [60, 30, 7]).run(**kwargs)
+
+
+async def _rule(user):
+    return (await compliance.rulebook()).for_state(user["state"])
+
+
+async def test_new_record_reaches_the_index_without_a_refresh(db, users, onesignal):
+    client, sent = onesignal
+    user = users[0]
+    rule = await _rule(user)
+    await db.table("ce_records").delete().eq("user_id", user["id"]).execute()
+    await _run(client, refresh=True, dry_run=True)
+    assert await sent() == []
+
+    # the user's only record dates their renewal 20 days out, hours still short
+    record = {
+        "user_id": user["id"],
+        "date_completed": str(date.today() - timedelta(days=rule.renewal_interval_days - 20)),
+        "hours_earned": 1,
+    }
+    await db.table("ce_records").insert(record).execute()
+    await compliance.record_added(user["id"], record)
+
+    summary = await _run(client)
+    assert summary["sent"] == 1
+    [notification] = await sent()
+    assert notification["body"]["include_aliases"]["external_id"] == [user["id"]]
+    assert notification["body"]["data"] == {"type": "renewal_reminder", "window_days": 30}
+
+    # each window goes out once per renewal date
+    assert (await _run(client))["sent"] == 0
+    assert renewal_index.stale() == []
+
+
+async def test_state_change_reaches_the_index(db, users):
+    user = users[0]
+    rulebook = await compliance.rulebook()
+    interval = rulebook.for_state(user["state"]).renewal_interval_days
+    other = next(s for s in ("CA", "FL", "IL", "NY", "OH", "PA", "TX", "WA")
+                 if rulebook.for_state(s).renewal_interval_days != interval)
+    # no hours logged: the renewal is one cycle from today under whichever rule applies
+    await db.table("ce_records").delete().eq("user_id", user["id"]).execute()
+    reminders = RenewalReminders(renewal_index, None, [60])
+    await reminders.run(refresh=True, dry_run=True)
+
+    def indexed():
+        rows = renewal_index.due(date.today(), 4000)
+        return next(r["next_renewal_date"] for r in rows if r["user_id"] == user["id"])
+
+    assert indexed() == str(date.today() + timedelta(days=interval))
+
+    await db.table("users").update({"state": other}).eq("id", user["id"]).execute()
+    await invalidate_profile(user["id"])
+    await reminders.run(dry_run=True)
+    assert indexed() == str(date.today() + timedelta(days=rulebook.for_state(other).renewal_interval_days))
+
+
+def test_settle_keeps_users_touched_again():
+    index = RenewalIndex(":memory:")
+    index._touch("a")
+    index._touch("b")
+    stale = index.stale()
+    index._touch("b")
+    index.settle(stale)
+    assert [r["user_id"] for r in index.stale()] == ["b"]
+
+
+async def test_flagging_runs_off_the_event_loop(monkeypatch):
+    threads = []
+    monkeypatch.setattr(renewal_index, "_touch", lambda user_id: threads.append(threading.current_thread()))
+    await renewal_index.touch("u")
+    assert threads and threads[0] is not threading.main_thread()
+
+
+async def test_a_locked_index_does_not_fail_the_write(client, user_id, monkeypatch):
+    def locked(user_id):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(renewal_index, "_touch", locked)
+    course = (await supabase.table("courses").select("id").limit(1).execute()).data[0]["id"]
+    resp = await client.post(
+        "/ce/records", json={"course_id": course, "date_completed": str(date.today()), "hours_earned": 1},
+    )
+    assert resp.status_code == 200, resp.text
+    resp = await client.post("/settings", data={"state": "TX"})
+    assert resp.status_code == 303
@@ -0,0 +1,205 @@
+# tests/test_resilience.py
+
+import asyncio
+
+import httpx
+import pytest
+from postgrest import APIError, AsyncPostgrestClient
+
+from backend.core.cache import TTLCache
+from backend.services import resilience as resilience_module
+from backend.services import fake_supabase
+from backend.services.profiles import get_profile, profile_cache
+from backend.services.resilience import CircuitBreaker, LastKnownGood, Resilience, UpstreamUnavailable
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(resilience_module.time, "monotonic", clock)
+    return clock
+
+
+class Builder:
+    """Stands in for a PostgREST request: fails with `errors` in turn, then answers."""
+
+    def __init__(self, method: str = "GET", errors=()):
+        self.http_method = method
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def execute(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(threshold=3, reset_timeout=10)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.failure()
+    assert breaker.state == "closed"
+    breaker.before_call()
+    breaker.failure()
+    assert breaker.state == "open"
+    with pytest.raises(UpstreamUnavailable) as e:
+        breaker.before_call()
+    assert e.value.retry_after == 10
+
+
+def test_breaker_success_resets_the_count(clock):
+    breaker = CircuitBreaker(threshold=2, reset_timeout=10)
+    breaker.failure()
+    breaker.success()
+    breaker.failure()
+    assert breaker.state == "closed"
+
+
+def test_breaker_half_open_trial(clock):
+    breaker = CircuitBreaker(threshold=1, reset_timeout=10)
+    breaker.failure()
+    clock.now += 10
+    breaker.before_call()
+    assert breaker.state == "half-open"
+    # only one trial at a time
+    with pytest.raises(UpstreamUnavailable):
+        breaker.before_call()
+
+    breaker.failure()
+    assert breaker.state == "open"
+    clock.now += 5
+    with pytest.raises(UpstreamUnavailable):
+        breaker.before_call()
+
+    clock.now += 5
+    breaker.before_call()
+    breaker.success()
+    assert breaker.state == "closed"
+
+
+def test_breaker_cancelled_trial_lets_another_try(clock):
+    breaker = CircuitBreaker(threshold=1, reset_timeout=10)
+    breaker.failure()
+    clock.now += 10
+    breaker.before_call()
+    breaker.cancelled()
+    assert breaker.state == "open"
+    breaker.before_call()
+    assert breaker.state == "half-open"
+
+
+async def test_reads_are_retried_with_one_strike_per_call():
+    breaker = CircuitBreaker(threshold=2, reset_timeout=10)
+    res = Resilience(timeout=1, retries=2, retry_base=0.001, breaker=breaker)
+
+    read = Builder("GET", [httpx.ConnectError("down")] * 3)
+    with pytest.raises(UpstreamUnavailable):
+        await res.execute(read)
+    assert read.calls == 3
+    assert breaker.state == "closed"
+
+    flaky = Builder("GET", [httpx.ConnectError("blip")])
+    assert await res.execute(flaky) == "ok"
+    assert flaky.calls == 2
+
+
+async def test_writes_are_not_retried():
+    breaker = CircuitBreaker(threshold=5, reset_timeout=10)
+    res = Resilience(timeout=1, retries=2, retry_base=0.001, breaker=breaker)
+    write = Builder("POST", [httpx.ReadTimeout("slow")])
+    with pytest.raises(UpstreamUnavailable):
+        await res.execute(write)
+    assert write.calls == 1
+
+
+async def test_caller_errors_do_not_count():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=10)
+    res = Resilience(timeout=1, retries=2, retry_base=0.001, breaker=breaker)
+    bad = Builder("GET", [APIError({"code": "PGRST100", "message": "bad filter"})])
+    with pytest.raises(APIError):
+        await res.execute(bad)
+    assert bad.calls == 1
+    assert breaker.state == "closed"
+
+
+async def test_timeouts_open_the_circuit():
+    breaker = CircuitBreaker(threshold=1, reset_timeout=10)
+    res = Resilience(timeout=0.01, retries=0, retry_base=0.001, breaker=breaker)
+
+    class Slow(Builder):
+        async def execute(self):
+            await asyncio.sleep(1)
+
+    with pytest.raises(UpstreamUnavailable):
+        await res.execute(Slow())
+    assert breaker.state == "open"
+    untouched = Builder()
+    with pytest.raises(UpstreamUnavailable):
+        await res.execute(untouched)
+    assert untouched.calls == 0
+
+
+async def test_last_known_good_serves_stale_values():
+    lkg = LastKnownGood(TTLCache(maxsize=10, ttl=60))
+
+    async def fresh():
+        return {"n": 1}
+
+    async def down():
+        raise UpstreamUnavailable("down")
+
+    with pytest.raises(UpstreamUnavailable):
+        await lkg.load("k", down)
+    assert await lkg.load("k", fresh) == ({"n": 1}, False)
+    assert await lkg.load("k", down) == ({"n": 1}, True)
+
+
+def _postgrest_503():
+    requests = []
+
+    def respond(request):
+        requests.append(request)
+        return httpx.Response(503, json={"code": "PGRST001", "message": "no connection", "details": None, "hint": None})
+
+    http = httpx.AsyncClient(transport=httpx.MockTransport(respond), base_url="http://postgrest.test")
+    return AsyncPostgrestClient("http://postgrest.test", http_client=http), requests
+
+
+@pytest.mark.parametrize("read", [
+    lambda c: c.table("users").select("id").eq("id", "u").maybe_single(),
+    lambda c: c.table("users").select("id").eq("id", "u").limit(1),
+])
+async def test_a_503_is_an_upstream_failure(read):
+    client, requests = _postgrest_503()
+    breaker = CircuitBreaker(threshold=1, reset_timeout=10)
+    res = Resilience(timeout=1, retries=1, retry_base=0.001, breaker=breaker)
+    with pytest.raises(UpstreamUnavailable):
+        await res.execute(read(client))
+    assert len(requests) == 2
+    assert breaker.state == "open"
+
+
+async def test_profile_falls_back_to_last_known_good(users, monkeypatch):
+    user_id = users[0]["id"]
+    profile = await get_profile(user_id)
+    profile_cache.clear()
+
+    async def unavailable(self):
+        raise APIError({"message": "Service Unavailable", "code": 503})
+
+    monkeypatch.setattr(fake_supabase._Query, "execute", unavailable)
+    assert await get_profile(user_id) == profile
+    # stale: not cached, so the next request tries Supabase again
+    assert user_id not in profile_cache
@@ -0,0 +1,151 @@
+# tests/test_security.py
+
+import json
+import time
+
+import jwt
+import pytest
+
+from backend.core.cache import TTLCache
+from backend.core.security import TokenVerifier
+from backend.services import supabase_client
+from backend.services.fake_supabase import SEED_PASSWORD, seed_email
+
+pytestmark = pytest.mark.anyio
+
+SECRET = "fake-jwt-secret"  # what the fake backend signs with when SUPABASE_JWT_SECRET is unset
+
+
+def _verifier(secret=SECRET, jwks=None) -> TokenVerifier:
+    verifier = TokenVerifier(jwt_secret=secret, jwks_url=None, audience="authenticated",
+                             cache=TTLCache(maxsize=16, ttl=300))
+    verifier._jwks = jwks
+    return verifier
+
+
+async def _session(i: int = 0):
+    res = await supabase_client.auth.sign_in_with_password({"email": seed_email(i), "password": SEED_PASSWORD})
+    return res.session
+
+
+def _token(claims, secret=SECRET, **headers) -> str:
+    return jwt.encode({"aud": "authenticated", "exp": int(time.time()) + 600, **claims}, secret,
+                      algorithm="HS256", headers=headers or None)
+
+
+@pytest.fixture
+def gotrue(monkeypatch, db):
+    """Counts GoTrue round-trips made through the shared auth client."""
+    calls = []
+    real = supabase_client.auth.get_user
+
+    async def get_user(token=None):
+        calls.append(token)
+        return await real(token)
+
+    monkeypatch.setattr(supabase_client.auth._target, "get_user", get_user)
+    return calls
+
+
+async def test_valid_token_is_verified_locally_and_cached(gotrue, monkeypatch):
+    session = await _session()
+    verifier = _verifier()
+    user = await verifier.verify(session.access_token, session.refresh_token)
+    assert (user.id, user.email, user.session) == (session.user.id, seed_email(0), None)
+    assert user.expires_at == session.expires_at
+    assert gotrue == []
+
+    def no_decode(token):
+        raise AssertionError("decoded again")
+
+    monkeypatch.setattr(verifier, "_decode_locally", no_decode)
+    assert await verifier.verify(session.access_token, session.refresh_token) == user
+
+
+@pytest.mark.parametrize("claims, secret", [
+    ({"sub": "someone"}, "not-the-secret"),       # forged
+    ({"sub": "someone", "aud": "anon"}, SECRET),  # wrong audience
+    ({"email": "x@example.com"}, SECRET),         # no subject
+])
+async def test_invalid_tokens_are_rejected_without_refreshing(gotrue, claims, secret):
+    session = await _session()
+    verifier = _verifier()
+    assert await verifier.verify(_token(claims, secret), session.refresh_token) is None
+    assert gotrue == []
+    # the refresh token was never spent
+    assert await verifier.verify(session.access_token, session.refresh_token) is not None
+
+
+async def test_expired_token_is_refreshed_once(gotrue):
+    session = await _session()
+    verifier = _verifier()
+    stale = _token({"sub": session.user.id, "exp": int(time.time()) - 10})
+
+    user = await verifier.verify(stale, session.refresh_token)
+    assert user.id == session.user.id
+    assert set(user.session) == {"access_token", "refresh_token"}
+    assert user.session["access_token"] != stale
+
+    # refresh tokens are single-use: the stale cookie keeps working until replaced
+    assert await verifier.verify(stale, session.refresh_token) == user
+    assert await verifier.verify(user.session["access_token"], user.session["refresh_token"]) is not None
+    assert gotrue == []
+
+
+async def test_expired_token_with_spent_refresh_token_is_rejected(db):
+    session = await _session()
+    stale = _token({"sub": session.user.id, "exp": int(time.time()) - 10})
+    await supabase_client.auth.refresh_session(session.refresh_token)
+    assert await _verifier().verify(stale, session.refresh_token) is None
+
+
+async def test_without_a_local_key_gotrue_vouches(gotrue):
+    session = await _session()
+    verifier = _verifier(secret=None)
+    user = await verifier.verify(session.access_token, session.refresh_token)
+    assert user.id == session.user.id
+    assert user.expires_at == session.expires_at
+    assert gotrue == [session.access_token]
+
+    await verifier.verify(session.access_token, session.refresh_token)
+    assert len(gotrue) == 1
+
+    # visibly expired: refreshed straight away, never sent to GoTrue
+    stale = _token({"sub": session.user.id, "exp": int(time.time()) - 10}, "unknown-key")
+    assert (await verifier.verify(stale, session.refresh_token)).session
+    assert len(gotrue) == 1
+
+
+async def test_unknown_jwks_key_falls_back_to_gotrue(gotrue):
+    class Keys:
+        def get_signing_key(self, kid):
+            raise jwt.PyJWKClientError(f"Unable to find a signing key that matches: {kid}")
+
+    session = await _session()
+    # an RS256 header on a token only GoTrue can check; the signature is never read locally
+    rs256 = ".".join([
+        jwt.utils.base64url_encode(json.dumps({"alg": "RS256", "kid": "rotated", "typ": "JWT"}).encode()).decode(),
+        *session.access_token.split(".")[1:],
+    ])
+    assert jwt.get_unverified_header(rs256)["alg"] == "RS256"
+    verifier = _verifier(secret=None, jwks=Keys())
+    assert verifier._decode_locally(rs256) is None
+    # handed to GoTrue, whose answer stands (the fake one only knows the HS256 secret)
+    assert await verifier.verify(rs256, session.refresh_token) is None
+    assert gotrue == [rs256]
+
+
+async def test_expired_cookie_is_reissued(client, monkeypatch):
+    from backend.core import security
+
+    session = await _session()
+    monkeypatch.setattr(security.token_verifier, "_secret", SECRET)
+    stale = _token({"sub": session.user.id, "email": seed_email(0), "exp": int(time.time()) - 10})
+    client.cookies.set("sb_token", json.dumps({"access_token": stale, "refresh_token": session.refresh_token}))
+
+    resp = await client.get("/ce/status")
+    assert resp.status_code == 200, resp.text
+    cookie = json.loads(resp.cookies["sb_token"].strip('"').replace("\\054", ",").replace('\\"', '"'))
+    assert cookie["access_token"] != stale
+    claims = jwt.decode(cookie["access_token"], SECRET, algorithms=["HS256"], audience="authenticated")
+    assert claims["sub"] == session.user.id
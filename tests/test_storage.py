@@ -0,0 +1,133 @@
+# tests/test_storage.py
+
+import hashlib
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from backend.services import supabase_client
+from backend.services.resilience import UpstreamUnavailable
+from backend.services.storage import CertificateStore, FileTooLarge, certificate_store
+from backend.services.supabase_client import supabase
+
+pytestmark = pytest.mark.anyio
+
+PDF = b"%PDF-1.4 certificate " + bytes(range(256)) * 8
+
+
+async def _chunks(data: bytes, size: int = 100):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+async def _record_id(user_id: str) -> str:
+    res = await supabase.table("ce_records").select("id").eq("user_id", user_id).limit(1).execute()
+    return res.data[0]["id"]
+
+
+def _bucket(monkeypatch, handler):
+    """Point certificate_store at a Storage bucket answered by `handler`."""
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(supabase_client, "storage_http", lambda: (http, "http://storage", {}))
+    monkeypatch.setattr(certificate_store, "_bucket", "certificates")
+
+
+# ─── store ──────────────────────────────────────────────────────
+
+async def test_stage_hashes_in_chunks_and_commit_is_content_addressed(tmp_path):
+    store = CertificateStore(str(tmp_path), chunk_size=64, max_bytes=len(PDF))
+    staged = await store.stage(_chunks(PDF))
+    assert (staged.sha256, staged.size_bytes) == (hashlib.sha256(PDF).hexdigest(), len(PDF))
+
+    key = await store.commit(staged)
+    assert key == f"{staged.sha256[:2]}/{staged.sha256}"
+    assert store.path(key).read_bytes() == PDF
+    assert not staged.path.exists()
+
+    # the same bytes again land on the same key
+    assert await store.commit(await store.stage(_chunks(PDF))) == key
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+
+async def test_stage_stops_at_the_limit_and_leaves_nothing(tmp_path):
+    store = CertificateStore(str(tmp_path), chunk_size=64, max_bytes=len(PDF) - 1)
+    with pytest.raises(FileTooLarge):
+        await store.stage(_chunks(PDF))
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+
+# ─── api ────────────────────────────────────────────────────────
+
+async def test_certificate_upload_is_stored_once(client, user_id):
+    record_id = await _record_id(user_id)
+    files = {"file": ("cert.pdf", PDF, "application/pdf")}
+    resp = await client.post(f"/ce/records/{record_id}/certificate", files=files)
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert (body["sha256"], body["size_bytes"], body["filename"], body["content_type"]) == (
+        hashlib.sha256(PDF).hexdigest(), len(PDF), "cert.pdf", "application/pdf",
+    )
+    assert certificate_store.path(body["storage_key"]).read_bytes() == PDF
+
+    again = await client.post(f"/ce/records/{record_id}/certificate", files=files)
+    assert again.json()["id"] == body["id"]
+
+
+async def test_certificate_upload_refusals(client, user_id, monkeypatch):
+    record_id = await _record_id(user_id)
+    files = {"file": ("cert.pdf", PDF, "application/pdf")}
+    resp = await client.post("/ce/records/00000000-0000-0000-0000-000000000000/certificate", files=files)
+    assert resp.status_code == 404
+
+    monkeypatch.setattr(certificate_store, "_max_bytes", len(PDF) - 1)
+    resp = await client.post(f"/ce/records/{record_id}/certificate", files=files)
+    assert resp.status_code == 413
+
+
+@pytest.mark.parametrize("answer, status", [
+    (httpx.Response(503), 503),
+    (httpx.ConnectError("refused"), 503),
+    (httpx.Response(413, json={"statusCode": "413", "error": "Payload too large"}), 413),
+    (httpx.Response(403, json={"statusCode": "403", "error": "Unauthorized"}), 502),
+])
+async def test_storage_errors_are_mapped(client, user_id, monkeypatch, answer, status):
+    def handler(request):
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    _bucket(monkeypatch, handler)
+    record_id = await _record_id(user_id)
+    resp = await client.post(f"/ce/records/{record_id}/certificate", files={"file": ("cert.pdf", PDF, "application/pdf")})
+    assert resp.status_code == status, resp.text
+    if status == 503:
+        assert resp.headers["retry-after"]
+    assert "detail" in resp.json()
+    assert list((certificate_store.path("tmp")).iterdir()) == []
+
+
+async def test_existing_object_counts_as_stored(tmp_path, monkeypatch):
+    seen = []
+
+    async def handler(request):
+        seen.append((request.url.path, await request.aread()))
+        return httpx.Response(400, json={"statusCode": "409", "error": "Duplicate"})
+
+    _bucket(monkeypatch, handler)
+    staged = await certificate_store.stage(_chunks(PDF))
+    key = await certificate_store.commit(staged, "application/pdf")
+    assert seen == [(f"/object/certificates/{key}", PDF)]
+
+
+async def test_storage_outage_raises_upstream_unavailable(monkeypatch):
+    _bucket(monkeypatch, lambda request: httpx.Response(500))
+    staged = await certificate_store.stage(_chunks(PDF))
+    with pytest.raises(UpstreamUnavailable):
+        await certificate_store.commit(staged)
+    assert not staged.path.exists()
+
+    _bucket(monkeypatch, lambda request: httpx.Response(415))
+    with pytest.raises(HTTPException) as exc:
+        await certificate_store.commit(await certificate_store.stage(_chunks(PDF)))
+    assert exc.value.status_code == 415
@@ -0,0 +1,117 @@
+# tests/test_versions.py
+
+import sqlite3
+import threading
+from datetime import date
+
+import pytest
+
+from backend.core.cache import TTLCache
+from backend.services.reference import reference
+from backend.services.supabase_client import supabase
+from backend.services.versions import DataVersions, SQLiteVersionStore, data_versions
+
+pytestmark = pytest.mark.anyio
+
+
+def _workers(tmp_path, count=2):
+    path = str(tmp_path / "versions.sqlite3")
+    return [DataVersions(SQLiteVersionStore(path), TTLCache(maxsize=100, ttl=60)) for _ in range(count)]
+
+
+async def test_a_write_in_one_worker_reaches_the_other(tmp_path):
+    a, b = _workers(tmp_path)
+    dropped = []
+    b.on_change(dropped.append)
+
+    assert await a.get("u") == await b.get("u")
+    dropped.clear()
+    await a.bump("u")
+    assert await a.get("u") == await b.get("u")
+    assert dropped == ["u"]
+    # nothing changed since: the caches stay
+    await b.get("u")
+    assert dropped == ["u"]
+
+
+async def test_store_calls_run_off_the_event_loop(tmp_path, monkeypatch):
+    versions, = _workers(tmp_path, 1)
+    threads = []
+    read = versions._store.read
+
+    def spy(user_id):
+        threads.append(threading.current_thread())
+        return read(user_id)
+
+    monkeypatch.setattr(versions._store, "read", spy)
+    await versions.get("u")
+    assert threads and threads[0] is not threading.main_thread()
+
+
+async def test_a_failing_store_serves_uncached(tmp_path, monkeypatch):
+    versions, = _workers(tmp_path, 1)
+    dropped = []
+    versions.on_change(dropped.append)
+    known = await versions.get("u")
+
+    def locked(*args):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(versions._store, "read", locked)
+    monkeypatch.setattr(versions._store, "replace", locked)
+    first, second = await versions.get("u"), await versions.get("u")
+    assert len({known, first, second}) == 3
+    await versions.bump("u")
+    assert dropped == ["u", "u", "u", "u"]
+
+
+async def _status(client, etag=None):
+    return await client.get("/ce/status", headers={"If-None-Match": etag} if etag else {})
+
+
+async def test_status_revalidates(client, user_id):
+    first = await _status(client)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert (await _status(client, etag)).status_code == 304
+
+    course = (await supabase.table("courses").select("id").limit(1).execute()).data[0]["id"]
+    await client.post("/ce/records", json={"course_id": course, "date_completed": str(date.today()), "hours_earned": 1})
+    changed = await _status(client, etag)
+    assert changed.status_code == 200
+    assert changed.json()["hours_completed"] == first.json()["hours_completed"] + 1
+
+
+async def test_requirement_change_is_seen_once_the_cache_expires(client, user_id):
+    etag = (await _status(client)).headers["etag"]
+    await supabase.table("ce_requirements").update({"required_hours": 999}).neq("required_hours", 999).execute()
+    assert (await _status(client, etag)).status_code == 304
+
+    # TTL ran out: the next revalidation reloads the table before matching
+    reference._cache.clear()
+    changed = await _status(client, etag)
+    assert changed.status_code == 200
+    assert changed.json()["required_hours"] == 999
+
+
+async def test_requirement_change_is_seen_after_invalidate(client, user_id):
+    etag = (await _status(client)).headers["etag"]
+    await supabase.table("ce_requirements").update({"required_hours": 999}).neq("required_hours", 999).execute()
+    reference.invalidate("ce_requirements")
+    assert (await _status(client, etag)).status_code == 200
+
+
+async def test_dashboard_page_cache(client, user_id):
+    first = await client.get("/dashboard")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    again = await client.get("/dashboard", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+
+    await data_versions.bump(user_id)
+    fresh = await client.get("/dashboard", headers={"If-None-Match": etag, "Accept-Encoding": "identity"})
+    assert fresh.status_code == 200 and fresh.headers["etag"] != etag
+    assert "content-encoding" not in fresh.headers
+    gzipped = await client.get("/dashboard", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.text == fresh.text